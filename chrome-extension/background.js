@@ -67,11 +67,15 @@ async function fetchRemoteSchema() {
         if (!res.ok) throw new Error(`HTTP ${res.status}`);
         const remote = await res.json();
 
-        // Filter to only flat key→array entries (skip _pages metadata)
+        // Filter to only flat key→array entries (skip _pages metadata).
+        // Newer schema files store each distinct option list once under
+        // _options and have labels reference it by hash — resolve those.
+        const sharedOptions = remote._options || {};
         const remoteSchema = {};
         for (const [k, v] of Object.entries(remote)) {
-            if (k.startsWith('_')) continue; // skip _pages etc.
-            if (Array.isArray(v) && v.length > 0) remoteSchema[k] = v;
+            if (k.startsWith('_')) continue; // skip _pages, _options etc.
+            const list = typeof v === 'string' ? sharedOptions[v] : v;
+            if (Array.isArray(list) && list.length > 0) remoteSchema[k] = list;
         }
 
         if (Object.keys(remoteSchema).length === 0) return;
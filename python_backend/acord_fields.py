@@ -0,0 +1,350 @@
+"""
+ACORD Field Mapping
+
+Declarative maps from the COI tool's certificate JSON to ACORD PDF field
+names, compiled once into a list of steps, so a request is mapped in one
+pass over the spec: a run of section.key fields from the same section is
+one step that looks the section up once, anything else is an accessor
+closure of its own.
+
+A spec is a list of fields, each a PDF field name, a dotted source path,
+an optional transform and a default:
+
+    text('Producer_FullName_A[0]', 'producer.name')
+    raw('Policy_GeneralLiability_EffectiveDate_A[0]', 'gl.effective', format_date)
+    raw('GeneralLiability_InsurerLetterCode_A[0]', 'gl.insurerLetter', default='A')
+    text('Producer_ContactPerson_FullName_A[0]', 'producer.contactName',
+         default=Fallback('producer.name'))
+
+text() reads a value as a string: a missing, non-object section or a
+falsy value gives the default. raw() keeps the value as sent, and a
+section that isn't an object drops the field (a missing section counts
+as empty, so its defaults still apply). A Fallback default is another
+path read the same way. Fields whose final value is empty are left out.
+
+fill_acord25.py maps ACORD 25 with ACORD25_FIELDS; another form is a new
+spec in FORMS and field_mapper('<form>').
+"""
+
+from collections import namedtuple
+
+FieldSpec = namedtuple('FieldSpec', 'name path transform default raw')
+Fallback = namedtuple('Fallback', 'path')
+
+
+def text(name, path, transform=None, default=''):
+    return FieldSpec(name, path, transform, default, False)
+
+
+def raw(name, path, transform=None, default=''):
+    return FieldSpec(name, path, transform, default, True)
+
+
+def mark(symbol):
+    """Transform for checkbox-like text fields: `symbol` when the value is truthy."""
+    return lambda value: symbol if value else ''
+
+
+def format_date(date_str):
+    """Convert YYYY-MM-DD to MM/DD/YYYY for ACORD forms."""
+    if not date_str:
+        return ''
+    try:
+        parts = date_str.split('-')
+        if len(parts) == 3:
+            return f'{parts[1]}/{parts[2]}/{parts[0]}'
+    except Exception:
+        pass
+    return date_str
+
+
+# ── Compiler ──
+
+_EMPTY = {}  # read-only stand-in for a missing section
+
+
+def _text_getter(keys, default, fallback):
+    """Value at keys as str; falsy, missing or under a non-object -> the
+    default (or fallback(data))."""
+    if len(keys) == 1:
+        key, = keys
+        if fallback is None:
+            def get(data):
+                value = data.get(key)
+                return str(value) if value else default
+        else:
+            def get(data):
+                value = data.get(key)
+                return str(value) if value else fallback(data)
+    elif len(keys) == 2:
+        section, key = keys
+        if fallback is None:
+            def get(data):
+                node = data.get(section, _EMPTY)
+                if isinstance(node, dict):
+                    value = node.get(key)
+                    if value:
+                        return str(value)
+                return default
+        else:
+            def get(data):
+                node = data.get(section, _EMPTY)
+                if isinstance(node, dict):
+                    value = node.get(key)
+                    if value:
+                        return str(value)
+                return fallback(data)
+    else:
+        *sections, key = keys
+
+        def get(data):
+            node = data
+            for section in sections:
+                node = node.get(section, _EMPTY)
+                if not isinstance(node, dict):
+                    return fallback(data) if fallback else default
+            value = node.get(key)
+            if value:
+                return str(value)
+            return fallback(data) if fallback else default
+    return get
+
+
+def _raw_getter(keys, default, fallback, transform=None):
+    """Value at keys as sent (the default, or fallback(data), when the key
+    is absent), then transformed; None when a section on the way isn't an
+    object. The common section.key case applies the transform inline."""
+    *sections, key = keys
+    if fallback is None and len(keys) == 2:
+        section, = sections
+        if transform is None:
+            def get(data):
+                node = data.get(section, _EMPTY)
+                return node.get(key, default) if isinstance(node, dict) else None
+        else:
+            def get(data):
+                node = data.get(section, _EMPTY)
+                return transform(node.get(key, default)) if isinstance(node, dict) else None
+        return get
+    if fallback is None and len(keys) == 3:
+        section, subsection = sections
+
+        def get(data):
+            node = data.get(section, _EMPTY)
+            if not isinstance(node, dict):
+                return None
+            node = node.get(subsection, _EMPTY)
+            return node.get(key, default) if isinstance(node, dict) else None
+    else:
+        def get(data):
+            node = data
+            for section in sections:
+                node = node.get(section, _EMPTY)
+                if not isinstance(node, dict):
+                    return None
+            if key in node:
+                return node[key]
+            return fallback(data) if fallback else default
+    return _transformed(get, transform) if transform else get
+
+
+def _getter(path, is_raw, default, transform=None):
+    fallback = None
+    if isinstance(default, Fallback):
+        fallback, default = _getter(default.path, is_raw, ''), ''
+    if is_raw:
+        return _raw_getter(path.split('.'), default, fallback, transform)
+    get = _text_getter(path.split('.'), default, fallback)
+    return _transformed(get, transform) if transform else get
+
+
+def _transformed(get, transform):
+    return lambda data: transform(get(data))
+
+
+def _section_step(section, items, is_raw):
+    """One step for a run of plain section.key fields: items are
+    (name, key, default, transform)."""
+    if is_raw:
+        def step(data, fields):
+            node = data.get(section, _EMPTY)
+            if not isinstance(node, dict):
+                return
+            for name, key, default, transform in items:
+                value = node.get(key, default)
+                if transform is not None:
+                    value = transform(value)
+                if value:
+                    fields[name] = value
+    else:
+        def step(data, fields):
+            node = data.get(section, _EMPTY)
+            if not isinstance(node, dict):
+                node = _EMPTY
+            for name, key, default, transform in items:
+                value = node.get(key)
+                value = str(value) if value else default
+                if transform is not None:
+                    value = transform(value)
+                if value:
+                    fields[name] = value
+    return step
+
+
+def _field_step(name, get):
+    def step(data, fields):
+        value = get(data)
+        if value:
+            fields[name] = value
+    return step
+
+
+def _section_key(field):
+    """(section, key) for a plain two-level path without a Fallback, else None."""
+    keys = field.path.split('.')
+    if len(keys) != 2 or isinstance(field.default, Fallback):
+        return None
+    return keys
+
+
+def compile_spec(spec):
+    """A spec -> map_fields(data) returning {field name: value} (empties dropped)."""
+    steps = []
+    run, run_section, run_raw = [], None, None
+
+    def close_run():
+        if run:
+            steps.append(_section_step(run_section, tuple(run), run_raw))
+            del run[:]
+
+    for field in spec:
+        keys = _section_key(field)
+        if keys is None:
+            close_run()
+            steps.append(_field_step(field.name, _getter(field.path, field.raw, field.default, field.transform)))
+            continue
+        if keys[0] != run_section or field.raw != run_raw:
+            close_run()
+            run_section, run_raw = keys[0], field.raw
+        run.append((field.name, keys[1], field.default, field.transform))
+    close_run()
+    steps = tuple(steps)
+
+    def map_fields(data):
+        fields = {}
+        for step in steps:
+            step(data, fields)
+        return fields
+
+    return map_fields
+
+
+# ── ACORD 25 (Certificate of Liability Insurance) ──
+
+ACORD25_FIELDS = [
+    # Certificate Info
+    text('Form_CompletionDate_A[0]', 'date', format_date),
+    text('CertificateOfInsurance_CertificateNumberIdentifier_A[0]', 'certNumber'),
+    text('CertificateOfInsurance_RevisionNumberIdentifier_A[0]', 'revNumber'),
+
+    # Producer
+    text('Producer_FullName_A[0]', 'producer.name'),
+    text('Producer_MailingAddress_LineOne_A[0]', 'producer.address'),
+    text('Producer_MailingAddress_CityName_A[0]', 'producer.city'),
+    text('Producer_MailingAddress_StateOrProvinceCode_A[0]', 'producer.state'),
+    text('Producer_MailingAddress_PostalCode_A[0]', 'producer.zip'),
+    text('Producer_ContactPerson_FullName_A[0]', 'producer.contactName', default=Fallback('producer.name')),
+    text('Producer_ContactPerson_PhoneNumber_A[0]', 'producer.phone'),
+    text('Producer_FaxNumber_A[0]', 'producer.fax'),
+    text('Producer_ContactPerson_EmailAddress_A[0]', 'producer.email'),
+
+    # Insured
+    text('NamedInsured_FullName_A[0]', 'insured.name'),
+    text('NamedInsured_MailingAddress_LineOne_A[0]', 'insured.address'),
+    text('NamedInsured_MailingAddress_CityName_A[0]', 'insured.city'),
+    text('NamedInsured_MailingAddress_StateOrProvinceCode_A[0]', 'insured.state'),
+    text('NamedInsured_MailingAddress_PostalCode_A[0]', 'insured.zip'),
+
+    # Insurers A-F
+    *[spec
+      for letter in 'abcdef'
+      for spec in (raw(f'Insurer_FullName_{letter.upper()}[0]', f'insurers.{letter}.name'),
+                   raw(f'Insurer_NAICCode_{letter.upper()}[0]', f'insurers.{letter}.naic'))],
+
+    # General Liability
+    raw('GeneralLiability_InsurerLetterCode_A[0]', 'gl.insurerLetter', default='A'),
+    raw('Policy_GeneralLiability_PolicyNumberIdentifier_A[0]', 'gl.policy'),
+    raw('Policy_GeneralLiability_EffectiveDate_A[0]', 'gl.effective', format_date),
+    raw('Policy_GeneralLiability_ExpirationDate_A[0]', 'gl.expiration', format_date),
+    raw('GeneralLiability_EachOccurrence_LimitAmount_A[0]', 'gl.occurrence'),
+    raw('GeneralLiability_FireDamageRentedPremises_EachOccurrenceLimitAmount_A[0]', 'gl.rented'),
+    raw('GeneralLiability_MedicalExpense_EachPersonLimitAmount_A[0]', 'gl.med'),
+    raw('GeneralLiability_PersonalAndAdvertisingInjury_LimitAmount_A[0]', 'gl.personal'),
+    raw('GeneralLiability_GeneralAggregate_LimitAmount_A[0]', 'gl.aggregate'),
+    raw('GeneralLiability_ProductsAndCompletedOperations_AggregateLimitAmount_A[0]', 'gl.products'),
+    raw('CertificateOfInsurance_GeneralLiability_AdditionalInsuredCode_A[0]', 'gl.addl', mark('X')),
+    raw('Policy_GeneralLiability_SubrogationWaivedCode_A[0]', 'gl.subr', mark('X')),
+
+    # Automobile Liability
+    raw('Vehicle_InsurerLetterCode_A[0]', 'auto.insurerLetter', default='B'),
+    raw('Policy_AutomobileLiability_PolicyNumberIdentifier_A[0]', 'auto.policy'),
+    raw('Policy_AutomobileLiability_EffectiveDate_A[0]', 'auto.effective', format_date),
+    raw('Policy_AutomobileLiability_ExpirationDate_A[0]', 'auto.expiration', format_date),
+    raw('Vehicle_CombinedSingleLimit_EachAccidentAmount_A[0]', 'auto.csl'),
+    raw('Vehicle_BodilyInjury_PerPersonLimitAmount_A[0]', 'auto.bodyPerson'),
+    raw('Vehicle_BodilyInjury_PerAccidentLimitAmount_A[0]', 'auto.bodyAccident'),
+    raw('Vehicle_PropertyDamage_PerAccidentLimitAmount_A[0]', 'auto.prop'),
+    raw('CertificateOfInsurance_AutomobileLiability_AdditionalInsuredCode_A[0]', 'auto.addl', mark('X')),
+    raw('Policy_AutomobileLiability_SubrogationWaivedCode_A[0]', 'auto.subr', mark('X')),
+
+    # Umbrella / Excess Liability
+    raw('ExcessUmbrella_InsurerLetterCode_A[0]', 'umbrella.insurerLetter', default='D'),
+    raw('Policy_ExcessLiability_PolicyNumberIdentifier_A[0]', 'umbrella.policy'),
+    raw('Policy_ExcessLiability_EffectiveDate_A[0]', 'umbrella.effective', format_date),
+    raw('Policy_ExcessLiability_ExpirationDate_A[0]', 'umbrella.expiration', format_date),
+    raw('ExcessUmbrella_Umbrella_EachOccurrenceAmount_A[0]', 'umbrella.occurrence'),
+    raw('ExcessUmbrella_Umbrella_AggregateAmount_A[0]', 'umbrella.aggregate'),
+    raw('ExcessUmbrella_Umbrella_DeductibleOrRetentionAmount_A[0]', 'umbrella.ded'),
+    raw('CertificateOfInsurance_ExcessLiability_AdditionalInsuredCode_A[0]', 'umbrella.addl', mark('X')),
+    raw('Policy_ExcessLiability_SubrogationWaivedCode_A[0]', 'umbrella.subr', mark('X')),
+
+    # Workers Compensation
+    raw('WorkersCompensationEmployersLiability_InsurerLetterCode_A[0]', 'wc.insurerLetter', default='C'),
+    raw('Policy_WorkersCompensationAndEmployersLiability_PolicyNumberIdentifier_A[0]', 'wc.policy'),
+    raw('Policy_WorkersCompensationAndEmployersLiability_EffectiveDate_A[0]', 'wc.effective', format_date),
+    raw('Policy_WorkersCompensationAndEmployersLiability_ExpirationDate_A[0]', 'wc.expiration', format_date),
+    raw('WorkersCompensationEmployersLiability_EmployersLiability_EachAccidentLimitAmount_A[0]', 'wc.accident'),
+    raw('WorkersCompensationEmployersLiability_EmployersLiability_DiseaseEachEmployeeLimitAmount_A[0]',
+        'wc.employee', default=Fallback('wc.disease')),
+    raw('WorkersCompensationEmployersLiability_EmployersLiability_DiseasePolicyLimitAmount_A[0]',
+        'wc.diseasePolicyLimit', default=Fallback('wc.disease')),
+    raw('WorkersCompensationEmployersLiability_AnyPersonsExcludedIndicator_A[0]', 'wc.excl', mark('Y')),
+    raw('Policy_WorkersCompensation_SubrogationWaivedCode_A[0]', 'wc.subr', mark('X')),
+
+    # Description of Operations
+    text('CertificateOfLiabilityInsurance_ACORDForm_RemarkText_A[0]', 'description'),
+
+    # Certificate Holder
+    raw('CertificateHolder_FullName_A[0]', 'holder.name'),
+    raw('CertificateHolder_MailingAddress_LineOne_A[0]', 'holder.address'),
+    raw('CertificateHolder_MailingAddress_CityName_A[0]', 'holder.city'),
+    raw('CertificateHolder_MailingAddress_StateOrProvinceCode_A[0]', 'holder.state'),
+    raw('CertificateHolder_MailingAddress_PostalCode_A[0]', 'holder.zip'),
+
+    # Authorized Representative
+    text('Producer_AuthorizedRepresentative_Signature_A[0]', 'authorizedRep', default=Fallback('producer.name')),
+]
+
+FORMS = {
+    'acord25': ACORD25_FIELDS,
+}
+
+_compiled = {}
+
+
+def field_mapper(form):
+    """The compiled map_fields(data) for a form in FORMS (compiled on first use)."""
+    mapper = _compiled.get(form)
+    if mapper is None:
+        mapper = _compiled[form] = compile_spec(FORMS[form])
+    return mapper
@@ -0,0 +1,313 @@
+"""
+ACORD 25 Filler Benchmark
+
+Measures fill_acord25.py over a corpus of synthetic certificates:
+
+  minimal            insured + holder only
+  typical            producer, three insurers, GL + auto + WC, one holder
+  full               all six insurers, every coverage block and checkbox
+  long_description   typical + a ~3KB multi-paragraph description
+
+For each payload it times build_field_map (µs) and each output mode on a
+loaded template (ms, p50/p95/p99). It also records the tracemalloc peak
+of one fill and the output size:
+
+  full          /V set on the widgets, document rewritten
+  incremental   template bytes + update section with the changed widgets
+  appearance    full + an appearance stream per filled field and an AcroForm
+  flatten       values painted into the page, form removed
+
+Startup is measured twice. Cold start is a fresh `python fill_acord25.py`
+process per certificate, with its peak RSS (POSIX). Template load is
+TemplateFiller(), the part --serve and the worker pool pay once. The
+result cache is never used.
+
+--json stores the results. --baseline compares against stored results
+and exits 1 when a metric is worse by more than --threshold percent and
+by more than its noise floor. The gated metrics are the medians, startup,
+memory peaks and sizes. p95/p99 are reported but not gated, because a few
+dozen runs make them too noisy. Baselines are per machine: store one on
+the box that runs the comparison.
+
+Usage:
+    python bench_acord25.py
+    python bench_acord25.py --runs 50 --modes full flatten --payloads typical full
+    python bench_acord25.py --data payload.json --json bench.json
+    python bench_acord25.py --json baseline.json                         # store a baseline
+    python bench_acord25.py --baseline baseline.json --threshold 15      # fail on regressions
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from fill_acord25 import FILL_MODES, TemplateFiller, build_field_map, fill_certificate
+from pdf_worker_pool import peak_rss_bytes, percentile
+
+# Fix Windows console encoding
+if sys.platform == 'win32':
+    sys.stdout.reconfigure(encoding='utf-8', errors='replace')
+    sys.stderr.reconfigure(encoding='utf-8', errors='replace')
+
+
+DEFAULT_RUNS = 20
+DEFAULT_COLD_RUNS = 3
+DEFAULT_THRESHOLD = 20  # percent
+MAP_RUNS = 2000
+FILL_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fill_acord25.py')
+
+# A regression must also exceed these absolute deltas, by metric suffix,
+# so timer noise on small numbers doesn't fail a run
+NOISE_FLOORS = {'_us': 3.0, '_ms': 2.0, '_kb': 64, 'bytes': 512}
+UNGATED = ('/p95_', '/p99_')
+
+# A typical certificate: producer, insured, three insurers, GL + auto + WC,
+# a short description and one holder
+SAMPLE_DATA = {
+    'date': '2026-10-19',
+    'certNumber': '2026-0142',
+    'producer': {
+        'name': 'Altech Insurance Agency', 'address': '1200 Main St, Suite 300',
+        'city': 'Vancouver', 'state': 'WA', 'zip': '98660',
+        'contactName': 'Austin Kays', 'phone': '(360) 555-0142', 'email': 'certs@altech.example',
+    },
+    'insured': {
+        'name': "Bob's Roofing LLC", 'address': '88 Industrial Way',
+        'city': 'Portland', 'state': 'OR', 'zip': '97203',
+    },
+    'insurers': {
+        'a': {'name': 'Summit Casualty Company', 'naic': '12345'},
+        'b': {'name': 'Cascade Auto Insurance Co', 'naic': '23456'},
+        'c': {'name': 'Northwest Workers Comp Fund', 'naic': '34567'},
+    },
+    'gl': {
+        'policy': 'GL-4401-2026', 'effective': '2026-01-01', 'expiration': '2027-01-01',
+        'occurrence': '1,000,000', 'rented': '300,000', 'med': '10,000',
+        'personal': '1,000,000', 'aggregate': '2,000,000', 'products': '2,000,000', 'addl': True,
+    },
+    'auto': {
+        'policy': 'CA-7710-2026', 'effective': '2026-01-01', 'expiration': '2027-01-01',
+        'csl': '1,000,000',
+    },
+    'wc': {
+        'policy': 'WC-9921-2026', 'effective': '2026-01-01', 'expiration': '2027-01-01',
+        'accident': '1,000,000', 'disease': '1,000,000',
+    },
+    'description': 'Certificate holder is included as additional insured with respect to '
+                   'general liability when required by written contract. Job: 1400 Oak St re-roof.',
+    'holder': {
+        'name': 'Columbia General Contractors', 'address': '500 River Rd',
+        'city': 'Portland', 'state': 'OR', 'zip': '97201',
+    },
+}
+
+MINIMAL_DATA = {
+    'insured': {'name': "Bob's Roofing LLC"},
+    'holder': {'name': 'Columbia General Contractors'},
+}
+
+FULL_DATA = {
+    **SAMPLE_DATA,
+    'revNumber': '3',
+    'producer': {**SAMPLE_DATA['producer'], 'fax': '(360) 555-0143'},
+    'insurers': {letter: {'name': f'Insurer {letter.upper()} Mutual Casualty Company', 'naic': f'{i}1{i}2{i}'}
+                 for i, letter in enumerate('abcdef', 1)},
+    'gl': {**SAMPLE_DATA['gl'], 'insurerLetter': 'A', 'subr': True},
+    'auto': {**SAMPLE_DATA['auto'], 'insurerLetter': 'B', 'bodyPerson': '500,000',
+             'bodyAccident': '1,000,000', 'prop': '250,000', 'addl': True, 'subr': True},
+    'umbrella': {'insurerLetter': 'D', 'policy': 'UMB-3300-2026', 'effective': '2026-01-01',
+                 'expiration': '2027-01-01', 'occurrence': '5,000,000', 'aggregate': '5,000,000',
+                 'ded': '10,000', 'addl': True, 'subr': True},
+    'wc': {**SAMPLE_DATA['wc'], 'insurerLetter': 'C', 'employee': '1,000,000',
+           'diseasePolicyLimit': '1,000,000', 'excl': True, 'subr': True},
+    'authorizedRep': 'Austin Kays',
+}
+
+LONG_DESCRIPTION_DATA = {
+    **SAMPLE_DATA,
+    'description': '\n'.join(
+        f'{n}. Certificate holder, its officers, agents and employees are included as additional '
+        f'insured with respect to general liability and automobile liability for ongoing and '
+        f'completed operations at project site {n} when required by written contract executed '
+        f'prior to loss. Coverage is primary and non-contributory. Waiver of subrogation applies.'
+        for n in range(1, 11)
+    ),
+}
+
+CORPUS = {
+    'minimal': MINIMAL_DATA,
+    'typical': SAMPLE_DATA,
+    'full': FULL_DATA,
+    'long_description': LONG_DESCRIPTION_DATA,
+}
+
+
+def summarize(times, unit):
+    ordered = sorted(times)
+    return {f'p{p}_{unit}': round(percentile(ordered, p), 2) for p in (50, 95, 99)}
+
+
+def bench_map(data, runs=MAP_RUNS):
+    """build_field_map percentiles (µs), timed in batches of 10 calls."""
+    times = []
+    for _ in range(runs // 10):
+        t0 = time.perf_counter()
+        for _ in range(10):
+            build_field_map(data)
+        times.append((time.perf_counter() - t0) * 1e5)
+    return summarize(times, 'us')
+
+
+def bench_mode(filler, mode, data, runs):
+    """Fill time percentiles (ms), tracemalloc peak and output size for one mode."""
+    pdf_bytes, filled = fill_certificate(data, mode, filler)  # warm-up
+    times = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        pdf_bytes, filled = fill_certificate(data, mode, filler)
+        times.append((time.perf_counter() - t0) * 1000)
+
+    tracemalloc.start()
+    fill_certificate(data, mode, filler)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {'mode': mode, 'filled': filled, **summarize(times, 'ms'),
+            'peak_kb': round(peak / 1024), 'bytes': len(pdf_bytes)}
+
+
+def bench_cold_start(data, runs):
+    """A fresh `python fill_acord25.py` per certificate: median wall ms and child peak RSS."""
+    payload = json.dumps(data).encode('utf-8')
+    times = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        subprocess.run([sys.executable, FILL_SCRIPT, '--no-cache'], input=payload,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        times.append((time.perf_counter() - t0) * 1000)
+    result = {'p50_ms': round(percentile(sorted(times), 50), 1)}
+    rss = peak_rss_bytes(children=True)
+    if rss:
+        result['peak_rss_kb'] = round(rss / 1024)
+    return result
+
+
+def flatten_metrics(results):
+    """{'payload/mode/metric': value} for every comparable number in a results dict."""
+    metrics = {f'startup/{k}': v for k, v in results['startup'].items()}
+    for name, payload in results['payloads'].items():
+        metrics.update({f'{name}/map/{k}': v for k, v in payload['map'].items()})
+        for row in payload['modes']:
+            metrics.update({f"{name}/{row['mode']}/{k}": v for k, v in row.items()
+                            if k not in ('mode', 'filled')})
+    return metrics
+
+
+def compare(results, baseline, threshold):
+    """Regressions against a baseline -> [(metric, before, after, percent)]."""
+    before = flatten_metrics(baseline)
+    regressions = []
+    for metric, after in flatten_metrics(results).items():
+        old = before.get(metric)
+        if not old or any(tag in metric for tag in UNGATED):
+            continue
+        floor = next((v for suffix, v in NOISE_FLOORS.items() if metric.endswith(suffix)), 0)
+        change = (after - old) / old * 100
+        if change > threshold and after - old > floor:
+            regressions.append((metric, old, after, change))
+    return regressions
+
+
+def print_table(rows):
+    cols = [('payload', 17), ('mode', 12), ('filled', 7), ('p50_ms', 8), ('p95_ms', 8), ('p99_ms', 8),
+            ('peak_kb', 8), ('bytes', 9), ('vs_full', 8)]
+    heads = {'p50_ms': 'p50 ms', 'p95_ms': 'p95 ms', 'p99_ms': 'p99 ms', 'peak_kb': 'peak KB',
+             'vs_full': 'vs full'}
+    left = ('payload', 'mode')
+    print('  '.join(heads.get(c, c).ljust(w) if c in left else heads.get(c, c).rjust(w) for c, w in cols))
+    for r in rows:
+        print('  '.join(str(r.get(c, '')).ljust(w) if c in left else str(r.get(c, '')).rjust(w)
+                        for c, w in cols))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the ACORD 25 filler')
+    parser.add_argument('--modes', nargs='+', choices=FILL_MODES, default=list(FILL_MODES),
+                        help='Modes to bench (default: all)')
+    parser.add_argument('--payloads', nargs='+', choices=list(CORPUS), default=list(CORPUS),
+                        help='Corpus payloads to bench (default: all)')
+    parser.add_argument('--runs', type=int, default=DEFAULT_RUNS,
+                        help=f'Fills per payload and mode (default: {DEFAULT_RUNS})')
+    parser.add_argument('--cold-runs', type=int, default=DEFAULT_COLD_RUNS,
+                        help=f'Fresh fill_acord25.py processes to time, 0 to skip (default: {DEFAULT_COLD_RUNS})')
+    parser.add_argument('--data', metavar='FILE',
+                        help='Certificate JSON to bench instead of the corpus')
+    parser.add_argument('--json', metavar='FILE', help='Also write the results to FILE')
+    parser.add_argument('--baseline', metavar='FILE',
+                        help='Results from an earlier --json run; exit 1 on regressions')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help=f'Percent worse than the baseline that counts as a regression '
+                             f'(default: {DEFAULT_THRESHOLD})')
+    args = parser.parse_args()
+
+    corpus = {name: CORPUS[name] for name in args.payloads}
+    if args.data:
+        with open(args.data, 'r', encoding='utf-8') as f:
+            corpus = {'custom': json.load(f)}
+
+    t0 = time.perf_counter()
+    filler = TemplateFiller()
+    startup = {'template_load_ms': round((time.perf_counter() - t0) * 1000, 1)}
+    if args.cold_runs > 0:
+        cold = bench_cold_start(next(iter(corpus.values())), args.cold_runs)
+        startup['cold_start_ms'] = cold['p50_ms']
+        if 'peak_rss_kb' in cold:
+            startup['cold_peak_rss_kb'] = cold['peak_rss_kb']
+    print(f'--- ACORD 25 benchmark: {len(corpus)} payload(s) x {len(args.modes)} mode(s), '
+          f'{args.runs} run(s) each ---')
+    print('  '.join(f'{k}: {v}' for k, v in startup.items()))
+
+    results = {'runs': args.runs, 'startup': startup, 'payloads': {}}
+    rows = []
+    for name, data in corpus.items():
+        modes = [bench_mode(filler, mode, data, args.runs) for mode in args.modes]
+        full = next((r for r in modes if r['mode'] == 'full'), None)
+        for r in modes:
+            rows.append({'payload': name, **r,
+                         'vs_full': f"{r['bytes'] / full['bytes']:.0%}" if full else ''})
+        results['payloads'][name] = {'map': bench_map(data), 'modes': modes}
+
+    print()
+    print_table(rows)
+    print()
+    print('build_field_map: ' + ', '.join(f"{name} {p['map']['p50_us']}µs"
+                                         for name, p in results['payloads'].items()))
+    peak = peak_rss_bytes()
+    if peak:
+        results['peak_rss_kb'] = round(peak / 1024)
+        print(f'bench process peak RSS: {results["peak_rss_kb"]} KB')
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        print()
+        if not regressions:
+            print(f'No regressions over {args.threshold:g}% against {args.baseline}')
+            return
+        print(f'{len(regressions)} regression(s) over {args.threshold:g}% against {args.baseline}:')
+        for metric, old, new, change in regressions:
+            print(f'  {metric}: {old} -> {new} (+{change:.0f}%)')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+"""
+Policy Text Extraction Benchmark
+
+Times policy_engine.extract_text serially and with page-parallel process
+pools of several sizes. Each run opens the file from scratch, as a
+policy_engine.py launch would, and includes pool startup. It also checks
+that every parallel result matches the serial text.
+
+Without --pdf it generates a synthetic dec-page package: N letter pages
+of ~60 text lines each, Helvetica, no images.
+
+Usage:
+    python bench_policy_engine.py
+    python bench_policy_engine.py --pages 120 --workers 2 4 8 --runs 5
+    python bench_policy_engine.py --pdf package_dec.pdf --json bench.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from pypdf import PdfWriter
+from pypdf.generic import DecodedStreamObject, DictionaryObject, NameObject
+
+from policy_engine import PARALLEL_MIN_PAGES, extract_text
+
+# Fix Windows console encoding
+if sys.platform == 'win32':
+    sys.stdout.reconfigure(encoding='utf-8', errors='replace')
+    sys.stderr.reconfigure(encoding='utf-8', errors='replace')
+
+
+DEFAULT_PAGES = 60
+DEFAULT_RUNS = 3
+LINES_PER_PAGE = 60
+
+
+def synthetic_package(path, pages):
+    """Write a text-only PDF of `pages` dec-page-like pages to path."""
+    writer = PdfWriter()
+    font = writer._add_object(DictionaryObject({
+        NameObject('/Type'): NameObject('/Font'),
+        NameObject('/Subtype'): NameObject('/Type1'),
+        NameObject('/BaseFont'): NameObject('/Helvetica'),
+        NameObject('/Encoding'): NameObject('/WinAnsiEncoding'),
+    }))
+    for n in range(1, pages + 1):
+        page = writer.add_blank_page(612, 792)
+        page[NameObject('/Resources')] = DictionaryObject({
+            NameObject('/Font'): DictionaryObject({NameObject('/F1'): font}),
+        })
+        lines = [f'COMMERCIAL PACKAGE POLICY DECLARATIONS - PAGE {n} OF {pages}']
+        lines += [f'Location {n}-{i}: Building {i}, 1400 Oak St  Limit $1,000,000  '
+                  f'Deductible $5,000  Premium ${n * 37 + i * 11:,}'
+                  for i in range(1, LINES_PER_PAGE)]
+        ops = ['BT', '/F1 9 Tf', '11 TL', '40 760 Td']
+        ops += [f'({line}) Tj T*' for line in lines]
+        ops.append('ET')
+        content = DecodedStreamObject()
+        content.set_data('\n'.join(ops).encode('latin-1'))
+        page[NameObject('/Contents')] = writer._add_object(content)
+    with open(path, 'wb') as f:
+        writer.write(f)
+
+
+def bench(path, workers, runs):
+    """Median / min ms of extract_text(path, workers) and the text of the last run."""
+    times = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        text = extract_text(path, workers)
+        times.append((time.perf_counter() - t0) * 1000)
+    return {'workers': workers, 'median_ms': round(statistics.median(times)),
+            'min_ms': round(min(times))}, text
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark serial vs page-parallel policy text extraction')
+    parser.add_argument('--pdf', metavar='FILE', help='PDF to extract instead of a synthetic package')
+    parser.add_argument('--pages', type=int, default=DEFAULT_PAGES,
+                        help=f'Synthetic package pages (default: {DEFAULT_PAGES})')
+    parser.add_argument('--workers', type=int, nargs='+',
+                        help='Pool sizes to compare with serial (default: 2, 4 and the CPU count)')
+    parser.add_argument('--runs', type=int, default=DEFAULT_RUNS,
+                        help=f'Extractions per configuration, median reported (default: {DEFAULT_RUNS})')
+    parser.add_argument('--json', metavar='FILE', help='Also write the results to FILE')
+    args = parser.parse_args()
+
+    cpus = os.cpu_count() or 1
+    pool_sizes = sorted(set(args.workers or [2, 4, cpus]) - {1})
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.pdf
+        if not path:
+            path = os.path.join(tmp, f'package_{args.pages}p.pdf')
+            synthetic_package(path, args.pages)
+        print(f'--- policy_engine benchmark: {os.path.basename(path)}, {args.runs} run(s) each, '
+              f'{cpus} CPU(s), parallel from {PARALLEL_MIN_PAGES} pages ---')
+
+        serial, expected = bench(path, 1, args.runs)
+        rows = [serial]
+        for n in pool_sizes:
+            row, text = bench(path, n, args.runs)
+            row['matches_serial'] = text == expected
+            rows.append(row)
+
+    print(f"{'workers':>8}  {'median ms':>10}  {'min ms':>8}  {'speedup':>8}  {'same text':>9}")
+    for r in rows:
+        r['speedup'] = round(serial['median_ms'] / r['median_ms'], 2) if r['median_ms'] else None
+        print(f"{r['workers']:>8}  {r['median_ms']:>10}  {r['min_ms']:>8}  {r['speedup']:>7}x  "
+              f"{str(r.get('matches_serial', '')):>9}")
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'pdf': args.pdf, 'pages': None if args.pdf else args.pages, 'cpus': cpus,
+                       'runs': args.runs, 'results': rows}, f, indent=2)
+    if not all(r.get('matches_serial', True) for r in rows):
+        print('Parallel text differs from serial', file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,285 @@
+"""
+EZLynx Scraper Benchmark
+
+Replays recorded EZLynx DOM snapshots (tests/fixtures/ezlynx-dom/*.html,
+or pages saved with scrape_ezlynx_schema.py --snapshot-dir) plus synthetic
+pages of N controls in headless Chromium, and times the scraper's two
+in-browser steps against them:
+
+  prepopulate   click_all_dropdowns_to_populate() (PREPOPULATE_JS)
+  scrape        SCRAPE_JS, in-page time and full evaluate round trip
+
+Snapshots are static, so a small shim stands in for Angular's overlay:
+clicking a mat-select / combobox / Kendo dropdown copies its options into
+.cdk-overlay-container after --latency-ms, and the backdrop / Escape
+closes it. No network, no login.
+
+Usage:
+    python bench_scraper.py
+    python bench_scraper.py --synthetic 100 500 2000 --runs 10
+    python bench_scraper.py --fixtures snapshots/ --no-prepopulate
+    python bench_scraper.py --json bench.json
+"""
+
+import argparse
+import glob
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+from ezlynx_schema_store import encode_schema
+from scrape_ezlynx_schema import (
+    PREPOPULATE_CAP_MS, SCRAPE_JS, click_all_dropdowns_to_populate, sync_playwright,
+)
+
+# Fix Windows console encoding
+if sys.platform == 'win32':
+    sys.stdout.reconfigure(encoding='utf-8', errors='replace')
+    sys.stderr.reconfigure(encoding='utf-8', errors='replace')
+
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                           "..", "tests", "fixtures", "ezlynx-dom")
+DEFAULT_SYNTHETIC = [100, 500]
+DEFAULT_RUNS = 5
+DEFAULT_LATENCY_MS = 25
+
+# Everything SCRAPE_JS / PREPOPULATE_JS may visit, counted once per element
+CONTROLS_SELECTOR = ('select, mat-select, [role="listbox"], [role="combobox"], '
+                     '.k-dropdown, .k-dropdownlist, .p-dropdown, .custom-select, '
+                     '[data-role="dropdownlist"]')
+
+TIMED_SCRAPE_JS = """
+() => {
+    const scrape = """ + SCRAPE_JS + """;
+    const t0 = performance.now();
+    const result = scrape();
+    return {ms: performance.now() - t0, result};
+}
+"""
+
+# Stand-in for the CDK overlay: a click on a trigger renders its options
+# into .cdk-overlay-container after `latency` ms; backdrop/Escape closes.
+OVERLAY_SHIM_JS = """
+(latency) => {
+    const TRIGGERS = 'mat-select, [role="combobox"], .k-dropdown, .k-dropdownlist, [data-role="dropdownlist"]';
+    let container = document.querySelector('.cdk-overlay-container');
+    if (!container) {
+        container = document.createElement('div');
+        container.className = 'cdk-overlay-container';
+        document.body.appendChild(container);
+    }
+    let pending = null;
+    const close = () => { clearTimeout(pending); container.replaceChildren(); };
+    function optionsOf(el) {
+        const owned = el.getAttribute('aria-owns') || el.getAttribute('aria-controls');
+        const src = (owned && document.getElementById(owned)) || el;
+        return src.querySelectorAll('mat-option, [role="option"], li, .k-item');
+    }
+    document.addEventListener('click', e => {
+        const trigger = e.target.closest && e.target.closest(TRIGGERS);
+        if (!trigger || container.contains(e.target)) return;
+        close();
+        pending = setTimeout(() => {
+            const backdrop = document.createElement('div');
+            backdrop.className = 'cdk-overlay-backdrop';
+            backdrop.addEventListener('click', close);
+            const panel = document.createElement('div');
+            panel.setAttribute('role', 'listbox');
+            optionsOf(trigger).forEach(opt => {
+                const o = document.createElement('mat-option');
+                o.setAttribute('role', 'option');
+                o.textContent = opt.textContent;
+                panel.appendChild(o);
+            });
+            container.append(backdrop, panel);
+        }, latency);
+    }, true);
+    document.addEventListener('keydown', e => { if (e.key === 'Escape') close(); });
+}
+"""
+
+_OPTION_SETS = [
+    ["Yes", "No"],
+    ["AK", "AL", "AR", "AZ", "CA", "CO", "CT", "DE", "FL", "GA", "HI", "IA", "ID", "IL",
+     "IN", "KS", "KY", "LA", "MA", "MD", "ME", "MI", "MN", "MO", "MS", "MT", "NC", "ND",
+     "NE", "NH", "NJ", "NM", "NV", "NY", "OH", "OK", "OR", "PA", "RI", "SC", "SD", "TN",
+     "TX", "UT", "VA", "VT", "WA", "WI", "WV", "WY"],
+    [str(n) for n in range(1, 21)],
+    ["Single", "Married", "Divorced", "Widowed", "Separated", "Domestic Partner"],
+    ["No Coverage", "100", "250", "500", "1000", "2500"],
+    ["15/30", "25/50", "50/100", "100/300", "250/500", "500/500"],
+]
+
+
+def generate_synthetic(n, seed=0):
+    """HTML page with n dropdown controls in the markup mix EZLynx uses:
+    native selects, mat-selects in form fields, owned-listbox comboboxes,
+    Kendo dropdowns and grid-label selects. Option lists repeat, and about
+    one label in ten is a duplicate, so the dedupe paths get exercised."""
+    rng = random.Random(seed)
+    parts = []
+    for i in range(n):
+        label = f"Field {i - 1 if i % 10 == 9 else i}"
+        opts = _OPTION_SETS[rng.randrange(len(_OPTION_SETS))]
+        if rng.random() < 0.1:
+            opts = opts + [f"Extra {i}"]
+        kind = i % 5
+        if kind == 0:
+            items = "".join(f"<option>{o}</option>" for o in opts)
+            parts.append(f'<div class="row"><label for="sel{i}">{label}</label>'
+                         f'<select id="sel{i}"><option value="">Select</option>{items}</select></div>')
+        elif kind == 1:
+            items = "".join(f"<mat-option>{o}</mat-option>" for o in opts)
+            parts.append(f'<mat-form-field class="mat-form-field"><div class="mat-form-field-wrapper">'
+                         f'<mat-select id="mat-select-{i}" role="listbox" aria-labelledby="lbl{i}">{items}'
+                         f'</mat-select><label id="lbl{i}" class="mat-form-field-label" '
+                         f'for="mat-select-{i}">{label}</label></div></mat-form-field>')
+        elif kind == 2:
+            items = "".join(f'<li role="option">{o}</li>' for o in opts)
+            parts.append(f'<div class="row"><span id="lbl{i}">{label}</span>'
+                         f'<div role="combobox" aria-labelledby="lbl{i}" aria-owns="list{i}">-</div>'
+                         f'<ul id="list{i}" style="display: none">{items}</ul></div>')
+        elif kind == 3:
+            items = "".join(f'<li class="k-item">{o}</li>' for o in opts)
+            parts.append(f'<div class="row"><span class="k-dropdown" aria-label="{label}">'
+                         f'<ul>{items}</ul></span></div>')
+        else:
+            items = "".join(f"<option>{o}</option>" for o in opts)
+            parts.append(f'<div class="grid"><span>{label}</span><div class="cell">'
+                         f'<select name="f{i}">{items}</select></div></div>')
+    return ("<!DOCTYPE html><html><head><title>synthetic</title></head><body>"
+            "<h1 class=\"page-title\">Synthetic</h1>" + "\n".join(parts) +
+            '<div class="cdk-overlay-container"></div></body></html>')
+
+
+def load_cases(fixture_dir, synthetic):
+    cases = []
+    for path in sorted(glob.glob(os.path.join(fixture_dir, "*.html"))):
+        with open(path, "r", encoding="utf-8") as f:
+            cases.append((os.path.basename(path), f.read()))
+    for n in synthetic:
+        cases.append((f"synthetic-{n}", generate_synthetic(n)))
+    return cases
+
+
+def bench_case(page, name, html, runs, latency_ms, prepopulate):
+    page.set_content(html)
+    controls = page.evaluate(f"document.querySelectorAll({json.dumps(CONTROLS_SELECTOR)}).length")
+
+    row = {"case": name, "controls": controls}
+    if prepopulate:
+        page.evaluate(OVERLAY_SHIM_JS, latency_ms)
+        t0 = time.perf_counter()
+        timed_out = click_all_dropdowns_to_populate(page)
+        row["prepopulate_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+        row["timed_out"] = len(timed_out)
+
+    in_page, round_trip = [], []
+    result = {}
+    for _ in range(runs):
+        page.set_content(html)
+        t0 = time.perf_counter()
+        timed = page.evaluate(TIMED_SCRAPE_JS)
+        round_trip.append((time.perf_counter() - t0) * 1000)
+        in_page.append(timed["ms"])
+        result = timed["result"]
+
+    dropdowns = result.get("dropdowns", {})
+    scrape_ms = statistics.median(round_trip)
+    encoded = json.dumps(encode_schema(dropdowns), ensure_ascii=False).encode("utf-8")
+    row.update({
+        "scrape_ms": round(scrape_ms, 2),
+        "scrape_in_page_ms": round(statistics.median(in_page), 2),
+        "scrape_min_ms": round(min(round_trip), 2),
+        "controls_per_s": round(controls / (scrape_ms / 1000)) if scrape_ms else 0,
+        "dropdowns": len(dropdowns),
+        "distinct_lists": len({json.dumps(v) for v in dropdowns.values()}),
+        "schema_bytes": len(encoded),
+    })
+    return row
+
+
+def print_table(rows, prepopulate):
+    cols = [("case", 28), ("controls", 9), ("scrape_ms", 10), ("scrape_in_page_ms", 11),
+            ("controls_per_s", 11), ("dropdowns", 10), ("schema_bytes", 12)]
+    if prepopulate:
+        cols += [("prepopulate_ms", 15), ("timed_out", 9)]
+    heads = {"scrape_in_page_ms": "in-page ms", "controls_per_s": "ctrl/s",
+             "schema_bytes": "schema B", "prepopulate_ms": "prepopulate ms",
+             "timed_out": "timed out"}
+    print("  ".join(heads.get(c, c).rjust(w) if c != "case" else c.ljust(w) for c, w in cols))
+    for r in rows:
+        print("  ".join(str(r.get(c, "")).rjust(w) if c != "case" else str(r[c])[:w].ljust(w)
+                        for c, w in cols))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the EZLynx scraper against recorded and synthetic DOMs"
+    )
+    parser.add_argument(
+        "--fixtures",
+        default=FIXTURE_DIR,
+        help="Directory of *.html DOM snapshots (default: tests/fixtures/ezlynx-dom)",
+    )
+    parser.add_argument(
+        "--synthetic",
+        type=int,
+        nargs="*",
+        default=DEFAULT_SYNTHETIC,
+        metavar="N",
+        help=f"Also bench generated pages with N controls each (default: {DEFAULT_SYNTHETIC})",
+    )
+    parser.add_argument(
+        "--runs",
+        type=int,
+        default=DEFAULT_RUNS,
+        help=f"SCRAPE_JS runs per case, median reported (default: {DEFAULT_RUNS})",
+    )
+    parser.add_argument(
+        "--latency-ms",
+        type=int,
+        default=DEFAULT_LATENCY_MS,
+        help=f"Simulated option-load latency per dropdown open (default: {DEFAULT_LATENCY_MS})",
+    )
+    parser.add_argument(
+        "--no-prepopulate",
+        action="store_true",
+        help="Skip the click_all_dropdowns_to_populate step (it dominates on large pages)",
+    )
+    parser.add_argument(
+        "--json",
+        metavar="FILE",
+        help="Also write the results to FILE",
+    )
+    args = parser.parse_args()
+
+    cases = load_cases(args.fixtures, args.synthetic)
+    if not cases:
+        parser.error(f"no *.html fixtures in {args.fixtures} and no --synthetic sizes")
+    prepopulate = not args.no_prepopulate
+
+    print(f"--- Scraper benchmark: {len(cases)} case(s), {args.runs} run(s) each"
+          f"{f', {args.latency_ms}ms option latency, {PREPOPULATE_CAP_MS}ms cap' if prepopulate else ''} ---")
+    rows = []
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=True)
+        page = browser.new_page()
+        for name, html in cases:
+            rows.append(bench_case(page, name, html, args.runs, args.latency_ms, prepopulate))
+        browser.close()
+
+    print()
+    print_table(rows, prepopulate)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"runs": args.runs, "latency_ms": args.latency_ms, "results": rows}, f, indent=2)
+        print(f"\n[*] Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -11,29 +11,63 @@ dropdown components used by EZLynx.
 Usage:
     python ezlynx_filler.py
     python ezlynx_filler.py --client client_data.json --schema ezlynx_schema.json
+    python ezlynx_filler.py --direct-write   # batch-set mat-selects via Angular, UI fallback
+    python ezlynx_filler.py --tabs <auto-quote-url> <home-quote-url>   # parallel tabs
+    python ezlynx_filler.py --fast-start     # compiled schema, reopen last page, timing breakdown
+    python ezlynx_filler.py --profile        # trace + cProfile zip per fill
 """
 
+import time
+
+_MODULE_T0 = time.perf_counter()  # before the imports, so "module import" includes them
+
 import argparse
 import difflib
+import io
 import json
 import os
 import sys
-import time
+import tempfile
+import threading
+
+from ezlynx_schema_store import (
+    CASCADES_KEY, COMPILED_SUFFIX, cascade_key, compile_schema, content_sha1, decode_schema,
+    load_compiled, mappings_sha1, save_compiled,
+)
 
 # Fix Windows console encoding
 if sys.platform == 'win32':
     sys.stdout.reconfigure(encoding='utf-8', errors='replace')
     sys.stderr.reconfigure(encoding='utf-8', errors='replace')
 
-try:
-    from playwright.sync_api import sync_playwright, TimeoutError as PWTimeout
-except ImportError:
-    print(
-        "ERROR: playwright is not installed.\n"
-        "  Run:  pip install playwright && python -m playwright install chromium",
-        file=sys.stderr,
-    )
-    sys.exit(1)
+
+class _PlaywrightNotLoaded(Exception):
+    """Placeholder for PWTimeout until load_playwright() runs — keeps the
+    module's `except PWTimeout:` clauses valid without importing Playwright."""
+
+
+# Playwright is imported lazily by load_playwright() (~100ms of the startup
+# budget) so --help, schema loading and the profile checks don't pay for it.
+sync_playwright = None
+PWTimeout = _PlaywrightNotLoaded
+
+
+def load_playwright():
+    """Import Playwright on first use and bind the module-level names."""
+    global sync_playwright, PWTimeout
+    if sync_playwright is not None:
+        return
+    try:
+        from playwright.sync_api import sync_playwright as _sync_playwright
+        from playwright.sync_api import TimeoutError as _PWTimeout
+    except ImportError:
+        print(
+            "ERROR: playwright is not installed.\n"
+            "  Run:  pip install -r requirements.txt && python -m playwright install chromium",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+    sync_playwright, PWTimeout = _sync_playwright, _PWTimeout
 
 
 EZLYNX_URL = "https://app.ezlynx.com"
@@ -927,6 +961,401 @@ GET_SELECT_OPTIONS_JS = """
 }
 """
 
+# Direct-write mode: set every mat-select on the subpage through its
+# Angular component, skipping the arrow-click ladder, overlay wait and
+# typeahead entirely. The MatSelect instance is reached via
+# window.ng.getComponent (dev builds / exposed debug API) or the legacy
+# LView array on __ngContext__ (Angular <= 13). Production builds that
+# expose neither return status 'no-component' and the caller falls back
+# to the UI-driven path for that field.
+#
+# Two evaluates per wave: READ_MAT_SELECT_OPTIONS_JS lists each control's
+# options (Python picks the option, see pick_direct_option), then
+# DIRECT_WRITE_MAT_SELECTS_JS selects exactly that option text.
+_FIND_MAT_SELECT_JS = """
+    function norm(s) { return (s || '').replace(/\\s+/g, ' ').trim().toLowerCase(); }
+
+    function isMatSelect(c, el) {
+        return !!c && typeof c === 'object' && !!c.options &&
+               typeof c.open === 'function' &&
+               (!c._elementRef || c._elementRef.nativeElement === el);
+    }
+
+    function findMatSelect(el) {
+        if (window.ng && typeof window.ng.getComponent === 'function') {
+            try {
+                const c = window.ng.getComponent(el);
+                if (isMatSelect(c, el)) return c;
+            } catch (e) {}
+        }
+        const ctx = el.__ngContext__;
+        if (Array.isArray(ctx)) {
+            for (const item of ctx) {
+                if (isMatSelect(item, el)) return item;
+            }
+        }
+        return null;
+    }
+"""
+
+# fields: [{key, selector}], waitMs: how long to poll for options that a
+# parent dropdown's change is still loading (dependent dropdowns).
+READ_MAT_SELECT_OPTIONS_JS = """
+async ({fields, waitMs}) => {
+""" + _FIND_MAT_SELECT_JS + """
+    function scan() {
+        const results = {};
+        for (const f of fields) {
+            const el = document.querySelector(f.selector);
+            if (!el) { results[f.key] = { status: 'no-element' }; continue; }
+            const comp = findMatSelect(el);
+            if (!comp) { results[f.key] = { status: 'no-component' }; continue; }
+            const options = comp.options && comp.options.toArray ? comp.options.toArray() : [];
+            if (!options.length) { results[f.key] = { status: 'no-options' }; continue; }
+            results[f.key] = { status: 'ok', options: options.map(o => (o.viewValue || '').trim()) };
+        }
+        return results;
+    }
+    const deadline = performance.now() + (waitMs || 0);
+    let results = scan();
+    while (performance.now() < deadline &&
+           Object.values(results).some(r => r.status === 'no-options')) {
+        await new Promise(r => setTimeout(r, 50));
+        results = scan();
+    }
+    return results;
+}
+"""
+
+# fields: [{key, selector, text}] — text is the exact option to select.
+DIRECT_WRITE_MAT_SELECTS_JS = """
+async (fields) => {
+""" + _FIND_MAT_SELECT_JS + """
+    const results = {};
+    const touched = [];
+    for (const f of fields) {
+        const el = document.querySelector(f.selector);
+        if (!el) { results[f.key] = { status: 'no-element' }; continue; }
+        const comp = findMatSelect(el);
+        if (!comp) { results[f.key] = { status: 'no-component' }; continue; }
+        const options = comp.options && comp.options.toArray ? comp.options.toArray() : [];
+        const want = norm(f.text);
+        const opt = options.find(o => norm(o.viewValue) === want);
+        if (!opt) { results[f.key] = { status: 'no-match', optionsCount: options.length }; continue; }
+        try {
+            if (typeof opt._selectViaInteraction === 'function') {
+                // Same path a user click takes — emits selectionChange and
+                // propagates through the ControlValueAccessor, so cascades
+                // (Industry -> Occupation) see a normal value change.
+                opt._selectViaInteraction();
+            } else if (comp.ngControl && comp.ngControl.control) {
+                comp.ngControl.control.setValue(opt.value);
+                comp.ngControl.control.markAsDirty();
+            } else {
+                comp.value = opt.value;
+            }
+            touched.push(comp);
+            results[f.key] = {
+                status: 'written',
+                matchedText: (opt.viewValue || '').trim(),
+                optionsCount: options.length,
+            };
+        } catch (e) {
+            results[f.key] = { status: 'error', error: String(e) };
+        }
+    }
+
+    // Trigger change detection once for the whole batch.
+    for (const comp of touched) {
+        try {
+            if (window.ng && typeof window.ng.applyChanges === 'function') {
+                window.ng.applyChanges(comp);
+            } else if (comp._changeDetectorRef) {
+                comp._changeDetectorRef.markForCheck();
+            }
+            if (comp.stateChanges && typeof comp.stateChanges.next === 'function') {
+                comp.stateChanges.next();
+            }
+        } catch (e) {}
+    }
+    // Two frames: one for Angular's render pass, one for the value text.
+    await new Promise(r => requestAnimationFrame(() => requestAnimationFrame(r)));
+    return results;
+}
+"""
+
+# Batched read-back of the displayed value on a list of mat-selects.
+# One round-trip replaces N per-field _verify_value_committed calls.
+READ_MAT_SELECT_VALUES_JS = """
+(selectors) => {
+    const out = {};
+    for (const sel of selectors) {
+        const el = document.querySelector(sel);
+        if (!el) { out[sel] = null; continue; }
+        const cls = el.className || '';
+        const valEl = el.querySelector('.mat-mdc-select-min-line')
+                   || el.querySelector('.mat-mdc-select-value-text')
+                   || el.querySelector('.mat-select-value-text');
+        out[sel] = {
+            empty: cls.includes('mat-mdc-select-empty'),
+            ariaInvalid: el.getAttribute('aria-invalid'),
+            text: valEl ? (valEl.textContent || '').trim() : '',
+        };
+    }
+    return out;
+}
+"""
+
+
+# Click an option in the open CDK overlay in one round-trip. Tries the
+# cached index first (guarded by a text check, since live lists can carry
+# placeholder rows the schema filtered out), then an exact-text scan.
+CLICK_OVERLAY_OPTION_JS = """
+(args) => {
+    function norm(s) { return (s || '').replace(/\\s+/g, ' ').trim().toLowerCase(); }
+    const opts = Array.from(document.querySelectorAll(args.selector));
+    const want = norm(args.text);
+    let el = null;
+    if (args.index >= 0 && opts[args.index] && norm(opts[args.index].textContent) === want) {
+        el = opts[args.index];
+    }
+    if (!el) el = opts.find(o => norm(o.textContent) === want) || null;
+    if (!el) return null;
+    el.click();
+    return (el.textContent || '').trim();
+}
+"""
+
+# Typeahead strategy thresholds — see choose_typeahead_strategy().
+TYPEAHEAD_CHAR_DELAY_MS = 30
+TYPEAHEAD_CLICK_MAX_OPTIONS = 8    # short lists: click the option directly
+TYPEAHEAD_INDEX_MIN_OPTIONS = 30   # long name lists: jump by cached index
+TYPEAHEAD_CODE_MAX_LEN = 5         # "WA", "HO3", "12" — code-style lists
+
+
+def _unique_prefix(option, options):
+    """Shortest prefix of `option` that no other option starts with.
+    Typeahead on a unique prefix lands on the same option regardless of
+    which option is currently active. Falls back to the full text."""
+    lo = option.lower()
+    others = [o.lower() for o in options if o.lower() != lo]
+    for n in range(1, len(lo) + 1):
+        p = lo[:n]
+        if not any(o.startswith(p) for o in others):
+            return option[:n]
+    return option
+
+
+def choose_typeahead_strategy(target, expanded, schema_options):
+    """
+    Pick the cheapest way to commit `target` in an open mat-select overlay,
+    using the cached (scraped) option list for this dropdown.
+
+    Returns {'strategy', 'keys', 'option', 'index', 'saved_ms'}:
+      type   — type the raw target (no cache hit; legacy behavior)
+      prefix — code-style list: type the unique shortest prefix
+      index  — long name list: click the option at its cached index
+      click  — short list: click the option by text
+    saved_ms is an estimate, not a measurement: the modeled keystroke time
+    saved vs. typing the raw target.
+    """
+    raw_cost_ms = len(target) * TYPEAHEAD_CHAR_DELAY_MS + 80
+    plan = {'strategy': 'type', 'keys': target, 'option': None, 'index': -1, 'saved_ms': 0}
+    options = [o for o in (schema_options or []) if isinstance(o, str) and o.strip()]
+    if not options:
+        return plan
+
+    index = -1
+    for attempt in (target, expanded):
+        al = attempt.lower()
+        index = next((i for i, o in enumerate(options) if o.strip().lower() == al), -1)
+        if index >= 0:
+            break
+    if index < 0:
+        return plan
+
+    option = options[index].strip()
+    plan.update(option=option, index=index)
+    if len(options) <= TYPEAHEAD_CLICK_MAX_OPTIONS:
+        plan.update(strategy='click', keys='', saved_ms=raw_cost_ms)
+    elif all(len(o.strip()) <= TYPEAHEAD_CODE_MAX_LEN and ' ' not in o.strip() for o in options):
+        prefix = _unique_prefix(option, [o.strip() for o in options])
+        plan.update(strategy='prefix', keys=prefix,
+                    saved_ms=max(0, raw_cost_ms - (len(prefix) * TYPEAHEAD_CHAR_DELAY_MS + 80)))
+    elif len(options) >= TYPEAHEAD_INDEX_MIN_OPTIONS:
+        plan.update(strategy='index', keys='', saved_ms=raw_cost_ms)
+    return plan
+
+
+def _value_matches_pool(data, expected_pool, exact=False):
+    """Compare a mat-select read-back against the values we tried to set.
+    Returns True (stuck), False (empty / different value), None (unknown).
+    exact=True requires the displayed text to equal one of the values
+    (whitespace / case aside) instead of containing or being contained."""
+    if not data:
+        return None
+    if data.get('empty') or data.get('ariaInvalid') == 'true':
+        return False
+    text = ' '.join((data.get('text') or '').split()).lower()
+    if not text:
+        return False
+    for needle in expected_pool:
+        if not needle:
+            continue
+        n = ' '.join(needle.split()).lower()
+        if n == text or (not exact and (n in text or text in n)):
+            return True
+    return False  # has some text but not what we expected
+
+
+# Dropdowns whose option list is loaded from the value of another one.
+# Direct write sets parents in an earlier wave than their dependents, and
+# when the scraper crawled the pair (--cascade) the dependent is matched
+# against the child list recorded for the client's parent value.
+DROPDOWN_PARENTS = {
+    "Occupation": "Industry",
+    "PrimaryAddressCounty": "State",
+}
+DIRECT_FUZZY_CUTOFF = 0.85   # difflib ratio for a direct-write fuzzy pick
+DIRECT_DEPENDENT_WAIT_MS = 1500
+
+
+def pick_direct_option(options, target, expanded, schema_options=None):
+    """
+    The option to direct-write for `target`, in smart_select_custom's
+    order: exact, then fuzzy (difflib). Candidates are the live options,
+    narrowed to schema_options when the schema knows this dropdown. There
+    is no substring step — "No" must not land on "None" — and a fuzzy hit
+    has to clear DIRECT_FUZZY_CUTOFF. Returns (option, 'exact' | 'fuzzy')
+    or (None, None), which leaves the field to the UI path.
+    """
+    options = [o for o in options if o]
+    if schema_options:
+        known = {' '.join(str(o).split()).lower() for o in schema_options if o}
+        options = [o for o in options if ' '.join(o.split()).lower() in known]
+    by_norm = {' '.join(o.split()).lower(): o for o in options}
+    for attempt in (target, expanded):
+        hit = by_norm.get(' '.join(attempt.split()).lower())
+        if hit:
+            return hit, 'exact'
+    for attempt in (expanded, target):
+        matches = difflib.get_close_matches(attempt.lower(), list(by_norm), n=1, cutoff=DIRECT_FUZZY_CUTOFF)
+        if matches:
+            return by_norm[matches[0]], 'fuzzy'
+    return None, None
+
+
+def direct_write_mat_selects(page, fields):
+    """
+    Write a batch of mat-select values through Angular's form controls.
+
+    fields: list of (key, selector, value, schema_options) — selector must
+    be the known element ID from SUBPAGE_FIELD_IDS; label search is not
+    attempted here. Dependent dropdowns (DROPDOWN_PARENTS) go in a later
+    wave than their parent, once the parent committed, and wait for their
+    options to load.
+
+    Returns {key: (committed: bool, diag: dict)}. Fields that did not
+    commit carry the reason in diag['error'] and should go through
+    smart_select_custom as usual.
+    """
+    pending = {}
+    for key, selector, value, schema_options in fields:
+        target = (value or '').strip()
+        if not target or not selector:
+            continue
+        expanded = ABBREVIATIONS.get(target.upper(), target)
+        pending[key] = (selector, target, expanded, schema_options)
+
+    results = {}
+    wait_ms = 0
+    while pending:
+        wave = {k: v for k, v in pending.items() if DROPDOWN_PARENTS.get(k) not in pending}
+        for key in wave:
+            del pending[key]
+        # A dependent whose parent didn't commit keeps the UI path's order
+        for key, (selector, target, expanded, _) in list(wave.items()):
+            parent = DROPDOWN_PARENTS.get(key)
+            if parent in results and not results[parent][0]:
+                results[key] = (False, _direct_diag(selector, target, expanded, {'status': 'parent-failed'}))
+                del wave[key]
+        if wave:
+            results.update(_direct_write_wave(page, wave, wait_ms))
+        wait_ms = DIRECT_DEPENDENT_WAIT_MS
+    return results
+
+
+def _direct_diag(selector, target, expanded, r):
+    diag = {'method': 'direct', 'target': target,
+            'expanded': expanded if expanded != target else None,
+            'label_found': True, 'match_via': 'priority-id',
+            'dropdown_type': 'mat-select', 'dropdown_id': selector.lstrip('#'),
+            'direct_status': r.get('status'),
+            'options_count': r.get('optionsCount', 0),
+            'options_sample': r.get('optionsSample', []),
+            'match_method': None, 'matched_text': r.get('matchedText'),
+            'error': None}
+    if r.get('status') != 'written':
+        diag['error'] = f"ERR_DIRECT_{(r.get('status') or 'unknown').upper().replace('-', '_')}"
+    return diag
+
+
+def _direct_write_wave(page, wave, wait_ms):
+    """One read-options / pick / write / read-back round for `wave`."""
+    results = {}
+    try:
+        listed = page.evaluate(READ_MAT_SELECT_OPTIONS_JS, {
+            'fields': [{'key': k, 'selector': v[0]} for k, v in wave.items()],
+            'waitMs': wait_ms,
+        }) or {}
+        picks = {}
+        batch = []
+        for key, (selector, target, expanded, schema_options) in wave.items():
+            r = listed.get(key) or {}
+            if r.get('status') != 'ok':
+                continue
+            option, how = pick_direct_option(r['options'], target, expanded, schema_options)
+            if option is None:
+                listed[key] = {'status': 'no-match', 'optionsCount': len(r['options']),
+                               'optionsSample': r['options'][:8]}
+                continue
+            picks[key] = how
+            batch.append({'key': key, 'selector': selector, 'text': option})
+        written = {}
+        if batch:
+            written = page.evaluate(DIRECT_WRITE_MAT_SELECTS_JS, batch) or {}
+    except Exception as e:
+        for key, (selector, target, expanded, _) in wave.items():
+            diag = _direct_diag(selector, target, expanded, {})
+            diag['error'] = f'ERR_DIRECT_WRITE: {e}'
+            results[key] = (False, diag)
+        return results
+
+    # Single batched read-back for every field the write step touched.
+    selectors = [wave[k][0] for k, r in written.items() if r and r.get('status') == 'written']
+    readback = {}
+    if selectors:
+        try:
+            readback = page.evaluate(READ_MAT_SELECT_VALUES_JS, selectors) or {}
+        except Exception:
+            readback = {}
+
+    for key, (selector, target, expanded, _) in wave.items():
+        r = written.get(key) or listed.get(key) or {}
+        diag = _direct_diag(selector, target, expanded, r)
+        if r.get('status') != 'written':
+            results[key] = (False, diag)
+            continue
+        verified = _value_matches_pool(readback.get(selector), [r.get('matchedText')], exact=True)
+        if verified is True:
+            diag['match_method'] = f'direct-{picks[key]}'
+            diag['verified'] = True
+            results[key] = (True, diag)
+        else:
+            diag['error'] = 'ERR_DIRECT_NOT_PERSISTED'
+            results[key] = (False, diag)
+    return results
+
 
 def smart_select_native(page, selectors, target_value, schema_options=None):
     """Select a value in a native <select> element using fuzzy matching.
@@ -1276,20 +1705,7 @@ def smart_select_custom(page, label_patterns, target_value, schema_options=None,
             """, dd_id)
         except Exception:
             return None
-        if not data:
-            return None
-        if data.get('empty') or data.get('ariaInvalid') == 'true':
-            return False
-        text = (data.get('text') or '').lower()
-        if not text:
-            return False
-        for needle in expected_pool:
-            if not needle:
-                continue
-            n = needle.lower()
-            if n == text or n in text or text in n:
-                return True
-        return False  # has some text but not what we expected
+        return _value_matches_pool(data, expected_pool)
 
     # Step 3b: Try keyboard shortcut first (faster for long lists like States)
     # Angular Material mat-selects support typing to jump to matching options.
@@ -1315,22 +1731,44 @@ def smart_select_custom(page, label_patterns, target_value, schema_options=None,
             pass
         return False, diag
 
+    # Pick the cheapest way to commit the value from the cached option
+    # list (see choose_typeahead_strategy). Without schema options, or when
+    # the cached list has no exact hit, this is the raw-type path below.
+    plan = choose_typeahead_strategy(target, expanded, schema_options)
+    diag['typeahead_strategy'] = plan['strategy']
+
     try:
-        # Type the RAW target to filter/jump, then press Enter.
-        # Material typeahead matches either way — typing "WA" narrows
-        # to "WA" (code-style options) AND to "Washington" (name-style
-        # options, by first-letter jumping). Typing the expanded form
-        # ("Washington") only works for name-style dropdowns and breaks
-        # silently on code dropdowns like State, where it fails verify
-        # and forces a slow re-open/option-click fallback (~5s).
-        # The expanded form is still used by the option-click fuzzy
-        # matcher in the fallback path, so we don't lose that capability.
-        type_value = target
-        # 30ms per char (was 50). Material typeahead's debounce is ~10ms;
-        # 30ms is comfortably above that and shaves ~100ms off a 5-char value.
-        page.keyboard.type(type_value, delay=30)
-        time.sleep(0.08)  # Brief pause for typeahead filter (was 0.15)
-        page.keyboard.press("Enter")
+        t_typeahead = time.time()
+        if plan['strategy'] in ('click', 'index'):
+            # One in-page round-trip: click the option straight from the
+            # open overlay — by cached index when it still lines up, else
+            # by exact text. No keystrokes, no typeahead debounce.
+            picked = page.evaluate(CLICK_OVERLAY_OPTION_JS, {
+                'selector': OPTION_SEL, 'text': plan['option'], 'index': plan['index'],
+            })
+            if not picked:
+                # Cached option isn't in the live overlay (stale schema) —
+                # recorded so the FAIL REPORT shows why the fallback ran.
+                diag['typeahead_cache_miss'] = True
+                raise LookupError('cached option not in overlay')
+            type_value = picked
+        else:
+            # Type the RAW target (or its unique shortest prefix) to jump,
+            # then press Enter. Material typeahead matches either way —
+            # typing "WA" narrows to "WA" (code-style options) AND to
+            # "Washington" (name-style options, by first-letter jumping).
+            # Typing the expanded form ("Washington") only works for
+            # name-style dropdowns and breaks silently on code dropdowns
+            # like State, where it fails verify and forces a slow
+            # re-open/option-click fallback (~5s). The expanded form is
+            # still used by the option-click fuzzy matcher in the fallback
+            # path, so we don't lose that capability.
+            type_value = plan['keys']
+            # 30ms per char (was 50). Material typeahead's debounce is ~10ms;
+            # 30ms is comfortably above that and shaves ~100ms off a 5-char value.
+            page.keyboard.type(type_value, delay=TYPEAHEAD_CHAR_DELAY_MS)
+            time.sleep(0.08)  # Brief pause for typeahead filter (was 0.15)
+            page.keyboard.press("Enter")
         # Wait for overlay to close (indicates successful selection)
         try:
             page.wait_for_selector(
@@ -1351,16 +1789,17 @@ def smart_select_custom(page, label_patterns, target_value, schema_options=None,
             # Verify the value actually persisted before declaring success.
             # When verification is impossible (no dd_id), trust the overlay
             # close and continue — preserves prior behavior for legacy paths.
-            verified = _verify_value_committed([type_value, expanded, target])
-            if verified is True:
-                diag['match_method'] = 'keyboard'
-                diag['matched_text'] = type_value
-                diag['verified'] = True
-                return True, diag
-            elif verified is None:
-                diag['match_method'] = 'keyboard'
-                diag['matched_text'] = type_value
-                diag['verified'] = 'unknown'
+            # A typed prefix is deliberately NOT in the pool — "W" would
+            # substring-match "Washington" and "Wisconsin" alike.
+            matched = plan.get('option') or type_value
+            verified = _verify_value_committed([matched, expanded, target])
+            if verified is not False:
+                elapsed_ms = (time.time() - t_typeahead) * 1000
+                diag['match_method'] = 'keyboard' if plan['strategy'] in ('type', 'prefix') else plan['strategy']
+                diag['matched_text'] = matched
+                diag['verified'] = True if verified is True else 'unknown'
+                diag['typeahead_ms'] = round(elapsed_ms)
+                diag['typeahead_est_saved_ms'] = plan['saved_ms']
                 return True, diag
             # verified is False — overlay closed but value did NOT stick.
             # Don't return success; fall through to direct option-click below.
@@ -1368,6 +1807,9 @@ def smart_select_custom(page, label_patterns, target_value, schema_options=None,
     except Exception:
         pass
 
+    # Reaching here means the chosen strategy didn't commit — nothing saved.
+    diag['typeahead_est_saved_ms'] = 0
+
     # Step 3c: If keyboard typing didn't persist, re-open the dropdown so
     # Step 4 can find options and click one directly. Use the same chevron-
     # first click ladder as the initial open — force-click on the wrapper
@@ -1622,8 +2064,936 @@ def fill_text_by_label(page, label_text: str, value: str) -> bool:
     return False
 
 
-def run(client_file: str, schema_file: str):
+# ── In-browser toolbar (injected into EZLynx page) ──
+FILLER_TOOLBAR = """
+(function() {
+    if (document.getElementById('_altech_filler_toolbar')) return;
+    const bar = document.createElement('div');
+    bar.id = '_altech_filler_toolbar';
+    bar.style.cssText = 'position:absolute;width:0;height:0;overflow:hidden;pointer-events:none;';
+    bar.innerHTML = `
+        <div id="_altech_filler_inner" style="
+            position:fixed; top:8px; left:50%; transform:translateX(-50%); z-index:999999;
+            background:rgba(22,33,62,0.95); color:#fff;
+            padding:6px 14px; border-radius:10px;
+            box-shadow:0 4px 20px rgba(0,0,0,0.35); font-family:-apple-system,BlinkMacSystemFont,sans-serif;
+            display:flex; align-items:center; gap:8px;
+            border:1px solid rgba(255,255,255,0.12);
+            cursor:grab; user-select:none; font-size:12px;
+            max-width:calc(100vw - 40px); box-sizing:border-box;
+            contain:layout; pointer-events:auto;
+        ">
+            <span style="font-weight:700; font-size:12px;">
+                Altech Filler
+            </span>
+            <button id="_altech_fill_btn" style="
+                background:#007AFF; color:#fff; border:none; border-radius:6px;
+                padding:5px 12px; font-size:11px; font-weight:600; cursor:pointer;
+            ">Fill Now</button>
+            <button id="_altech_close_btn" style="
+                background:#ff3b30; color:#fff; border:none; border-radius:6px;
+                padding:5px 12px; font-size:11px; font-weight:600; cursor:pointer;
+            ">Close</button>
+            <span id="_altech_filler_status" style="
+                color:rgba(255,255,255,0.5); font-size:10px; max-width:260px;
+                overflow:hidden; text-overflow:ellipsis; white-space:nowrap;
+            ">Navigate to the form, then click Fill Now.</span>
+        </div>
+    `;
+    document.body.appendChild(bar);
+    window._altech_filler_action = '';
+
+    // ── Draggable ──
+    var inner = document.getElementById('_altech_filler_inner');
+    var dragging = false, dx = 0, dy = 0;
+    inner.addEventListener('mousedown', function(e) {
+        if (e.target.tagName === 'BUTTON') return;
+        dragging = true;
+        dx = e.clientX - inner.getBoundingClientRect().left;
+        dy = e.clientY - inner.getBoundingClientRect().top;
+        inner.style.cursor = 'grabbing';
+        e.preventDefault();
+    });
+    document.addEventListener('mousemove', function(e) {
+        if (!dragging) return;
+        inner.style.left = (e.clientX - dx) + 'px';
+        inner.style.top = (e.clientY - dy) + 'px';
+        inner.style.transform = 'none';
+    });
+    document.addEventListener('mouseup', function() {
+        dragging = false;
+        if (inner) inner.style.cursor = 'grab';
+    });
+
+    document.getElementById('_altech_fill_btn').addEventListener('click', function(e) {
+        e.stopPropagation();
+        window._altech_filler_action = 'fill';
+        this.textContent = 'Filling...';
+        this.style.background = '#555';
+        this.disabled = true;
+    });
+    document.getElementById('_altech_close_btn').addEventListener('click', function(e) {
+        e.stopPropagation();
+        window._altech_filler_action = 'close';
+        this.textContent = 'Closing...';
+        this.style.background = '#555';
+        this.disabled = true;
+    });
+})();
+"""
+
+
+def inject_filler_toolbar(pg):
+    try:
+        pg.evaluate(FILLER_TOOLBAR)
+    except Exception:
+        pass
+
+
+def update_filler_status(pg, text):
+    try:
+        pg.evaluate(f"""(() => {{
+            const s = document.getElementById('_altech_filler_status');
+            if (s) s.textContent = {json.dumps(text)};
+        }})()""")
+    except Exception:
+        pass
+
+
+def reset_fill_btn(pg):
+    try:
+        pg.evaluate("""(() => {
+            const btn = document.getElementById('_altech_fill_btn');
+            if (btn) { btn.textContent = 'Fill Again'; btn.style.background = '#007AFF'; btn.disabled = false; }
+            window._altech_filler_action = '';
+        })()""")
+    except Exception:
+        pass
+
+
+def fill_page(page, client, schema, direct_write=False, compiled=None):
+    """
+    Fill every known text field and dropdown on the current EZLynx page.
+    Returns (fill_report, total_filled, failures) — the caller owns the
+    toolbar "Done" status and button reset.
+    """
+    update_filler_status(page, "Filling text fields...")
+    page.wait_for_load_state("domcontentloaded")
+    # Wait for form inputs to be present on the page
+    try:
+        page.wait_for_selector('input, select, mat-select, [role="listbox"]',
+                               state='visible', timeout=8000)
+    except PWTimeout:
+        pass
+
+    fill_report = []  # Collect diagnostic report for all fields
+
+    # Subpage scoping for text fields too — same pattern as
+    # the dropdown loop below. Eliminates the "FirstName not
+    # found on Auto Policy Info" noise that flooded the FAIL
+    # REPORT with 8 false failures per fill.
+    _text_url = ''
+    try:
+        _text_url = page.url
+    except Exception:
+        pass
+    _text_subpage = detect_subpage(_text_url)
+    _text_allowlist = SUBPAGE_TEXT_FIELDS.get(_text_subpage)
+
+    # Fill text fields
+    print("\n[*] Filling text fields...")
+    filled = 0
+    skipped = 0
+
+    if _text_allowlist is not None:
+        text_keys_to_try = [k for k in _text_allowlist if k in TEXT_FIELD_MAP]
+        print(f"[*] Text fields scoped to {_text_subpage} ({len(text_keys_to_try)} known fields)")
+    else:
+        text_keys_to_try = list(TEXT_FIELD_MAP.keys())
+
+    for key in text_keys_to_try:
+        selectors = TEXT_FIELD_MAP[key]
+        value = client.get(key, "")
+        if not value:
+            continue
+        update_filler_status(page, f"Text: {key}...")
+        try:
+            if fill_text(page, selectors, value):
+                print(f"  [v] {key}: '{value}'")
+                fill_report.append({'field': key, 'type': 'text', 'value': value,
+                                    'status': 'OK', 'error': None})
+                filled += 1
+                time.sleep(0.05)
+            else:
+                print(f"  [x] {key}: '{value}' -> FIELD NOT FOUND on page")
+                fill_report.append({'field': key, 'type': 'text', 'value': value,
+                                    'status': 'FAIL', 'error': 'ERR_FIELD_NOT_FOUND'})
+                skipped += 1
+        except Exception as e:
+            print(f"  [!] {key}: '{value}' -> ERROR: {e}")
+            fill_report.append({'field': key, 'type': 'text', 'value': value,
+                                'status': 'ERROR', 'error': f'ERR_EXCEPTION: {e}'})
+            skipped += 1
+
+    print(f"\n     Text fields: {filled} filled, {skipped} not found")
+
+    # Fill dropdowns (page-aware: only tries labels relevant to current page)
+    current_url = ''
+    try:
+        current_url = page.url
+    except Exception:
+        pass
+    active_dropdowns = get_active_dropdowns(current_url)
+    page_context = 'auto' if '/rating/auto/' in current_url.lower() else \
+                   'home' if '/rating/home/' in current_url.lower() else \
+                   'lead' if '/lead-info' in current_url.lower() else 'applicant'
+
+    # Subpage scoping: when we know the precise EZLynx subpage
+    # (e.g. auto-policy-info), restrict the field set to ones
+    # actually on that page. Eliminates noise from trying
+    # Coverage fields on the Policy Info page, etc.
+    # When subpage is unknown, fall back to the full active map.
+    subpage = detect_subpage(current_url)
+    subpage_ids = SUBPAGE_FIELD_IDS.get(subpage)
+    if subpage_ids is not None:
+        # Allowlist mode — only try fields the subpage owns.
+        keys_to_try = [k for k in subpage_ids.keys() if k in active_dropdowns]
+        print(f"[*] Subpage detected: {subpage} ({len(keys_to_try)} known fields, {sum(1 for v in subpage_ids.values() if v)} with priority IDs)")
+    else:
+        # Unknown subpage — try everything (legacy behavior).
+        keys_to_try = list(active_dropdowns.keys())
+
+    update_filler_status(page, f"Matching dropdowns ({page_context} page, {len(keys_to_try)} mappings)...")
+    print(f"\n[*] Filling dropdowns -- page context: {page_context} ({len(keys_to_try)} mappings)")
+    dd_filled = 0
+    dd_skipped = 0
+    dd_retried = []  # Track fields that failed and need retry
+
+    # Data fallback map: when a logical field isn't in client data,
+    # synthesize it from a related field. Lets one State value in
+    # the client JSON cover both applicant-level State AND the
+    # Primary Address State without duplication.
+    CLIENT_FALLBACKS = {
+        "PrimaryAddressState": "State",
+        "PrimaryAddressCounty": "County",
+    }
+
+    def client_value(key):
+        return client.get(key, "") or client.get(CLIENT_FALLBACKS.get(key, ""), "")
+
+    def cascade_options(key, fields):
+        """The child list the cascade crawl recorded for the client's value
+        of this dropdown's parent (DROPDOWN_PARENTS), or None."""
+        parent = DROPDOWN_PARENTS.get(key)
+        parent_value = client_value(parent) if parent else ""
+        if not parent_value or not compiled.get("cascades"):
+            return None
+        child_label, parent_label = fields.get(key), fields.get(parent)
+        if not child_label or not parent_label:
+            return None
+        values = compiled["cascades"].get(cascade_key(parent_label, child_label))
+        if not values:
+            return None
+        _, parent_target = resolve_schema_options(parent, parent_value)
+        return values.get(parent_target)
+
+    def resolve_schema_options(key, value):
+        """(schema options, target) for a dropdown. The compiled artifact has
+        every field pre-resolved (preferring labels on this subpage) plus
+        an ABBREVIATIONS-aware option index; without it, scan the labels.
+        A dependent dropdown with a crawled cascade gets the child options
+        for its parent's value instead of the union the label holds."""
+        schema_options = None
+        target = value
+        if compiled is not None and key in compiled["fields"][""]:
+            fields = compiled["fields"].get(subpage) or compiled["fields"][""]
+            schema_key = fields.get(key)
+            if schema_key:
+                schema_options = schema.get(schema_key)
+                index = compiled["option_index"].get(compiled["hashes"].get(schema_key), {})
+                target = index.get(str(value).strip().lower(), value)
+            dependent_options = cascade_options(key, fields)
+            if dependent_options:
+                schema_options = dependent_options
+                wanted = str(target).strip().lower()
+                target = next((o for o in dependent_options if o.strip().lower() == wanted), target)
+        else:
+            for schema_key, opts in schema.items():
+                sk = schema_key.lower()
+                kl = key.lower()
+                if kl in sk or sk in kl:
+                    schema_options = opts
+                    break
+                for lp in active_dropdowns[key]:
+                    if lp in sk or sk in lp:
+                        schema_options = opts
+                        break
+                if schema_options:
+                    break
+        return schema_options, target
+
+    # Direct-write fast path (--direct-write): every field with a
+    # known element ID is set through its Angular form control, in
+    # waves that put parents before their dependent dropdowns. Anything
+    # without an exact or confident option match, or that didn't
+    # commit, drops through to the UI-driven loop below.
+    direct_done = set()
+    if direct_write and subpage_ids:
+        direct_fields = []
+        for key in keys_to_try:
+            value = client_value(key)
+            if value and subpage_ids.get(key):
+                schema_options, target = resolve_schema_options(key, value)
+                direct_fields.append((key, subpage_ids[key], target, schema_options))
+        if direct_fields:
+            update_filler_status(page, f"Direct-writing {len(direct_fields)} dropdown(s)...")
+            t_direct = time.time()
+            direct_results = direct_write_mat_selects(page, direct_fields)
+            for key, (ok, diag) in direct_results.items():
+                if not ok:
+                    continue
+                direct_done.add(key)
+                print(f"  [v] {key}: '{diag['target']}' -> '{diag.get('matched_text', '')}' (direct)")
+                fill_report.append({'field': key, 'type': 'dropdown', 'value': diag['target'],
+                                    'status': 'OK', 'diag': diag})
+                dd_filled += 1
+            print(f"[*] Direct write: {len(direct_done)}/{len(direct_fields)} committed "
+                  f"in {(time.time() - t_direct) * 1000:.0f}ms"
+                  f"{' — rest fall back to UI path' if len(direct_done) < len(direct_fields) else ''}")
+
+    for key in keys_to_try:
+        if key in direct_done:
+            continue
+        label_patterns = active_dropdowns[key]
+        priority_selector = subpage_ids.get(key) if subpage_ids else None
+        value = client_value(key)
+        if not value:
+            continue
+
+        update_filler_status(page, f"Dropdown: {key} = '{value}'...")
+
+        schema_options, target = resolve_schema_options(key, value)
+
+        success = False
+        diag = None
+
+        try:
+            # Try custom dropdown (Angular Material) by label first
+            success, diag = smart_select_custom(page, label_patterns, target, schema_options, priority_selector=priority_selector)
+            if success:
+                method = diag.get('match_method', 'custom')
+                matched = diag.get('matched_text', '')
+                if diag.get('typeahead_est_saved_ms'):
+                    method += f", {diag['typeahead_strategy']} est. ~{diag['typeahead_est_saved_ms']}ms saved (modeled)"
+                print(f"  [v] {key}: '{value}' -> '{matched}' ({method})")
+                fill_report.append({'field': key, 'type': 'dropdown', 'value': value,
+                                    'status': 'OK', 'diag': diag})
+                dd_filled += 1
+                # Cascade-dependent dropdowns (Occupation depends on
+                # Industry, County depends on State, etc.) need
+                # Angular change detection to commit between fills.
+                # 300ms is the minimum that empirically holds —
+                # 100ms triggered ERR_NO_OPTIONS_IN_OVERLAY on the
+                # next dependent dropdown.
+                time.sleep(0.3)
+            # Fallback to native <select> selectors
+            elif key in DROPDOWN_SELECT_MAP:
+                # Preserve custom's diag — it carries the on-page debug
+                # payload (mat_labels_on_page, dropdowns_on_page) which
+                # smart_select_native does NOT regenerate. We only swap
+                # to native's diag if native actually succeeded.
+                custom_diag = diag
+                success, native_diag = smart_select_native(page, DROPDOWN_SELECT_MAP[key], target, schema_options)
+                if success:
+                    diag = native_diag
+                    method = diag.get('match_method', 'native')
+                    matched = diag.get('matched_text', '')
+                    print(f"  [v] {key}: '{value}' -> '{matched}' ({method}, native)")
+                    fill_report.append({'field': key, 'type': 'dropdown', 'value': value,
+                                        'status': 'OK', 'diag': diag})
+                    dd_filled += 1
+                    time.sleep(0.05)
+                else:
+                    # Native fallback also failed. Keep custom's diag
+                    # (which has the debug payload) but record that
+                    # native was attempted too.
+                    diag = custom_diag or {}
+                    diag['native_attempted'] = True
+                    diag['native_error'] = native_diag.get('error') if native_diag else None
+
+            if not success:
+                err = diag.get('error', 'UNKNOWN') if diag else 'NO_DIAG'
+                opts_count = diag.get('options_count', 0) if diag else 0
+                opts_sample = diag.get('options_sample', []) if diag else []
+                expanded = diag.get('expanded') if diag else None
+                label_found = diag.get('label_found', False) if diag else False
+
+                detail = f"  [x] {key}: '{value}'"
+                if expanded:
+                    detail += f" (expanded: '{expanded}')"
+                detail += f" -> {err}"
+                if label_found:
+                    detail += f" | label found, type={diag.get('dropdown_type','?')}"
+                else:
+                    detail += f" | label NOT found (searched: {label_patterns})"
+                if opts_count > 0:
+                    detail += f" | {opts_count} options visible"
+                    if opts_sample:
+                        detail += f": [{', '.join(opts_sample[:5])}{'...' if opts_count > 5 else ''}]"
+                print(detail)
+
+                fill_report.append({'field': key, 'type': 'dropdown', 'value': value,
+                                    'status': 'FAIL', 'diag': diag})
+                dd_retried.append((key, label_patterns, value, schema_options, priority_selector, target))
+                dd_skipped += 1
+
+        except Exception as e:
+            print(f"  [!] {key}: '{value}' -> EXCEPTION: {e}")
+            fill_report.append({'field': key, 'type': 'dropdown', 'value': value,
+                                'status': 'ERROR', 'error': str(e)})
+            dd_retried.append((key, label_patterns, value, schema_options, priority_selector, target))
+            dd_skipped += 1
+
+    # ── Retry failed dropdowns (up to 1 retry with extra wait) ──
+    if dd_retried:
+        print(f"\n[*] Retrying {len(dd_retried)} failed dropdown(s) with longer wait...")
+        update_filler_status(page, f"Retrying {len(dd_retried)} failed dropdown(s)...")
+        # Wait for dependent dropdowns to render (Angular change detection)
+        try:
+            page.wait_for_load_state('networkidle', timeout=5000)
+        except PWTimeout:
+            pass
+
+        for key, label_patterns, value, schema_options, priority_selector, target in dd_retried:
+            update_filler_status(page, f"Retry: {key} = '{value}'...")
+            try:
+                success, diag = smart_select_custom(page, label_patterns, target, schema_options, priority_selector=priority_selector)
+                if not success and key in DROPDOWN_SELECT_MAP:
+                    success, diag = smart_select_native(page, DROPDOWN_SELECT_MAP[key], target, schema_options)
+
+                if success:
+                    matched = diag.get('matched_text', '')
+                    method = diag.get('match_method', '?')
+                    print(f"  [v] RETRY {key}: '{value}' -> '{matched}' ({method})")
+                    dd_filled += 1
+                    dd_skipped -= 1
+                    # Update report entry
+                    for r in fill_report:
+                        if r['field'] == key and r['status'] == 'FAIL':
+                            r['status'] = 'OK_RETRY'
+                            r['diag'] = diag
+                            break
+                    time.sleep(0.3)
+                else:
+                    err = diag.get('error', '?') if diag else '?'
+                    print(f"  [x] RETRY {key}: still failed -> {err}")
+            except Exception as e:
+                print(f"  [!] RETRY {key}: error -> {e}")
+
+    print(f"\n     Dropdowns: {dd_filled} filled, {dd_skipped} not matched")
+
+    # Extra fields — combine all dropdown label sets for the check.
+    # CLIENT_FALLBACKS source keys count as consumed too (e.g. when
+    # PrimaryAddressCounty pulls from "County", don't then warn
+    # that "County" is unmapped — it was used).
+    all_dropdown_keys = set(BASE_DROPDOWN_LABELS.keys()) | set(AUTO_DROPDOWN_LABELS.keys()) | \
+                        set(HOME_DROPDOWN_LABELS.keys()) | set(LEAD_DROPDOWN_LABELS.keys())
+    handled_keys = set(TEXT_FIELD_MAP.keys()) | all_dropdown_keys | set(CLIENT_FALLBACKS.values())
+    extra_keys = [k for k in client.keys() if k not in handled_keys and client[k]]
+    if extra_keys:
+        print(f"\n[*] {len(extra_keys)} unmapped fields: {', '.join(extra_keys)}")
+
+    total = filled + dd_filled
+    print(f"\n{'=' * 50}")
+    print(f"[OK] Form fill complete: {total} fields populated")
+    print(f"{'=' * 50}")
+
+    # ── Diagnostic Report ──
+    failures = [r for r in fill_report if r['status'] in ('FAIL', 'ERROR')]
+    if failures:
+        print(f"\n--- FILL REPORT: {len(failures)} FAILED FIELD(S) ---")
+        for r in failures:
+            field = r['field']
+            val = r['value']
+            d = r.get('diag') or {}
+            err = d.get('error', r.get('error', '?'))
+            print(f"\n  FIELD: {field}")
+            print(f"    Value sent: '{val}'")
+            if d.get('expanded'):
+                print(f"    Expanded to: '{d['expanded']}'")
+            print(f"    Error code: {err}")
+            if r['type'] == 'dropdown':
+                print(f"    Label found: {d.get('label_found', '?')}")
+                if d.get('label_found'):
+                    print(f"    Match via: {d.get('match_via', '?')}")
+                    print(f"    Dropdown type: {d.get('dropdown_type', '?')}")
+                    print(f"    Dropdown ID: {d.get('dropdown_id', 'none')}")
+                    print(f"    Overlay opened: {d.get('overlay_opened', '?')}")
+                print(f"    Options found: {d.get('options_count', 0)}")
+                if d.get('options_sample'):
+                    print(f"    Options sample: {d['options_sample']}")
+                if d.get('fuzzy_candidates'):
+                    print(f"    Fuzzy near-matches: {d['fuzzy_candidates']}")
+                # When label search fails, dump what IS on the page
+                # so the next fix can target the actual selectors.
+                if not d.get('label_found') and d.get('mat_labels_on_page'):
+                    print(f"    mat-label texts on page: {d['mat_labels_on_page']}")
+                if not d.get('label_found') and d.get('dropdowns_on_page'):
+                    print(f"    Dropdown attrs on page (first 10):")
+                    for dd_info in d['dropdowns_on_page'][:10]:
+                        print(f"      - {dd_info}")
+                # Surface the click-was-fired-but-value-didn't-stick path
+                if d.get('keyboard_attempted_but_not_persisted'):
+                    print(f"    Note: keyboard typeahead opened overlay but value didn't persist; option-click also tried")
+                if d.get('options_loaded_count') is not None:
+                    print(f"    Options visible after open (waited up to 3s): {d['options_loaded_count']}")
+                if d.get('click_method'):
+                    print(f"    Click method that opened overlay: {d['click_method']}")
+                if d.get('typeahead_strategy'):
+                    print(f"    Typeahead strategy tried: {d['typeahead_strategy']}")
+        print(f"\n{'=' * 50}")
+
+        # Mat-select inventory: at the end of any FAIL report,
+        # dump every mat-select on the page with its id, name,
+        # and current displayed value. Lets the next round see
+        # which fields are actually filled vs which the script
+        # claims to have filled. Cowork-driven debugging stays
+        # quick without ad-hoc patches.
+        try:
+            inventory = page.evaluate("""
+                () => Array.from(document.querySelectorAll('mat-select')).map(el => {
+                    const valEl = el.querySelector('.mat-mdc-select-min-line')
+                               || el.querySelector('.mat-mdc-select-value-text');
+                    const lblId = el.getAttribute('aria-labelledby');
+                    const lblEl = lblId ? document.getElementById(lblId) : null;
+                    return {
+                        id: el.id || null,
+                        name: el.getAttribute('name') || null,
+                        label: lblEl ? (lblEl.textContent || '').trim() : null,
+                        value: valEl ? (valEl.textContent || '').trim() : '',
+                        empty: (el.className || '').includes('mat-mdc-select-empty'),
+                    };
+                }).slice(0, 40)
+            """)
+            if inventory:
+                print(f"\n--- MAT-SELECT INVENTORY (first 40, post-fill state) ---")
+                for i, dd_info in enumerate(inventory):
+                    print(f"  [#{i:2}] {dd_info.get('label') or '?':<30} "
+                          f"id={dd_info.get('id') or '-':<40} "
+                          f"value={'(empty)' if dd_info.get('empty') else repr(dd_info.get('value'))}")
+                print(f"{'=' * 50}")
+        except Exception:
+            pass
+
+    return fill_report, total, failures
+
+
+# ── --profile: Playwright trace + cProfile for one fill ──────────
+#
+# When a fill is slow, print output can't say whether the time went to
+# Python-side matching or to waiting on the browser. With --profile each
+# fill records a Playwright trace (DOM snapshots on, screenshots off) and
+# a cProfile of the filling thread, and bundles both with the fill report
+# into filler-profile-<timestamp>.zip. summary.json splits the wall time
+# into browser wait (Playwright's sync dispatch), deliberate sleeps, and
+# the Python remainder. Not combined with --tabs: a cProfile per tab
+# thread clashes on 3.12+ (one sys.monitoring tool at a time) and the tab
+# threads share one context, which can only hold one trace.
+
+class FillProfiler:
+    """Capture one fill: start() before fill_page, stop() right after."""
+
+    def __init__(self, out_dir, label=""):
+        self.out_dir = out_dir
+        self.label = label
+        self.prof = None
+        self.tracing = False
+        self.started = 0.0
+
+    def start(self, context):
+        import cProfile  # only --profile pays for these imports
+        try:
+            context.tracing.start(screenshots=False, snapshots=True, sources=False)
+            self.tracing = True
+        except Exception as e:
+            print(f"[!] Playwright tracing unavailable: {e}")
+        self.started = time.time()
+        self.prof = cProfile.Profile()
+        self.prof.enable()
+
+    def stop(self, context, fill_report):
+        """Stop both captures and write the archive. Returns its path."""
+        import pstats
+        import zipfile
+        self.prof.disable()
+        wall = time.time() - self.started
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        route = self.label.split("://", 1)[-1].split("/", 1)[-1]
+        slug = "".join(c if c.isalnum() else "-" for c in route).strip("-")[-40:]
+        name = f"filler-profile-{stamp}{'-' + slug if slug else ''}"
+        os.makedirs(self.out_dir, exist_ok=True)
+        archive = os.path.join(self.out_dir, name + ".zip")
+
+        with tempfile.TemporaryDirectory() as tmp:
+            trace_path = os.path.join(tmp, "trace.zip")
+            if self.tracing:
+                try:
+                    context.tracing.stop(path=trace_path)
+                except Exception as e:
+                    print(f"[!] Could not save Playwright trace: {e}")
+            prof_path = os.path.join(tmp, "profile.prof")
+            self.prof.dump_stats(prof_path)
+
+            text = io.StringIO()
+            stats = pstats.Stats(self.prof, stream=text)
+            stats.sort_stats("cumulative").print_stats(60)
+
+            browser_wait = sleep = 0.0
+            for (filename, _line, func), (_cc, _nc, _tt, ct, _callers) in stats.stats.items():
+                if func == "_sync" and filename.replace("\\", "/").endswith("_impl/_sync_base.py"):
+                    browser_wait += ct
+                elif func == "<built-in method time.sleep>":
+                    sleep += ct
+            summary = {
+                "label": self.label,
+                "wall_s": round(wall, 3),
+                "browser_wait_s": round(browser_wait, 3),
+                "sleep_s": round(sleep, 3),
+                "python_s": round(max(0.0, wall - browser_wait - sleep), 3),
+                "fields": len(fill_report),
+                "failed": sum(1 for r in fill_report if r.get("status") in ("FAIL", "ERROR")),
+            }
+
+            with zipfile.ZipFile(archive, "w", zipfile.ZIP_DEFLATED) as zf:
+                if os.path.exists(trace_path):
+                    zf.write(trace_path, "trace.zip")
+                zf.write(prof_path, "profile.prof")
+                zf.writestr("profile.txt", text.getvalue())
+                zf.writestr("fill_report.json", json.dumps(fill_report, indent=2, default=str))
+                zf.writestr("summary.json", json.dumps(summary, indent=2))
+
+        print(f"[*] Profile: {summary['wall_s']}s wall = {summary['browser_wait_s']}s browser wait "
+              f"+ {summary['sleep_s']}s sleeps + {summary['python_s']}s Python")
+        print(f"[*] Profile archive: {archive}  (open trace.zip with: playwright show-trace)")
+        return archive
+
+
+# ── Parallel multi-tab fill ──────────────────────────────────────
+#
+# An auto quote and a home quote for the same household are independent
+# EZLynx routes, so --tabs fills them concurrently: one tab per route in
+# the same persistent context (same login). Playwright's sync API is bound
+# to the thread that started it, so each worker thread opens its own
+# Playwright connection to the running Chromium over CDP and drives only
+# its own tab. The main thread keeps pumping its own connection meanwhile.
+
+class _ThreadRoutedStdout:
+    """sys.stdout proxy for tab worker threads: each complete line a tab
+    prints is written (and flushed) at once, prefixed with "[tab N] ", so
+    the progress stream stays live and lines from different tabs never
+    interleave mid-line. Other threads write straight through."""
+
+    def __init__(self, real):
+        self.real = real
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def capture(self, tab_id):
+        self._local.prefix = f"[tab {tab_id}] "
+        self._local.pending = ""
+
+    def release(self):
+        """Emit the calling tab's unterminated last line, if any."""
+        if getattr(self._local, 'pending', ""):
+            self.write("\n")
+        self._local.prefix = None
+
+    def write(self, text):
+        prefix = getattr(self._local, 'prefix', None)
+        if not prefix:
+            with self._lock:
+                return self.real.write(text)
+        *lines, self._local.pending = (self._local.pending + text).split("\n")
+        if lines:
+            with self._lock:
+                self.real.write("".join(f"{prefix}{line}\n" for line in lines))
+                self.real.flush()
+        return len(text)
+
+    def flush(self):
+        self.real.flush()
+
+    def __getattr__(self, name):
+        return getattr(self.real, name)
+
+
+def _cdp_launch_args(user_data_dir):
+    """Chromium flags for the --tabs CDP endpoint: loopback only, on a port
+    Chromium picks itself (no probe-then-bind race). A stale
+    DevToolsActivePort from an earlier run is removed so
+    _cdp_endpoint() can't read it."""
+    try:
+        os.remove(os.path.join(user_data_dir, "DevToolsActivePort"))
+    except OSError:
+        pass
+    return ["--remote-debugging-address=127.0.0.1", "--remote-debugging-port=0"]
+
+
+def _cdp_endpoint(user_data_dir, timeout=5.0):
+    """The browser's WebSocket CDP URL, from the DevToolsActivePort file
+    Chromium writes (port, then the /devtools/browser/<id> path). Tab
+    workers connect to it directly rather than through the HTTP discovery
+    endpoint."""
+    path = os.path.join(user_data_dir, "DevToolsActivePort")
+    deadline = time.time() + timeout
+    while True:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                port, ws_path = f.read().split()[:2]
+            return f"ws://127.0.0.1:{int(port)}{ws_path}"
+        except (OSError, ValueError):
+            if time.time() >= deadline:
+                raise RuntimeError("Chromium did not report its CDP endpoint (DevToolsActivePort)")
+            time.sleep(0.05)
+
+
+def _route_url(route):
+    """Accept full URLs or EZLynx-relative routes (/web/rating/auto/...)."""
+    if route.lower().startswith(("http://", "https://")):
+        return route
+    return EZLYNX_URL.rstrip("/") + "/" + route.lstrip("/")
+
+
+def _same_route(url_a, url_b):
+    return url_a.split("#", 1)[0].rstrip("/").lower() == url_b.split("#", 1)[0].rstrip("/").lower()
+
+
+def _fill_tab_worker(cdp_url, route, client, schema, direct_write, compiled=None, tab_id=1):
+    """Thread body: fill `route` in its tab of the shared context and return
+    its own report. The tab a previous Fill Now opened for the route is
+    reused, so Fill Again doesn't pile up tabs; a tab opened here is closed
+    again if the fill fails. Prints go out live, prefixed "[tab N]"."""
+    routed = isinstance(sys.stdout, _ThreadRoutedStdout)
+    if routed:
+        sys.stdout.capture(tab_id)
+    result = {'route': route, 'tab': tab_id, 'report': [], 'total': 0,
+              'failures': [], 'seconds': 0.0, 'error': None}
+    started = time.time()
+    try:
+        with sync_playwright() as p:
+            browser = p.chromium.connect_over_cdp(cdp_url)
+            context = browser.contexts[0]
+            url = _route_url(route)
+            tab = next((t for t in context.pages if _same_route(t.url, url)), None)
+            opened = tab is None
+            if opened:
+                tab = context.new_page()
+            try:
+                _fill_route_tab(tab, url, client, schema, direct_write, compiled, result)
+            except Exception:
+                if opened:
+                    try:
+                        tab.close()
+                    except Exception:
+                        pass
+                raise
+    except Exception as e:
+        print(f"[!] Tab error: {e}")
+        result['error'] = str(e)
+    result['seconds'] = time.time() - started
+    print(f"[*] Tab done in {result['seconds']:.1f}s: {result['total']} filled, "
+          f"{len(result['failures'])} failed")
+    if routed:
+        sys.stdout.release()
+    return result
+
+
+def _fill_route_tab(tab, url, client, schema, direct_write, compiled, result):
+    """Navigate `tab` to the route, fill it and record the outcome in `result`."""
+    tab.goto(url, wait_until="domcontentloaded")
+    inject_filler_toolbar(tab)
+    print(f"[*] Tab opened: {tab.url}")
+    report, total, failures = fill_page(tab, client, schema, direct_write=direct_write,
+                                        compiled=compiled)
+    update_filler_status(tab,
+        f"Done! {total} filled, {len(failures)} failed (parallel tab). "
+        f"{'Check terminal for error details.' if failures else ''}")
+    result.update(report=report, total=total, failures=failures)
+
+
+def fill_tabs_parallel(page, cdp_url, routes, client, schema, direct_write=False,
+                       compiled=None):
+    """
+    Fill each route in its own tab concurrently. Each tab's progress is
+    printed as it happens, prefixed "[tab N]" (N = position in `routes`).
+    `page` is the main (login) tab — only used to keep the main Playwright
+    connection pumping events. Returns the list of per-tab result dicts.
+    """
+    from concurrent.futures import ThreadPoolExecutor  # --tabs only
+
+    print(f"\n[*] Filling {len(routes)} tab(s) in parallel:")
+    for tab_id, route in enumerate(routes, 1):
+        print(f"    [tab {tab_id}] {route}")
+    update_filler_status(page, f"Filling {len(routes)} tabs in parallel...")
+    started = time.time()
+    proxy = _ThreadRoutedStdout(sys.stdout)
+    sys.stdout = proxy
+    try:
+        with ThreadPoolExecutor(max_workers=len(routes)) as pool:
+            futures = [pool.submit(_fill_tab_worker, cdp_url, r, client, schema, direct_write,
+                                   compiled, tab_id)
+                       for tab_id, r in enumerate(routes, 1)]
+            while not all(f.done() for f in futures):
+                try:
+                    page.wait_for_timeout(250)
+                except Exception:
+                    time.sleep(0.25)
+            results = [f.result() for f in futures]
+    finally:
+        sys.stdout = proxy.real
+
+    wall = time.time() - started
+    serial = sum(r['seconds'] for r in results)
+    print(f"\n[OK] Parallel fill: {sum(r['total'] for r in results)} fields across {len(results)} tab(s) "
+          f"in {wall:.1f}s (sum of tab times {serial:.1f}s)")
+    return results
+
+
+# ── Startup budget + fast start ──────────────────────────────────
+#
+# Every phase from module import to "toolbar ready" is timed and printed,
+# so startup regressions show up in the terminal log instead of as a
+# vague "feels slower". Measured on a warm machine the constant tables
+# above cost well under a millisecond to build — the real budget goes to
+# the Playwright import, Chromium launch and the initial navigation,
+# which is what --fast-start targets.
+STARTUP_BUDGET_MS = 5000
+
+# Persist login between runs via a real Chromium user data dir.
+# Cookies/session live at ~/.altech-ezlynx-filler-profile so the user
+# doesn't have to re-MFA every time.
+PROFILE_DIR = os.path.join(os.path.expanduser("~"), ".altech-ezlynx-filler-profile")
+PROFILE_LOCKFILES = ("SingletonLock", "SingletonCookie", "SingletonSocket", "lockfile")
+LAST_URL_FILE = "altech_last_url.txt"
+
+
+class StartupTimer:
+    """Collects (phase, ms) pairs and prints them against STARTUP_BUDGET_MS."""
+
+    def __init__(self):
+        self.phases = []
+        self._t = time.perf_counter()
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        self.phases.append((phase, (now - self._t) * 1000))
+        self._t = now
+
+    def report(self):
+        phases = [("module import", _MODULE_IMPORT_MS)] + self.phases
+        total = sum(ms for _, ms in phases)
+        print("[*] Startup timing:")
+        for phase, ms in phases:
+            print(f"      {phase:<22} {ms:7.0f}ms")
+        verdict = "within" if total <= STARTUP_BUDGET_MS else "OVER"
+        print(f"      {'total':<22} {total:7.0f}ms ({verdict} {STARTUP_BUDGET_MS}ms budget)")
+
+
+def filler_field_labels():
+    """Every dropdown field the filler knows, merged across page contexts."""
+    labels = {}
+    for table in (BASE_DROPDOWN_LABELS, AUTO_DROPDOWN_LABELS,
+                  HOME_DROPDOWN_LABELS, LEAD_DROPDOWN_LABELS):
+        labels.update(table)
+    return labels
+
+
+def compile_filler_schema(schema, pages, source_sha1, tables_sha1=None, cascades=None):
+    """Compile the schema against this filler's mapping tables."""
+    labels = filler_field_labels()
+    if tables_sha1 is None:
+        tables_sha1 = mappings_sha1(labels, ABBREVIATIONS)
+    return compile_schema(schema, pages, labels, ABBREVIATIONS, detect_subpage,
+                          source_sha1, tables_sha1, cascades)
+
+
+def load_schema(schema_file, use_cache=False):
+    """
+    Load the scraped dropdown schema. Returns (schema, pages, compiled)
+    with the metadata keys (_pages, _meta, ...) stripped from schema.
+
+    The compiled artifact (<schema_file>.compiled, written by the scraper)
+    is used whenever its version, the JSON's content hash and this
+    filler's mapping tables all match — no JSON parse, no normalization.
+    Otherwise the JSON is parsed and compiled in memory; with use_cache
+    the fresh artifact is also written, so the next start skips both.
+    """
+    if not os.path.exists(schema_file):
+        return None, {}, None
+    with open(schema_file, "rb") as f:
+        raw = f.read()
+    source_sha1 = content_sha1(raw)
+    tables_sha1 = mappings_sha1(filler_field_labels(), ABBREVIATIONS)
+    compiled_file = schema_file + COMPILED_SUFFIX
+    compiled = load_compiled(compiled_file, source_sha1, tables_sha1)
+    if compiled is not None:
+        return compiled["schema"], compiled["pages"], compiled
+
+    # Resolves _options hash references (or reads the legacy flat format);
+    # metadata keys (_pages, _meta, etc.) come back separately.
+    schema, meta = decode_schema(json.loads(raw))
+    pages = meta.get("_pages", {})
+
+    compiled = compile_filler_schema(schema, pages, source_sha1, tables_sha1,
+                                     meta.get(CASCADES_KEY))
+    if use_cache:
+        try:
+            save_compiled(compiled_file, compiled)
+        except Exception:
+            pass
+    return schema, pages, compiled
+
+
+def sweep_profile_locks(user_data_dir):
+    """
+    Defensive sweep: previous Ctrl+C exits leave Chromium lockfiles that
+    make launch_persistent_context die with TargetClosedError on next run.
+    Sweep these BEFORE launch — Playwright is not running yet, so it's safe.
+    Every entry is checked: Linux/macOS leave SingletonLock, Windows leaves
+    a plain lockfile instead.
+    """
+    if not os.path.isdir(user_data_dir):
+        return
+    for stale_lock in PROFILE_LOCKFILES:
+        lock_path = os.path.join(user_data_dir, stale_lock)
+        try:
+            if os.path.exists(lock_path) or os.path.islink(lock_path):
+                os.remove(lock_path)
+        except Exception:
+            pass
+
+
+def read_last_url(user_data_dir):
+    """Last EZLynx URL seen in this profile (written by save_last_url)."""
+    try:
+        with open(os.path.join(user_data_dir, LAST_URL_FILE), "r", encoding="utf-8") as f:
+            return f.read().strip() or None
+    except Exception:
+        return None
+
+
+def save_last_url(user_data_dir, url):
+    try:
+        with open(os.path.join(user_data_dir, LAST_URL_FILE), "w", encoding="utf-8") as f:
+            f.write(url)
+    except Exception:
+        pass
+
+
+def run(client_file: str, schema_file: str, direct_write: bool = False, tabs=None,
+        fast_start: bool = False, profile_dir=None):
     print("--- EZLynx Smart Form Filler ---\n")
+    timer = StartupTimer()
 
     # Load client data
     if not os.path.exists(client_file):
@@ -1636,151 +3006,43 @@ def run(client_file: str, schema_file: str):
     print(f"[v] Loaded client data: {client.get('FirstName', '?')} {client.get('LastName', '?')}")
 
     # Load schema (optional but recommended)
-    schema = {}
-    if os.path.exists(schema_file):
-        with open(schema_file, "r", encoding="utf-8") as f:
-            raw_schema = json.load(f)
-        # Strip metadata keys (_pages, _meta, etc.) — only keep dropdown data
-        schema = {k: v for k, v in raw_schema.items() if not k.startswith("_")}
-        pages = raw_schema.get("_pages", {})
+    schema, pages, compiled = load_schema(schema_file, use_cache=fast_start)
+    if schema is not None:
         print(f"[v] Loaded schema with {len(schema)} dropdown definitions")
         if pages:
             print(f"    Pages remembered: {', '.join(p.get('label', k) for k, p in pages.items())}")
     else:
+        schema = {}
         print(f"[!] Schema file not found: {schema_file} (will use live options only)")
+    timer.mark("client + schema load")
 
-    # ── In-browser toolbar (injected into EZLynx page) ──
-    FILLER_TOOLBAR = """
-    (function() {
-        if (document.getElementById('_altech_filler_toolbar')) return;
-        const bar = document.createElement('div');
-        bar.id = '_altech_filler_toolbar';
-        bar.style.cssText = 'position:absolute;width:0;height:0;overflow:hidden;pointer-events:none;';
-        bar.innerHTML = `
-            <div id="_altech_filler_inner" style="
-                position:fixed; top:8px; left:50%; transform:translateX(-50%); z-index:999999;
-                background:rgba(22,33,62,0.95); color:#fff;
-                padding:6px 14px; border-radius:10px;
-                box-shadow:0 4px 20px rgba(0,0,0,0.35); font-family:-apple-system,BlinkMacSystemFont,sans-serif;
-                display:flex; align-items:center; gap:8px;
-                border:1px solid rgba(255,255,255,0.12);
-                cursor:grab; user-select:none; font-size:12px;
-                max-width:calc(100vw - 40px); box-sizing:border-box;
-                contain:layout; pointer-events:auto;
-            ">
-                <span style="font-weight:700; font-size:12px;">
-                    Altech Filler
-                </span>
-                <button id="_altech_fill_btn" style="
-                    background:#007AFF; color:#fff; border:none; border-radius:6px;
-                    padding:5px 12px; font-size:11px; font-weight:600; cursor:pointer;
-                ">Fill Now</button>
-                <button id="_altech_close_btn" style="
-                    background:#ff3b30; color:#fff; border:none; border-radius:6px;
-                    padding:5px 12px; font-size:11px; font-weight:600; cursor:pointer;
-                ">Close</button>
-                <span id="_altech_filler_status" style="
-                    color:rgba(255,255,255,0.5); font-size:10px; max-width:260px;
-                    overflow:hidden; text-overflow:ellipsis; white-space:nowrap;
-                ">Navigate to the form, then click Fill Now.</span>
-            </div>
-        `;
-        document.body.appendChild(bar);
-        window._altech_filler_action = '';
-
-        // ── Draggable ──
-        var inner = document.getElementById('_altech_filler_inner');
-        var dragging = false, dx = 0, dy = 0;
-        inner.addEventListener('mousedown', function(e) {
-            if (e.target.tagName === 'BUTTON') return;
-            dragging = true;
-            dx = e.clientX - inner.getBoundingClientRect().left;
-            dy = e.clientY - inner.getBoundingClientRect().top;
-            inner.style.cursor = 'grabbing';
-            e.preventDefault();
-        });
-        document.addEventListener('mousemove', function(e) {
-            if (!dragging) return;
-            inner.style.left = (e.clientX - dx) + 'px';
-            inner.style.top = (e.clientY - dy) + 'px';
-            inner.style.transform = 'none';
-        });
-        document.addEventListener('mouseup', function() {
-            dragging = false;
-            if (inner) inner.style.cursor = 'grab';
-        });
-
-        document.getElementById('_altech_fill_btn').addEventListener('click', function(e) {
-            e.stopPropagation();
-            window._altech_filler_action = 'fill';
-            this.textContent = 'Filling...';
-            this.style.background = '#555';
-            this.disabled = true;
-        });
-        document.getElementById('_altech_close_btn').addEventListener('click', function(e) {
-            e.stopPropagation();
-            window._altech_filler_action = 'close';
-            this.textContent = 'Closing...';
-            this.style.background = '#555';
-            this.disabled = true;
-        });
-    })();
-    """
-
-    def inject_filler_toolbar(pg):
-        try:
-            pg.evaluate(FILLER_TOOLBAR)
-        except Exception:
-            pass
+    user_data_dir = PROFILE_DIR
+    sweep_profile_locks(user_data_dir)
+    timer.mark("profile check")
 
-    def update_filler_status(pg, text):
-        try:
-            pg.evaluate(f"""(() => {{
-                const s = document.getElementById('_altech_filler_status');
-                if (s) s.textContent = {json.dumps(text)};
-            }})()""")
-        except Exception:
-            pass
-
-    def reset_fill_btn(pg):
-        try:
-            pg.evaluate("""(() => {
-                const btn = document.getElementById('_altech_fill_btn');
-                if (btn) { btn.textContent = 'Fill Again'; btn.style.background = '#007AFF'; btn.disabled = false; }
-                window._altech_filler_action = '';
-            })()""")
-        except Exception:
-            pass
-
-    # Persist login between runs via a real Chromium user data dir.
-    # Cookies/session live at ~/.altech-ezlynx-filler-profile so the user
-    # doesn't have to re-MFA every time.
-    user_data_dir = os.path.join(os.path.expanduser("~"), ".altech-ezlynx-filler-profile")
-
-    # Defensive sweep: previous Ctrl+C exits leave Chromium lockfiles that
-    # make launch_persistent_context die with TargetClosedError on next run.
-    # Sweep these BEFORE launch — Playwright is not running yet, so it's safe.
-    if os.path.isdir(user_data_dir):
-        for stale_lock in ("SingletonLock", "SingletonCookie", "SingletonSocket", "lockfile"):
-            lock_path = os.path.join(user_data_dir, stale_lock)
-            try:
-                if os.path.exists(lock_path) or os.path.islink(lock_path):
-                    os.remove(lock_path)
-            except Exception:
-                pass
+    load_playwright()
+    timer.mark("playwright import")
 
     with sync_playwright() as p:
         # launch_persistent_context replaces launch + new_context.
         # no_viewport=True lets the page use the full window size, which is what
         # the user expects when they maximize Chromium. --start-maximized opens
         # the window maximized on launch.
+        # --tabs: expose a loopback-only CDP endpoint so each tab worker
+        # thread can attach its own Playwright connection (see
+        # fill_tabs_parallel). Not opened otherwise.
+        launch_args = ["--start-maximized"]
+        if tabs:
+            launch_args += _cdp_launch_args(user_data_dir)
         context = p.chromium.launch_persistent_context(
             user_data_dir,
             headless=False,
-            args=["--start-maximized"],
+            args=launch_args,
             no_viewport=True,
         )
         page = context.pages[0] if context.pages else context.new_page()
+        cdp_url = _cdp_endpoint(user_data_dir) if tabs else None
+        timer.mark("chromium launch")
 
         # Event-based close detection: page.is_closed() and len(context.pages)
         # cache state in Playwright's sync API and don't always reflect a
@@ -1797,16 +3059,32 @@ def run(client_file: str, schema_file: str):
             pass
 
         try:
-            # Step 1: Navigate
-            print(f"\n[*] Opening EZLynx: {EZLYNX_URL}")
-            page.goto(EZLYNX_URL, wait_until="domcontentloaded")
-            # Wait for page body to be ready instead of blind sleep
-            try:
-                page.wait_for_selector('body', state='visible', timeout=10000)
-            except PWTimeout:
-                pass
+            # Step 1: Navigate. --fast-start skips the landing page when the
+            # tab is already on EZLynx (session restore) and otherwise goes
+            # straight back to the last page used in this profile.
+            start_url = EZLYNX_URL
+            if fast_start:
+                current = page.url or ""
+                if "ezlynx.com" in current.lower():
+                    start_url = None
+                else:
+                    start_url = read_last_url(user_data_dir) or EZLYNX_URL
+            if start_url:
+                print(f"\n[*] Opening EZLynx: {start_url}")
+                page.goto(start_url, wait_until="domcontentloaded")
+                # Wait for page body to be ready instead of blind sleep
+                try:
+                    page.wait_for_selector('body', state='visible', timeout=10000)
+                except PWTimeout:
+                    pass
+            else:
+                print(f"\n[*] Tab already on EZLynx ({page.url}) — skipping navigation")
             inject_filler_toolbar(page)
+            timer.mark("navigate + toolbar")
+            timer.report()
             print("[*] Toolbar injected. Log in and navigate to the form.\n")
+            if tabs:
+                print(f"[*] Fill Now will fill {len(tabs)} tab(s) in parallel: {', '.join(tabs)}\n")
 
             # Re-inject on navigation (both full loads and SPA navigations)
             page.on("load", lambda: inject_filler_toolbar(page))
@@ -1831,6 +3109,8 @@ def run(client_file: str, schema_file: str):
                 url_changed = current_url != last_url
                 if url_changed:
                     last_url = current_url
+                    if "ezlynx.com" in current_url.lower():
+                        save_last_url(user_data_dir, current_url)
 
                 if url_changed or now - last_inject > 2:
                     try:
@@ -1887,338 +3167,26 @@ def run(client_file: str, schema_file: str):
                     continue
 
                 # ── Do the fill ──
-                update_filler_status(page, "Filling text fields...")
-                page.wait_for_load_state("domcontentloaded")
-                # Wait for form inputs to be present on the page
-                try:
-                    page.wait_for_selector('input, select, mat-select, [role="listbox"]',
-                                           state='visible', timeout=8000)
-                except PWTimeout:
-                    pass
-
-                fill_report = []  # Collect diagnostic report for all fields
-
-                # Subpage scoping for text fields too — same pattern as
-                # the dropdown loop below. Eliminates the "FirstName not
-                # found on Auto Policy Info" noise that flooded the FAIL
-                # REPORT with 8 false failures per fill.
-                _text_url = ''
-                try:
-                    _text_url = page.url
-                except Exception:
-                    pass
-                _text_subpage = detect_subpage(_text_url)
-                _text_allowlist = SUBPAGE_TEXT_FIELDS.get(_text_subpage)
-
-                # Fill text fields
-                print("\n[*] Filling text fields...")
-                filled = 0
-                skipped = 0
-
-                if _text_allowlist is not None:
-                    text_keys_to_try = [k for k in _text_allowlist if k in TEXT_FIELD_MAP]
-                    print(f"[*] Text fields scoped to {_text_subpage} ({len(text_keys_to_try)} known fields)")
-                else:
-                    text_keys_to_try = list(TEXT_FIELD_MAP.keys())
-
-                for key in text_keys_to_try:
-                    selectors = TEXT_FIELD_MAP[key]
-                    value = client.get(key, "")
-                    if not value:
-                        continue
-                    update_filler_status(page, f"Text: {key}...")
-                    try:
-                        if fill_text(page, selectors, value):
-                            print(f"  [v] {key}: '{value}'")
-                            fill_report.append({'field': key, 'type': 'text', 'value': value,
-                                                'status': 'OK', 'error': None})
-                            filled += 1
-                            time.sleep(0.05)
-                        else:
-                            print(f"  [x] {key}: '{value}' -> FIELD NOT FOUND on page")
-                            fill_report.append({'field': key, 'type': 'text', 'value': value,
-                                                'status': 'FAIL', 'error': 'ERR_FIELD_NOT_FOUND'})
-                            skipped += 1
-                    except Exception as e:
-                        print(f"  [!] {key}: '{value}' -> ERROR: {e}")
-                        fill_report.append({'field': key, 'type': 'text', 'value': value,
-                                            'status': 'ERROR', 'error': f'ERR_EXCEPTION: {e}'})
-                        skipped += 1
-
-                print(f"\n     Text fields: {filled} filled, {skipped} not found")
-
-                # Fill dropdowns (page-aware: only tries labels relevant to current page)
-                current_url = ''
-                try:
-                    current_url = page.url
-                except Exception:
-                    pass
-                active_dropdowns = get_active_dropdowns(current_url)
-                page_context = 'auto' if '/rating/auto/' in current_url.lower() else \
-                               'home' if '/rating/home/' in current_url.lower() else \
-                               'lead' if '/lead-info' in current_url.lower() else 'applicant'
-
-                # Subpage scoping: when we know the precise EZLynx subpage
-                # (e.g. auto-policy-info), restrict the field set to ones
-                # actually on that page. Eliminates noise from trying
-                # Coverage fields on the Policy Info page, etc.
-                # When subpage is unknown, fall back to the full active map.
-                subpage = detect_subpage(current_url)
-                subpage_ids = SUBPAGE_FIELD_IDS.get(subpage)
-                if subpage_ids is not None:
-                    # Allowlist mode — only try fields the subpage owns.
-                    keys_to_try = [k for k in subpage_ids.keys() if k in active_dropdowns]
-                    print(f"[*] Subpage detected: {subpage} ({len(keys_to_try)} known fields, {sum(1 for v in subpage_ids.values() if v)} with priority IDs)")
-                else:
-                    # Unknown subpage — try everything (legacy behavior).
-                    keys_to_try = list(active_dropdowns.keys())
-
-                update_filler_status(page, f"Matching dropdowns ({page_context} page, {len(keys_to_try)} mappings)...")
-                print(f"\n[*] Filling dropdowns -- page context: {page_context} ({len(keys_to_try)} mappings)")
-                dd_filled = 0
-                dd_skipped = 0
-                dd_retried = []  # Track fields that failed and need retry
-
-                # Data fallback map: when a logical field isn't in client data,
-                # synthesize it from a related field. Lets one State value in
-                # the client JSON cover both applicant-level State AND the
-                # Primary Address State without duplication.
-                CLIENT_FALLBACKS = {
-                    "PrimaryAddressState": "State",
-                    "PrimaryAddressCounty": "County",
-                }
-                for key in keys_to_try:
-                    label_patterns = active_dropdowns[key]
-                    priority_selector = subpage_ids.get(key) if subpage_ids else None
-                    value = client.get(key, "")
-                    if not value and key in CLIENT_FALLBACKS:
-                        value = client.get(CLIENT_FALLBACKS[key], "")
-                    if not value:
-                        continue
-
-                    update_filler_status(page, f"Dropdown: {key} = '{value}'...")
-
-                    # Find schema options for this dropdown
-                    schema_options = None
-                    for schema_key, opts in schema.items():
-                        sk = schema_key.lower()
-                        kl = key.lower()
-                        if kl in sk or sk in kl:
-                            schema_options = opts
-                            break
-                        for lp in label_patterns:
-                            if lp in sk or sk in lp:
-                                schema_options = opts
-                                break
-                        if schema_options:
-                            break
-
-                    success = False
-                    diag = None
-
-                    try:
-                        # Try custom dropdown (Angular Material) by label first
-                        success, diag = smart_select_custom(page, label_patterns, value, schema_options, priority_selector=priority_selector)
-                        if success:
-                            method = diag.get('match_method', 'custom')
-                            matched = diag.get('matched_text', '')
-                            print(f"  [v] {key}: '{value}' -> '{matched}' ({method})")
-                            fill_report.append({'field': key, 'type': 'dropdown', 'value': value,
-                                                'status': 'OK', 'diag': diag})
-                            dd_filled += 1
-                            # Cascade-dependent dropdowns (Occupation depends on
-                            # Industry, County depends on State, etc.) need
-                            # Angular change detection to commit between fills.
-                            # 300ms is the minimum that empirically holds —
-                            # 100ms triggered ERR_NO_OPTIONS_IN_OVERLAY on the
-                            # next dependent dropdown.
-                            time.sleep(0.3)
-                        # Fallback to native <select> selectors
-                        elif key in DROPDOWN_SELECT_MAP:
-                            # Preserve custom's diag — it carries the on-page debug
-                            # payload (mat_labels_on_page, dropdowns_on_page) which
-                            # smart_select_native does NOT regenerate. We only swap
-                            # to native's diag if native actually succeeded.
-                            custom_diag = diag
-                            success, native_diag = smart_select_native(page, DROPDOWN_SELECT_MAP[key], value, schema_options)
-                            if success:
-                                diag = native_diag
-                                method = diag.get('match_method', 'native')
-                                matched = diag.get('matched_text', '')
-                                print(f"  [v] {key}: '{value}' -> '{matched}' ({method}, native)")
-                                fill_report.append({'field': key, 'type': 'dropdown', 'value': value,
-                                                    'status': 'OK', 'diag': diag})
-                                dd_filled += 1
-                                time.sleep(0.05)
-                            else:
-                                # Native fallback also failed. Keep custom's diag
-                                # (which has the debug payload) but record that
-                                # native was attempted too.
-                                diag = custom_diag or {}
-                                diag['native_attempted'] = True
-                                diag['native_error'] = native_diag.get('error') if native_diag else None
-
-                        if not success:
-                            err = diag.get('error', 'UNKNOWN') if diag else 'NO_DIAG'
-                            opts_count = diag.get('options_count', 0) if diag else 0
-                            opts_sample = diag.get('options_sample', []) if diag else []
-                            expanded = diag.get('expanded') if diag else None
-                            label_found = diag.get('label_found', False) if diag else False
-
-                            detail = f"  [x] {key}: '{value}'"
-                            if expanded:
-                                detail += f" (expanded: '{expanded}')"
-                            detail += f" -> {err}"
-                            if label_found:
-                                detail += f" | label found, type={diag.get('dropdown_type','?')}"
-                            else:
-                                detail += f" | label NOT found (searched: {label_patterns})"
-                            if opts_count > 0:
-                                detail += f" | {opts_count} options visible"
-                                if opts_sample:
-                                    detail += f": [{', '.join(opts_sample[:5])}{'...' if opts_count > 5 else ''}]"
-                            print(detail)
-
-                            fill_report.append({'field': key, 'type': 'dropdown', 'value': value,
-                                                'status': 'FAIL', 'diag': diag})
-                            dd_retried.append((key, label_patterns, value, schema_options, priority_selector))
-                            dd_skipped += 1
-
-                    except Exception as e:
-                        print(f"  [!] {key}: '{value}' -> EXCEPTION: {e}")
-                        fill_report.append({'field': key, 'type': 'dropdown', 'value': value,
-                                            'status': 'ERROR', 'error': str(e)})
-                        dd_retried.append((key, label_patterns, value, schema_options, priority_selector))
-                        dd_skipped += 1
-
-                # ── Retry failed dropdowns (up to 1 retry with extra wait) ──
-                if dd_retried:
-                    print(f"\n[*] Retrying {len(dd_retried)} failed dropdown(s) with longer wait...")
-                    update_filler_status(page, f"Retrying {len(dd_retried)} failed dropdown(s)...")
-                    # Wait for dependent dropdowns to render (Angular change detection)
-                    try:
-                        page.wait_for_load_state('networkidle', timeout=5000)
-                    except PWTimeout:
-                        pass
+                if tabs:
+                    results = fill_tabs_parallel(page, cdp_url, tabs, client, schema,
+                                                 direct_write=direct_write, compiled=compiled)
+                    total = sum(r['total'] for r in results)
+                    failed = sum(len(r['failures']) for r in results)
+                    errored = [r['route'] for r in results if r['error']]
+                    update_filler_status(page,
+                        f"Done! {len(results)} tabs: {total} filled, {failed} failed"
+                        f"{f', {len(errored)} tab error(s)' if errored else ''}. "
+                        f"Click Fill Again or Close.")
+                    reset_fill_btn(page)
+                    continue
 
-                    for key, label_patterns, value, schema_options, priority_selector in dd_retried:
-                        update_filler_status(page, f"Retry: {key} = '{value}'...")
-                        try:
-                            success, diag = smart_select_custom(page, label_patterns, value, schema_options, priority_selector=priority_selector)
-                            if not success and key in DROPDOWN_SELECT_MAP:
-                                success, diag = smart_select_native(page, DROPDOWN_SELECT_MAP[key], value, schema_options)
-
-                            if success:
-                                matched = diag.get('matched_text', '')
-                                method = diag.get('match_method', '?')
-                                print(f"  [v] RETRY {key}: '{value}' -> '{matched}' ({method})")
-                                dd_filled += 1
-                                dd_skipped -= 1
-                                # Update report entry
-                                for r in fill_report:
-                                    if r['field'] == key and r['status'] == 'FAIL':
-                                        r['status'] = 'OK_RETRY'
-                                        r['diag'] = diag
-                                        break
-                                time.sleep(0.3)
-                            else:
-                                err = diag.get('error', '?') if diag else '?'
-                                print(f"  [x] RETRY {key}: still failed -> {err}")
-                        except Exception as e:
-                            print(f"  [!] RETRY {key}: error -> {e}")
-
-                print(f"\n     Dropdowns: {dd_filled} filled, {dd_skipped} not matched")
-
-                # Extra fields — combine all dropdown label sets for the check.
-                # CLIENT_FALLBACKS source keys count as consumed too (e.g. when
-                # PrimaryAddressCounty pulls from "County", don't then warn
-                # that "County" is unmapped — it was used).
-                all_dropdown_keys = set(BASE_DROPDOWN_LABELS.keys()) | set(AUTO_DROPDOWN_LABELS.keys()) | \
-                                    set(HOME_DROPDOWN_LABELS.keys()) | set(LEAD_DROPDOWN_LABELS.keys())
-                handled_keys = set(TEXT_FIELD_MAP.keys()) | all_dropdown_keys | set(CLIENT_FALLBACKS.values())
-                extra_keys = [k for k in client.keys() if k not in handled_keys and client[k]]
-                if extra_keys:
-                    print(f"\n[*] {len(extra_keys)} unmapped fields: {', '.join(extra_keys)}")
-
-                total = filled + dd_filled
-                print(f"\n{'=' * 50}")
-                print(f"[OK] Form fill complete: {total} fields populated")
-                print(f"{'=' * 50}")
-
-                # ── Diagnostic Report ──
-                failures = [r for r in fill_report if r['status'] in ('FAIL', 'ERROR')]
-                if failures:
-                    print(f"\n--- FILL REPORT: {len(failures)} FAILED FIELD(S) ---")
-                    for r in failures:
-                        field = r['field']
-                        val = r['value']
-                        d = r.get('diag') or {}
-                        err = d.get('error', r.get('error', '?'))
-                        print(f"\n  FIELD: {field}")
-                        print(f"    Value sent: '{val}'")
-                        if d.get('expanded'):
-                            print(f"    Expanded to: '{d['expanded']}'")
-                        print(f"    Error code: {err}")
-                        if r['type'] == 'dropdown':
-                            print(f"    Label found: {d.get('label_found', '?')}")
-                            if d.get('label_found'):
-                                print(f"    Match via: {d.get('match_via', '?')}")
-                                print(f"    Dropdown type: {d.get('dropdown_type', '?')}")
-                                print(f"    Dropdown ID: {d.get('dropdown_id', 'none')}")
-                                print(f"    Overlay opened: {d.get('overlay_opened', '?')}")
-                            print(f"    Options found: {d.get('options_count', 0)}")
-                            if d.get('options_sample'):
-                                print(f"    Options sample: {d['options_sample']}")
-                            if d.get('fuzzy_candidates'):
-                                print(f"    Fuzzy near-matches: {d['fuzzy_candidates']}")
-                            # When label search fails, dump what IS on the page
-                            # so the next fix can target the actual selectors.
-                            if not d.get('label_found') and d.get('mat_labels_on_page'):
-                                print(f"    mat-label texts on page: {d['mat_labels_on_page']}")
-                            if not d.get('label_found') and d.get('dropdowns_on_page'):
-                                print(f"    Dropdown attrs on page (first 10):")
-                                for dd_info in d['dropdowns_on_page'][:10]:
-                                    print(f"      - {dd_info}")
-                            # Surface the click-was-fired-but-value-didn't-stick path
-                            if d.get('keyboard_attempted_but_not_persisted'):
-                                print(f"    Note: keyboard typeahead opened overlay but value didn't persist; option-click also tried")
-                            if d.get('options_loaded_count') is not None:
-                                print(f"    Options visible after open (waited up to 3s): {d['options_loaded_count']}")
-                            if d.get('click_method'):
-                                print(f"    Click method that opened overlay: {d['click_method']}")
-                    print(f"\n{'=' * 50}")
-
-                    # Mat-select inventory: at the end of any FAIL report,
-                    # dump every mat-select on the page with its id, name,
-                    # and current displayed value. Lets the next round see
-                    # which fields are actually filled vs which the script
-                    # claims to have filled. Cowork-driven debugging stays
-                    # quick without ad-hoc patches.
-                    try:
-                        inventory = page.evaluate("""
-                            () => Array.from(document.querySelectorAll('mat-select')).map(el => {
-                                const valEl = el.querySelector('.mat-mdc-select-min-line')
-                                           || el.querySelector('.mat-mdc-select-value-text');
-                                const lblId = el.getAttribute('aria-labelledby');
-                                const lblEl = lblId ? document.getElementById(lblId) : null;
-                                return {
-                                    id: el.id || null,
-                                    name: el.getAttribute('name') || null,
-                                    label: lblEl ? (lblEl.textContent || '').trim() : null,
-                                    value: valEl ? (valEl.textContent || '').trim() : '',
-                                    empty: (el.className || '').includes('mat-mdc-select-empty'),
-                                };
-                            }).slice(0, 40)
-                        """)
-                        if inventory:
-                            print(f"\n--- MAT-SELECT INVENTORY (first 40, post-fill state) ---")
-                            for i, dd_info in enumerate(inventory):
-                                print(f"  [#{i:2}] {dd_info.get('label') or '?':<30} "
-                                      f"id={dd_info.get('id') or '-':<40} "
-                                      f"value={'(empty)' if dd_info.get('empty') else repr(dd_info.get('value'))}")
-                            print(f"{'=' * 50}")
-                    except Exception:
-                        pass
+                profiler = FillProfiler(profile_dir) if profile_dir else None
+                if profiler:
+                    profiler.start(context)
+                fill_report, total, failures = fill_page(page, client, schema, direct_write=direct_write,
+                                                         compiled=compiled)
+                if profiler:
+                    profiler.stop(context, fill_report)
 
                 update_filler_status(page,
                     f"Done! {total} filled, {len(failures)} failed. "
@@ -2244,6 +3212,10 @@ def run(client_file: str, schema_file: str):
         # handler waited for that). Just let the with-block clean up.
 
 
+# Measured once, printed in the startup breakdown (see StartupTimer).
+_MODULE_IMPORT_MS = (time.perf_counter() - _MODULE_T0) * 1000
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="EZLynx Smart Form Filler -- auto-fill with fuzzy dropdown matching"
@@ -2258,8 +3230,40 @@ def main():
         default="ezlynx_schema.json",
         help="Scraped schema JSON file (default: ezlynx_schema.json)",
     )
+    parser.add_argument(
+        "--direct-write",
+        action="store_true",
+        help="Set mat-selects with known IDs through Angular form controls in one "
+             "batch, falling back to the click/typeahead path for any that don't commit",
+    )
+    parser.add_argument(
+        "--tabs",
+        nargs="+",
+        metavar="ROUTE",
+        help="Fill these EZLynx routes (full URLs or /web/... paths) concurrently, one tab "
+             "each, when Fill Now is clicked — e.g. the auto and home quote of a package",
+    )
+    parser.add_argument(
+        "--fast-start",
+        action="store_true",
+        help="Write the compiled schema artifact when it is missing or stale, and reopen "
+             "the last EZLynx page instead of the landing page",
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const=".",
+        metavar="DIR",
+        help="Record a Playwright trace + cProfile of each fill and bundle them with the "
+             "fill report into a timestamped zip in DIR (default: current directory); "
+             "not with --tabs",
+    )
     args = parser.parse_args()
-    run(client_file=args.client, schema_file=args.schema)
+    if args.profile and args.tabs:
+        parser.error("--profile profiles one fill at a time; run the routes without --tabs "
+                     "to profile them")
+    run(client_file=args.client, schema_file=args.schema, direct_write=args.direct_write,
+        tabs=args.tabs, fast_start=args.fast_start, profile_dir=args.profile)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,318 @@
+"""
+EZLynx Schema Store
+
+Content-addressed storage for the scraped dropdown schema, shared by
+scrape_ezlynx_schema.py (writer) and ezlynx_filler.py (reader).
+
+Many EZLynx dropdowns carry the same option list under different labels
+(the 50 US states, 1-20 counts, Yes/No). On disk each distinct list is
+stored once under "_options" keyed by a short content hash, and every
+label references its list by hash:
+
+    {
+        "_pages":   {...},
+        "_options": {"3f2a9c01b7de": ["AK", "AL", ...], ...},
+        "Address State": "3f2a9c01b7de",
+        "Garaging State": "3f2a9c01b7de",
+        ...
+    }
+
+Cascade crawls (scrape_ezlynx_schema.py --cascade) add "_cascades":
+child option lists keyed by parent value, referencing _options the same way:
+
+    "_cascades": {
+        "Industry > Occupation": {
+            "parent": "Industry", "child": "Occupation",
+            "values": {"Agriculture": "9b1e...", ...},
+            "timedOut": []
+        }
+    }
+
+In memory the schema stays a plain {label: [options]} dict, but labels
+with identical lists share one interned list object, so comparing two
+dropdowns' options is an identity check. decode_schema() also accepts
+the legacy flat {label: [options]} file.
+"""
+
+import hashlib
+import json
+import os
+
+OPTIONS_KEY = "_options"
+CASCADES_KEY = "_cascades"
+HASH_LEN = 12
+
+
+def option_hash(values) -> str:
+    """Short content hash of an option list (order-sensitive)."""
+    blob = json.dumps(values, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha1(blob.encode("utf-8")).hexdigest()[:HASH_LEN]
+
+
+class OptionPool:
+    """Interns option lists so identical lists share one object."""
+
+    def __init__(self):
+        self.by_hash = {}
+
+    def intern(self, values):
+        """Return the canonical list for `values` (O(len) hash, O(1) lookup)."""
+        h = option_hash(values)
+        canonical = self.by_hash.get(h)
+        if canonical is None:
+            canonical = self.by_hash[h] = list(values)
+        return canonical
+
+    def __len__(self):
+        return len(self.by_hash)
+
+
+def encode_schema(schema, meta=None):
+    """
+    Build the on-disk dict: metadata keys first (e.g. _pages), then
+    _options with each distinct list once, then label -> hash references.
+    """
+    options = {}
+
+    def ref(values):
+        h = option_hash(values)
+        options.setdefault(h, values)
+        return h
+
+    data = dict(meta or {})
+    if data.get(CASCADES_KEY):
+        data[CASCADES_KEY] = {
+            key: {**entry, "values": {v: ref(opts) for v, opts in entry.get("values", {}).items()}}
+            for key, entry in data[CASCADES_KEY].items()
+        }
+    refs = {label: ref(values) for label, values in schema.items()}
+    data[OPTIONS_KEY] = options
+    data.update(refs)
+    return data
+
+
+def decode_schema(data, pool=None):
+    """
+    Split an on-disk schema dict into (schema, meta).
+
+    schema: {label: [options]} with identical lists interned in `pool`.
+    meta:   the remaining underscore keys (_pages, _meta, ...), minus _options.
+    Accepts both the hashed format and the legacy flat format.
+    """
+    if pool is None:
+        pool = OptionPool()
+    options = data.get(OPTIONS_KEY, {})
+
+    def resolve(value):
+        if isinstance(value, str):
+            values = options.get(value)
+            if values is None:
+                return None  # dangling reference — drop rather than guess
+            # Trust the file's hash: no need to re-hash every shared list
+            if value not in pool.by_hash:
+                pool.by_hash[value] = values
+            return pool.by_hash[value]
+        if isinstance(value, list):
+            return pool.intern(value)
+        return None
+
+    schema = {}
+    meta = {}
+    for key, value in data.items():
+        if key.startswith("_"):
+            if key == CASCADES_KEY:
+                cascades = {}
+                for ckey, entry in value.items():
+                    values = {}
+                    for parent_value, ref in entry.get("values", {}).items():
+                        opts = resolve(ref)
+                        if opts is not None:
+                            values[parent_value] = opts
+                    cascades[ckey] = {**entry, "values": values}
+                meta[key] = cascades
+            elif key != OPTIONS_KEY:
+                meta[key] = value
+            continue
+        values = resolve(value)
+        if values is not None:
+            schema[key] = values
+    return schema, meta
+
+
+def load_schema_file(path, pool=None):
+    """Read and decode a schema file. Returns (schema, meta)."""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return decode_schema(data, pool)
+
+
+# ── Compiled artifact ──
+# The filler used to parse the JSON, strip metadata keys and then, for
+# every dropdown it fills, scan all schema labels with lower()/substring
+# tests to find that field's option list. compile_schema() does that work
+# once: normalized labels, per-label option hashes, per-subpage field
+# membership (from _pages), each filler field resolved to its schema label
+# (globally and per subpage), an ABBREVIATIONS-aware option index, and the
+# _cascades child lists keyed by cascade_key(parent, child).
+# The scraper writes it next to the JSON as <schema>.compiled, in JSON:
+# the file sits beside a user-chosen schema path, so loading it must not
+# be able to run code. Option lists are stored once under "options" by
+# hash and re-shared through an OptionPool on load. The filler uses it
+# only when COMPILED_VERSION, the JSON's content hash and the hash of its
+# own mapping tables all match.
+COMPILED_VERSION = 3
+COMPILED_SUFFIX = ".compiled"
+
+
+def normalize_label(label):
+    """Lowercase, drop '*' / ':' and any " (2)" disambiguation suffix."""
+    text = " ".join(label.replace("*", "").replace(":", "").split()).lower()
+    head, sep, tail = text.rpartition(" (")
+    if sep and tail.endswith(")") and tail[:-1].isdigit():
+        text = head
+    return text
+
+
+def cascade_key(parent, child):
+    """Compiled-artifact key for a cascade: "parent > child", normalized."""
+    return f"{normalize_label(parent)} > {normalize_label(child)}"
+
+
+def content_sha1(data: bytes) -> str:
+    return hashlib.sha1(data).hexdigest()
+
+
+def mappings_sha1(field_labels, abbreviations) -> str:
+    """Hash of the filler tables a compiled artifact was resolved against."""
+    blob = json.dumps([field_labels, abbreviations], sort_keys=True)
+    return hashlib.sha1(blob.encode("utf-8")).hexdigest()
+
+
+def _resolve_field(field, patterns, keys):
+    """The filler's schema lookup rule: first label (in schema order) that
+    contains, or is contained in, the field name or one of its patterns."""
+    kl = field.lower()
+    for sk, key in keys:
+        if kl in sk or sk in kl:
+            return key
+        for lp in patterns:
+            if lp in sk or sk in lp:
+                return key
+    return None
+
+
+def _option_index(values, abbreviations):
+    """normalized text -> option. Abbreviations whose expansion is in the
+    list map to it (the filler expands before matching); ones whose
+    expansion isn't are left out so the filler's own path handles them."""
+    index = {}
+    for opt in values:
+        index.setdefault(opt.strip().lower(), opt)
+    for abbr, full in abbreviations.items():
+        hit = index.get(full.strip().lower())
+        if hit is not None:
+            index[abbr.lower()] = hit
+        else:
+            index.pop(abbr.lower(), None)
+    return index
+
+
+def compile_schema(schema, pages, field_labels, abbreviations, subpage_of,
+                   source_sha1, tables_sha1, cascades=None):
+    """
+    Build the compiled artifact dict.
+
+    field_labels:  {filler field: [lowercase label patterns]}
+    abbreviations: the filler's ABBREVIATIONS table
+    subpage_of:    page path -> subpage name or None (filler.detect_subpage)
+    cascades:      decoded _cascades ({"Parent > Child": {parent, child, values}})
+    """
+    keys = [(k.lower(), k) for k in schema]
+    hashes = {k: option_hash(v) for k, v in schema.items()}
+
+    normalized = {}
+    for k in schema:
+        normalized.setdefault(normalize_label(k), []).append(k)
+
+    members = {}
+    for path, entry in (pages or {}).items():
+        sp = subpage_of(path)
+        if sp:
+            members.setdefault(sp, set()).update(entry.get("dropdowns", []))
+    subpages = {sp: [k for k in schema if k in ks] for sp, ks in members.items()}
+
+    fields = {"": {f: _resolve_field(f, p, keys) for f, p in field_labels.items()}}
+    for sp, sp_keys in subpages.items():
+        lowered = [(k.lower(), k) for k in sp_keys]
+        fields[sp] = {f: _resolve_field(f, p, lowered) or fields[""][f]
+                      for f, p in field_labels.items()}
+
+    option_index = {}
+    for k, v in schema.items():
+        if hashes[k] not in option_index:
+            option_index[hashes[k]] = _option_index(v, abbreviations)
+
+    return {
+        "version": COMPILED_VERSION,
+        "source_sha1": source_sha1,
+        "mappings_sha1": tables_sha1,
+        "schema": schema,
+        "pages": pages or {},
+        "normalized": normalized,
+        "hashes": hashes,
+        "subpages": subpages,
+        "fields": fields,
+        "option_index": option_index,
+        "cascades": {cascade_key(e["parent"], e["child"]): e["values"]
+                     for e in (cascades or {}).values()},
+    }
+
+
+def save_compiled(path, compiled):
+    """Write atomically as JSON. The schema is implied by "hashes" (label ->
+    hash, in schema order) plus "options" (hash -> list, each list once)."""
+    options = {}
+
+    def ref(values):
+        h = option_hash(values)
+        options.setdefault(h, values)
+        return h
+
+    data = {key: value for key, value in compiled.items() if key != "schema"}
+    for label, h in compiled["hashes"].items():
+        options.setdefault(h, compiled["schema"][label])
+    data["cascades"] = {
+        key: {parent_value: ref(opts) for parent_value, opts in values.items()}
+        for key, values in compiled.get("cascades", {}).items()
+    }
+    data["options"] = options
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+def load_compiled(path, source_sha1, tables_sha1):
+    """Return the compiled artifact if it is current, else None (missing,
+    stale, or not a well-formed artifact — the caller then recompiles)."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if (not isinstance(data, dict)
+            or data.get("version") != COMPILED_VERSION
+            or data.get("source_sha1") != source_sha1
+            or data.get("mappings_sha1") != tables_sha1):
+        return None
+    pool = OptionPool()
+    try:
+        pool.by_hash = data.pop("options")
+        data["schema"] = {label: pool.by_hash[h] for label, h in data["hashes"].items()}
+        data["cascades"] = {
+            key: {parent_value: pool.by_hash[h] for parent_value, h in refs.items()}
+            for key, refs in data["cascades"].items()
+        }
+    except (KeyError, TypeError, AttributeError):
+        return None
+    return data
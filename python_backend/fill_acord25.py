@@ -4,17 +4,60 @@ Reads JSON from stdin, fills the fillable ACORD 25 PDF, writes filled PDF to std
 
 Usage:
     echo '{"producer_name": "Test Agency"}' | python fill_acord25.py
+    python fill_acord25.py --serve               # resident: JSON lines on stdin/stdout
+    python fill_acord25.py --serve --port 8765   # resident: JSON lines over localhost TCP
+    python fill_acord25.py --batch < batch.json > certs.zip          # one insured, many holders
+    python fill_acord25.py --batch --format pdf < batch.json > certs.pdf
+    python fill_acord25.py --mode incremental < data.json > coi.pdf   # template bytes + update section
+    python fill_acord25.py --mode appearance < data.json > coi.pdf    # values drawn, no viewer regeneration
+    python fill_acord25.py --mode flatten < data.json > coi.pdf       # plain page, form removed
+
+Serve mode parses and clones the template once. Each request is one JSON
+line, {"id": ..., "data": {...certificate data...}}, answered with one line:
+{"id": ..., "ok": true, "filled": N, "ms": 12.3, "pdf": "<base64>"} or
+{"id": ..., "ok": false, "code": 1|3, "error": "..."} (codes as the one-shot exit codes).
+Add "mode": "incremental" | "appearance" | "flatten" to a request for
+those outputs.
+
+Filled PDFs are cached on disk (ACORD25_CACHE_DIR/results, bounded by
+ACORD25_RESULT_CACHE_MB, default 64) by a hash of the field map, template,
+mode and filler code, so an unchanged certificate is not filled twice.
+The certificates hold insured and holder details, so the default
+ACORD25_CACHE_DIR is per user (%LOCALAPPDATA%, or $XDG_CACHE_HOME or
+~/.cache) and the results directory is created owner-only (0700).
+--no-cache bypasses it; hit/miss counts follow the "Filled N fields" line
+on stderr.
 
 Field mapping: HTML form IDs → ACORD 25 fillable PDF field names
 """
 
+import argparse
+import base64
+import hashlib
+import socketserver
 import sys
 import json
 import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+import zipfile
 from io import BytesIO
 
 import PyPDF2
-from PyPDF2.generic import NameObject, TextStringObject
+from PyPDF2.generic import (
+    ArrayObject, BooleanObject, DecodedStreamObject, DictionaryObject, FloatObject,
+    IndirectObject, NameObject, NullObject, StreamObject, TextStringObject,
+)
+
+from acord_fields import field_mapper
+from pdf_appearance import (
+    HIDDEN_FLAG, MULTILINE_FLAG, NO_VIEW_FLAG, FontMetrics,
+    form_placement, inherited, num, parse_da, text_appearance,
+)
+from pdf_incremental import IncrementalUpdate, UnsupportedEncryption
 
 
 # Path to the fillable ACORD 25 template
@@ -28,168 +71,386 @@ TEMPLATE_PATH = os.path.join(
 # Annotations use /T = leaf name, with /Parent chain for hierarchy
 
 
-def format_date(date_str):
-    """Convert YYYY-MM-DD to MM/DD/YYYY for ACORD forms."""
-    if not date_str:
-        return ''
+def _user_cache_dir():
+    """Per-user cache root: %LOCALAPPDATA% on Windows, else $XDG_CACHE_HOME or ~/.cache."""
+    if sys.platform == 'win32':
+        base = os.environ.get('LOCALAPPDATA') or tempfile.gettempdir()
+    else:
+        base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'altech-acord25')
+
+
+def _private_dir(path):
+    """Create `path` (and parents) readable by the current user only."""
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    if os.name == 'posix':
+        os.chmod(path, 0o700)
+
+
+# Derived data about the template (annotation index) is cached here,
+# keyed by the template's SHA-256
+CACHE_DIR = os.environ.get('ACORD25_CACHE_DIR') or _user_cache_dir()
+INDEX_VERSION = 1
+
+# Output modes: see --mode
+FILL_MODES = ('full', 'incremental', 'appearance', 'flatten')
+
+
+def build_annotation_index(pdf):
+    """{leaf field name: [[page index, /Annots position], ...]} for every
+    annotation with a /T — one walk over the template's annotations.
+    `pdf` is the template's reader or its clone (same page layout)."""
+    index = {}
+    for page_no, page in enumerate(pdf.pages):
+        for pos, annot_ref in enumerate(page.get('/Annots') or []):
+            field_name = annot_ref.get_object().get('/T')
+            if field_name:
+                index.setdefault(str(field_name), []).append([page_no, pos])
+    return index
+
+
+def load_annotation_index(pdf, template_sha256):
+    """The template's annotation index from CACHE_DIR, built and saved on a miss."""
+    path = os.path.join(CACHE_DIR, f'acord25-{template_sha256[:16]}.index.json')
     try:
-        parts = date_str.split('-')
-        if len(parts) == 3:
-            return f'{parts[1]}/{parts[2]}/{parts[0]}'
-    except Exception:
+        with open(path, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+        if cached.get('version') == INDEX_VERSION and cached.get('sha256') == template_sha256:
+            return cached['fields']
+    except (OSError, ValueError, KeyError):
         pass
-    return date_str
+
+    index = build_annotation_index(pdf)
+    try:
+        _private_dir(CACHE_DIR)
+        tmp = f'{path}.{os.getpid()}.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'version': INDEX_VERSION, 'sha256': template_sha256, 'fields': index}, f)
+        os.replace(tmp, path)
+    except OSError as e:
+        sys.stderr.write(f'Could not cache annotation index: {e}\n')
+    return index
+
+
+# Filled certificates are cached too: regenerating an unchanged certificate
+# (preview, then download) returns the earlier PDF bytes. Bounded in size,
+# least recently used entries evicted first; 0 disables. Entries contain
+# insured and holder details, so the directory is owner-only.
+RESULT_CACHE_DIR = os.path.join(CACHE_DIR, 'results')
+RESULT_CACHE_MAX_BYTES = int(float(os.environ.get('ACORD25_RESULT_CACHE_MB', '64')) * 1024 * 1024)
+RESULT_CACHE_VERSION = 1
+
+# Modules whose source decides the bytes of a fill; their hash is part of
+# the result cache key, so a fix to the field map or rendering is never
+# answered with a PDF the old code produced.
+_FILL_SOURCES = ('fill_acord25.py', 'acord_fields.py', 'pdf_appearance.py', 'pdf_incremental.py')
+_code_sha256 = None
+
+
+def code_sha256():
+    """SHA-256 over the _FILL_SOURCES files, computed once per process."""
+    global _code_sha256
+    if _code_sha256 is None:
+        digest = hashlib.sha256()
+        here = os.path.dirname(os.path.abspath(__file__))
+        for name in _FILL_SOURCES:
+            with open(os.path.join(here, name), 'rb') as f:
+                digest.update(hashlib.sha256(f.read()).digest())
+        _code_sha256 = digest.hexdigest()
+    return _code_sha256
+
+
+class ResultCache:
+    """
+    On-disk LRU cache of filled PDFs, keyed by a hash of the canonical
+    field map, the template's SHA-256, the output mode and code_sha256().
+    An entry is one file, "<key>.pdf": the filled count on the first line,
+    then the PDF bytes. A hit touches the file's mtime; a store evicts the
+    oldest files until the directory fits in max_bytes. Safe across threads
+    and across processes sharing the directory (writes go through os.replace).
+    copy_to() and writer() do the same without holding the PDF in memory.
+    """
+
+    def __init__(self, directory=RESULT_CACHE_DIR, max_bytes=RESULT_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(field_map, template_sha256, mode='full'):
+        canonical = json.dumps({
+            'version': RESULT_CACHE_VERSION,
+            'pypdf2': PyPDF2.__version__,
+            'code': code_sha256(),
+            'template': template_sha256,
+            'mode': mode,
+            'fields': field_map,
+        }, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f'{key}.pdf')
+
+    def get(self, key):
+        """(pdf_bytes, filled_count) for a cached fill, or None."""
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                count_line = f.readline()
+                pdf_bytes = f.read()
+            filled_count = int(count_line)
+            os.utime(path)
+        except (OSError, ValueError):
+            return self._miss()
+        with self._lock:
+            self.hits += 1
+        return pdf_bytes, filled_count
+
+    def _miss(self):
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def copy_to(self, key, out):
+        """Stream a cached fill's PDF bytes to `out`. Returns the filled count, or None on a miss."""
+        path = self._path(key)
+        try:
+            f = open(path, 'rb')
+        except OSError:
+            return self._miss()
+        with f:
+            try:
+                filled_count = int(f.readline())
+            except ValueError:
+                return self._miss()
+            shutil.copyfileobj(f, out)
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        with self._lock:
+            self.hits += 1
+        return filled_count
+
+    def writer(self, key):
+        """A _CacheEntryWriter to stream a fill into, or None if the directory can't be created."""
+        try:
+            _private_dir(self.directory)
+            return _CacheEntryWriter(self, self._path(key))
+        except OSError as e:
+            sys.stderr.write(f'Could not cache filled PDF: {e}\n')
+            return None
+
+    def put(self, key, pdf_bytes, filled_count):
+        entry_size = len(pdf_bytes) + 16
+        if entry_size > self.max_bytes:
+            return
+        path = self._path(key)
+        try:
+            _private_dir(self.directory)
+            tmp = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+            with open(tmp, 'wb') as f:
+                f.write(b'%d\n' % filled_count)
+                f.write(pdf_bytes)
+            os.replace(tmp, path)
+            self._evict()
+        except OSError as e:
+            sys.stderr.write(f'Could not cache filled PDF: {e}\n')
+
+    def _evict(self):
+        entries = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.name.endswith('.pdf'):
+                    try:
+                        st = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append((st.st_mtime, st.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def stats(self):
+        return (f'cache: {self.hits} hit{"" if self.hits == 1 else "s"}, '
+                f'{self.misses} miss{"" if self.misses == 1 else "es"}')
+
+
+class _CacheEntryWriter:
+    """
+    One ResultCache entry written as the PDF streams out. The count line is
+    reserved at a fixed width (int() ignores the padding) and filled in by
+    commit(), which publishes the entry; a write error just drops it.
+    """
+
+    COUNT_LINE = b'%10d\n'
+
+    def __init__(self, cache, path):
+        self.cache = cache
+        self.path = path
+        self.tmp = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        self.size = 0
+        self.f = open(self.tmp, 'wb')
+        self.f.write(self.COUNT_LINE % 0)
+
+    def write(self, data):
+        if self.f is None:
+            return
+        try:
+            self.f.write(data)
+            self.size += len(data)
+        except OSError as e:
+            sys.stderr.write(f'Could not cache filled PDF: {e}\n')
+            self.discard()
+
+    def commit(self, filled_count):
+        if self.f is None:
+            return
+        if self.size + 16 > self.cache.max_bytes:
+            self.discard()
+            return
+        try:
+            self.f.seek(0)
+            self.f.write(self.COUNT_LINE % filled_count)
+            self.f.close()
+            self.f = None
+            os.replace(self.tmp, self.path)
+            self.cache._evict()
+        except OSError as e:
+            sys.stderr.write(f'Could not cache filled PDF: {e}\n')
+            self.discard()
+
+    def discard(self):
+        if self.f is not None:
+            self.f.close()
+            self.f = None
+        try:
+            os.remove(self.tmp)
+        except OSError:
+            pass
+
+
+class _Tee:
+    """Binary stream that writes to several (the output and a cache entry)."""
+
+    def __init__(self, *streams):
+        self.streams = streams
+
+    def write(self, data):
+        for stream in self.streams:
+            stream.write(data)
+
+
+# Compiled once from the declarative spec
+_map_acord25_fields = field_mapper('acord25')
 
 
 def build_field_map(data):
     """
     Map incoming JSON data to ACORD 25 PDF annotation field names (leaf names).
-    Returns dict of {leaf_field_name: value}.
+    Returns dict of {leaf_field_name: value}, empty values dropped.
+    The mapping itself is ACORD25_FIELDS in acord_fields.py.
     """
-    fields = {}
-
-    def s(key, default=''):
-        """Safely get a string value from data."""
-        val = data.get(key, default)
-        return str(val) if val else default
-
-    def nested(section, key, default=''):
-        """Safely get a nested value."""
-        sec = data.get(section, {})
-        if isinstance(sec, dict):
-            val = sec.get(key, default)
-            return str(val) if val else default
-        return default
-
-    # ── Certificate Info ──
-    fields['Form_CompletionDate_A[0]'] = format_date(s('date'))
-    fields['CertificateOfInsurance_CertificateNumberIdentifier_A[0]'] = s('certNumber')
-    fields['CertificateOfInsurance_RevisionNumberIdentifier_A[0]'] = s('revNumber')
-
-    # ── Producer Section ──
-    fields['Producer_FullName_A[0]'] = nested('producer', 'name')
-
-    prod_addr = nested('producer', 'address')
-    prod_city = nested('producer', 'city')
-    prod_state = nested('producer', 'state')
-    prod_zip = nested('producer', 'zip')
-
-    fields['Producer_MailingAddress_LineOne_A[0]'] = prod_addr
-    fields['Producer_MailingAddress_CityName_A[0]'] = prod_city
-    fields['Producer_MailingAddress_StateOrProvinceCode_A[0]'] = prod_state
-    fields['Producer_MailingAddress_PostalCode_A[0]'] = prod_zip
-
-    fields['Producer_ContactPerson_FullName_A[0]'] = nested('producer', 'contactName', nested('producer', 'name'))
-    fields['Producer_ContactPerson_PhoneNumber_A[0]'] = nested('producer', 'phone')
-    fields['Producer_FaxNumber_A[0]'] = nested('producer', 'fax')
-    fields['Producer_ContactPerson_EmailAddress_A[0]'] = nested('producer', 'email')
-
-    # ── Insured Section ──
-    fields['NamedInsured_FullName_A[0]'] = nested('insured', 'name')
-    fields['NamedInsured_MailingAddress_LineOne_A[0]'] = nested('insured', 'address')
-    fields['NamedInsured_MailingAddress_CityName_A[0]'] = nested('insured', 'city')
-    fields['NamedInsured_MailingAddress_StateOrProvinceCode_A[0]'] = nested('insured', 'state')
-    fields['NamedInsured_MailingAddress_PostalCode_A[0]'] = nested('insured', 'zip')
-
-    # ── Insurers A-F ──
-    insurers = data.get('insurers', {})
-    if isinstance(insurers, dict):
-        for letter in ['a', 'b', 'c', 'd', 'e', 'f']:
-            upper = letter.upper()
-            ins = insurers.get(letter, {})
-            if isinstance(ins, dict):
-                name = ins.get('name', '')
-                naic = ins.get('naic', '')
-                if name:
-                    fields[f'Insurer_FullName_{upper}[0]'] = name
-                if naic:
-                    fields[f'Insurer_NAICCode_{upper}[0]'] = naic
-
-    # ── General Liability ──
-    gl = data.get('gl', {})
-    if isinstance(gl, dict):
-        fields['GeneralLiability_InsurerLetterCode_A[0]'] = gl.get('insurerLetter', 'A')
-        fields['Policy_GeneralLiability_PolicyNumberIdentifier_A[0]'] = gl.get('policy', '')
-        fields['Policy_GeneralLiability_EffectiveDate_A[0]'] = format_date(gl.get('effective', ''))
-        fields['Policy_GeneralLiability_ExpirationDate_A[0]'] = format_date(gl.get('expiration', ''))
-        fields['GeneralLiability_EachOccurrence_LimitAmount_A[0]'] = gl.get('occurrence', '')
-        fields['GeneralLiability_FireDamageRentedPremises_EachOccurrenceLimitAmount_A[0]'] = gl.get('rented', '')
-        fields['GeneralLiability_MedicalExpense_EachPersonLimitAmount_A[0]'] = gl.get('med', '')
-        fields['GeneralLiability_PersonalAndAdvertisingInjury_LimitAmount_A[0]'] = gl.get('personal', '')
-        fields['GeneralLiability_GeneralAggregate_LimitAmount_A[0]'] = gl.get('aggregate', '')
-        fields['GeneralLiability_ProductsAndCompletedOperations_AggregateLimitAmount_A[0]'] = gl.get('products', '')
-        if gl.get('addl'):
-            fields['CertificateOfInsurance_GeneralLiability_AdditionalInsuredCode_A[0]'] = 'X'
-        if gl.get('subr'):
-            fields['Policy_GeneralLiability_SubrogationWaivedCode_A[0]'] = 'X'
-
-    # ── Automobile Liability ──
-    auto = data.get('auto', {})
-    if isinstance(auto, dict):
-        fields['Vehicle_InsurerLetterCode_A[0]'] = auto.get('insurerLetter', 'B')
-        fields['Policy_AutomobileLiability_PolicyNumberIdentifier_A[0]'] = auto.get('policy', '')
-        fields['Policy_AutomobileLiability_EffectiveDate_A[0]'] = format_date(auto.get('effective', ''))
-        fields['Policy_AutomobileLiability_ExpirationDate_A[0]'] = format_date(auto.get('expiration', ''))
-        fields['Vehicle_CombinedSingleLimit_EachAccidentAmount_A[0]'] = auto.get('csl', '')
-        fields['Vehicle_BodilyInjury_PerPersonLimitAmount_A[0]'] = auto.get('bodyPerson', '')
-        fields['Vehicle_BodilyInjury_PerAccidentLimitAmount_A[0]'] = auto.get('bodyAccident', '')
-        fields['Vehicle_PropertyDamage_PerAccidentLimitAmount_A[0]'] = auto.get('prop', '')
-        if auto.get('addl'):
-            fields['CertificateOfInsurance_AutomobileLiability_AdditionalInsuredCode_A[0]'] = 'X'
-        if auto.get('subr'):
-            fields['Policy_AutomobileLiability_SubrogationWaivedCode_A[0]'] = 'X'
-
-    # ── Umbrella / Excess Liability ──
-    umb = data.get('umbrella', {})
-    if isinstance(umb, dict):
-        fields['ExcessUmbrella_InsurerLetterCode_A[0]'] = umb.get('insurerLetter', 'D')
-        fields['Policy_ExcessLiability_PolicyNumberIdentifier_A[0]'] = umb.get('policy', '')
-        fields['Policy_ExcessLiability_EffectiveDate_A[0]'] = format_date(umb.get('effective', ''))
-        fields['Policy_ExcessLiability_ExpirationDate_A[0]'] = format_date(umb.get('expiration', ''))
-        fields['ExcessUmbrella_Umbrella_EachOccurrenceAmount_A[0]'] = umb.get('occurrence', '')
-        fields['ExcessUmbrella_Umbrella_AggregateAmount_A[0]'] = umb.get('aggregate', '')
-        fields['ExcessUmbrella_Umbrella_DeductibleOrRetentionAmount_A[0]'] = umb.get('ded', '')
-        if umb.get('addl'):
-            fields['CertificateOfInsurance_ExcessLiability_AdditionalInsuredCode_A[0]'] = 'X'
-        if umb.get('subr'):
-            fields['Policy_ExcessLiability_SubrogationWaivedCode_A[0]'] = 'X'
-
-    # ── Workers Compensation ──
-    wc = data.get('wc', {})
-    if isinstance(wc, dict):
-        fields['WorkersCompensationEmployersLiability_InsurerLetterCode_A[0]'] = wc.get('insurerLetter', 'C')
-        fields['Policy_WorkersCompensationAndEmployersLiability_PolicyNumberIdentifier_A[0]'] = wc.get('policy', '')
-        fields['Policy_WorkersCompensationAndEmployersLiability_EffectiveDate_A[0]'] = format_date(wc.get('effective', ''))
-        fields['Policy_WorkersCompensationAndEmployersLiability_ExpirationDate_A[0]'] = format_date(wc.get('expiration', ''))
-        fields['WorkersCompensationEmployersLiability_EmployersLiability_EachAccidentLimitAmount_A[0]'] = wc.get('accident', '')
-        fields['WorkersCompensationEmployersLiability_EmployersLiability_DiseaseEachEmployeeLimitAmount_A[0]'] = wc.get('employee', wc.get('disease', ''))
-        fields['WorkersCompensationEmployersLiability_EmployersLiability_DiseasePolicyLimitAmount_A[0]'] = wc.get('diseasePolicyLimit', wc.get('disease', ''))
-        if wc.get('excl'):
-            fields['WorkersCompensationEmployersLiability_AnyPersonsExcludedIndicator_A[0]'] = 'Y'
-        if wc.get('subr'):
-            fields['Policy_WorkersCompensation_SubrogationWaivedCode_A[0]'] = 'X'
-
-    # ── Description of Operations ──
-    fields['CertificateOfLiabilityInsurance_ACORDForm_RemarkText_A[0]'] = s('description')
-
-    # ── Certificate Holder ──
-    holder = data.get('holder', {})
-    if isinstance(holder, dict):
-        fields['CertificateHolder_FullName_A[0]'] = holder.get('name', '')
-        fields['CertificateHolder_MailingAddress_LineOne_A[0]'] = holder.get('address', '')
-        fields['CertificateHolder_MailingAddress_CityName_A[0]'] = holder.get('city', '')
-        fields['CertificateHolder_MailingAddress_StateOrProvinceCode_A[0]'] = holder.get('state', '')
-        fields['CertificateHolder_MailingAddress_PostalCode_A[0]'] = holder.get('zip', '')
-
-    # ── Authorized Representative ──
-    fields['Producer_AuthorizedRepresentative_Signature_A[0]'] = s('authorizedRep', nested('producer', 'name'))
-
-    # Remove empty values to avoid overwriting existing content
-    return {k: v for k, v in fields.items() if v}
-
-
-def fill_pdf(data):
-    """Fill the ACORD 25 PDF template using direct annotation manipulation.
+    return _map_acord25_fields(data)
+
+
+def _swap(undo, obj, key, value):
+    """Set (or, for None, remove) obj[key], recording the old value in `undo`."""
+    undo.append((obj, key, dict.get(obj, key), list(obj.keys())))
+    if value is None:
+        obj.pop(key, None)
+    else:
+        obj[NameObject(key)] = value
+
+
+def _unswap(undo):
+    """Put back everything _swap changed, key order included (it shows in the output)."""
+    for obj, key, original, keys in reversed(undo):
+        if original is None:
+            obj.pop(key, None)
+        else:
+            obj[NameObject(key)] = original
+        if list(obj.keys()) != keys:
+            items = [(k, dict.get(obj, k)) for k in keys]
+            obj.clear()
+            obj.update(items)
+    undo.clear()
+
+
+class IncrementalFiller:
+    """Just enough of the template for --mode incremental: its original
+    bytes, a reader and the annotation index. No clone is made, so a
+    one-shot incremental fill skips the most expensive part of
+    TemplateFiller's setup."""
+
+    def __init__(self, template_bytes, reader=None, template_sha256=None, index=None):
+        self.template_bytes = template_bytes
+        self.reader = reader or PyPDF2.PdfReader(BytesIO(template_bytes))
+        self.template_sha256 = template_sha256 or hashlib.sha256(template_bytes).hexdigest()
+        self.index = index if index is not None else load_annotation_index(self.reader, self.template_sha256)
+        self._refs = {}  # leaf name -> template object refs
+        self._update = None
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_file(cls, template_path=TEMPLATE_PATH):
+        with open(template_path, 'rb') as f:
+            return cls(f.read())
+
+    def _template_refs(self, field_name):
+        """References to a leaf name's annotations in the template file. A
+        stale index (the /T at a cached position doesn't match) is rebuilt."""
+        refs = self._refs.get(field_name)
+        if refs is not None:
+            return refs
+        pages = self.reader.pages
+        refs = []
+        for page_no, pos in self.index.get(field_name, ()):
+            try:
+                ref = pages[page_no]['/Annots'][pos]
+            except (IndexError, KeyError):
+                ref = None
+            if ref is None or str(ref.get_object().get('/T')) != field_name:
+                self.index = build_annotation_index(self.reader)
+                self._refs.clear()
+                refs = [pages[p]['/Annots'][i] for p, i in self.index.get(field_name, ())]
+                break
+            refs.append(ref)
+        self._refs[field_name] = refs
+        return refs
+
+    def fill_incremental(self, data, out):
+        """
+        Write the filled certificate to the binary stream `out` as the
+        template's original bytes plus an incremental update holding only
+        the changed widget annotations (see pdf_incremental.py). Returns the
+        filled count. Raises UnsupportedEncryption for templates whose
+        security handler can't be appended to.
+        """
+        field_map = build_field_map(data)
+        with self.lock:
+            if self._update is None:
+                self._update = IncrementalUpdate(self.template_bytes, self.reader)
+            objects = {}
+            for field_name, value in field_map.items():
+                for ref in self._template_refs(field_name):
+                    annot = DictionaryObject(ref.get_object())
+                    annot[NameObject('/V')] = TextStringObject(value)
+                    objects[(ref.idnum, ref.generation)] = annot
+            self._update.write(out, objects)
+        return len(objects)
+
+
+class TemplateFiller:
+    """The ACORD 25 template, parsed and cloned once and reused per fill.
 
     This PDF uses XFA+AcroForm hybrid format. PyPDF2's
     update_page_form_field_values doesn't work because the form hierarchy
@@ -197,39 +458,669 @@ def fill_pdf(data):
     1. clone_document_from_reader (preserves AcroForm + XFA structure)
     2. Iterate page annotations directly
     3. Match by /T (leaf field name) and set /V with TextStringObject
+
+    Step 3 goes through an index of leaf name -> annotation position,
+    built once per template (and cached on disk by its hash), so a fill
+    resolves only the annotations it sets.
+
+    fill() sets /V on the shared clone, writes it, then puts every touched
+    annotation's original /V back, so the next fill starts from the
+    pristine template. Fills are serialized on a lock.
     """
-    reader = PyPDF2.PdfReader(TEMPLATE_PATH)
-    writer = PyPDF2.PdfWriter()
-    writer.clone_document_from_reader(reader)
 
-    field_map = build_field_map(data)
+    def __init__(self, template_path=TEMPLATE_PATH):
+        with open(template_path, 'rb') as f:
+            self.template_bytes = f.read()
+        self.reader = PyPDF2.PdfReader(BytesIO(self.template_bytes))
+        self.writer = PyPDF2.PdfWriter()
+        self.writer.clone_document_from_reader(self.reader)
+        self.template_sha256 = hashlib.sha256(self.template_bytes).hexdigest()
+        self.index = load_annotation_index(self.writer, self.template_sha256)
+        self._resolved = {}  # leaf name -> annotation objects, filled on first use
+        self._incremental = None  # IncrementalFiller sharing the reader, on first use
+        self._fonts = {}  # /DR font name -> FontMetrics
+        self.lock = threading.Lock()
 
-    # Fill fields via direct annotation manipulation
-    filled_count = 0
-    for page in writer.pages:
-        annots = page.get('/Annots')
-        if not annots:
-            continue
-        for annot_ref in annots:
-            annot = annot_ref.get_object()
-            field_name = annot.get('/T')
-            if field_name and str(field_name) in field_map:
-                value = field_map[str(field_name)]
+    def _annotations(self, field_name):
+        """Annotation objects for a leaf name. A stale index (the /T at a
+        cached position doesn't match) is rebuilt from the clone."""
+        annots = self._resolved.get(field_name)
+        if annots is not None:
+            return annots
+        pages = self.writer.pages
+        annots = []
+        for page_no, pos in self.index.get(field_name, ()):
+            try:
+                annot = pages[page_no]['/Annots'][pos].get_object()
+            except (IndexError, KeyError):
+                annot = None
+            if annot is None or str(annot.get('/T')) != field_name:
+                self.index = build_annotation_index(self.writer)
+                self._resolved.clear()
+                annots = [pages[p]['/Annots'][i].get_object()
+                          for p, i in self.index.get(field_name, ())]
+                break
+            annots.append(annot)
+        self._resolved[field_name] = annots
+        return annots
+
+    def _apply(self, field_map, saved):
+        """Set /V for every annotation in field_map, recording each one's
+        template value in `saved` the first time it is touched."""
+        for field_name, value in field_map.items():
+            for annot in self._annotations(field_name):
+                if id(annot) not in saved:
+                    saved[id(annot)] = (annot, annot.get('/V'))
                 annot.update({
                     NameObject('/V'): TextStringObject(value)
                 })
-                filled_count += 1
 
-    sys.stderr.write(f'Filled {filled_count} fields\n')
+    def _reset(self, field_names, saved):
+        """Put the template value back on the named fields' annotations."""
+        for field_name in field_names:
+            for annot in self._annotations(field_name):
+                entry = saved.get(id(annot))
+                if entry is None:
+                    continue
+                if entry[1] is None:
+                    annot.pop('/V', None)
+                else:
+                    annot[NameObject('/V')] = entry[1]
+
+    @staticmethod
+    def _restore(saved):
+        """Return every touched annotation to its template value."""
+        for annot, original in saved.values():
+            if original is None:
+                annot.pop('/V', None)
+            else:
+                annot[NameObject('/V')] = original
+
+    def _count(self, field_map):
+        return sum(len(self._annotations(k)) for k in field_map)
+
+    def _write(self):
+        output = BytesIO()
+        self.writer.write(output)
+        return output.getvalue()
+
+    def fill(self, data):
+        """Return (pdf_bytes, filled_count)."""
+        field_map = build_field_map(data)
+        with self.lock:
+            saved = {}
+            try:
+                # Fill fields via direct annotation manipulation
+                self._apply(field_map, saved)
+                return self._write(), self._count(field_map)
+            finally:
+                self._restore(saved)
+
+    def fill_incremental(self, data, out):
+        """IncrementalFiller.fill_incremental on this template's reader."""
+        if self._incremental is None:
+            self._incremental = IncrementalFiller(self.template_bytes, self.reader,
+                                                  self.template_sha256, self.index)
+        return self._incremental.fill_incremental(data, out)
+
+    def _detached(self, obj):
+        """Copy of a template object with references resolved into direct
+        objects (streams are added to the writer), so the copy can be added
+        to the clone for one write and removed again."""
+        if isinstance(obj, IndirectObject):
+            obj = obj.get_object()
+            if isinstance(obj, StreamObject):
+                return self.writer._add_object(obj)
+        if isinstance(obj, DictionaryObject):
+            return DictionaryObject({k: self._detached(v) for k, v in obj.items()})
+        if isinstance(obj, ArrayObject):
+            return ArrayObject(self._detached(v) for v in obj)
+        return obj
+
+    def _font(self, font_name, font_refs):
+        """(resource ref, FontMetrics) for a /DA font from the template's
+        AcroForm /DR. The font is added to the clone once per write
+        (font_refs: name -> ref for this write); metrics are kept."""
+        form = self.writer._root_object['/AcroForm']
+        fonts = form['/DR']['/Font'] if '/DR' in form and '/Font' in form['/DR'] else {}
+        key = f'/{font_name}'
+        if key not in fonts:
+            return None, self._fonts.setdefault(key, FontMetrics(None))
+        metrics = self._fonts.get(key)
+        if metrics is None:
+            metrics = self._fonts[key] = FontMetrics(fonts[key])
+        if key not in font_refs:
+            font_refs[key] = self.writer._add_object(self._detached(fonts[key]))
+        return font_refs[key], metrics
 
-    # Write to bytes
-    output = BytesIO()
-    writer.write(output)
-    return output.getvalue()
+    def _add_appearance(self, annot, value, font_refs, undo):
+        """Give a filled text widget an /AP /N stream drawing `value`."""
+        da = str(inherited(annot, '/DA') or self.writer._root_object['/AcroForm'].get('/DA', ''))
+        font_name = parse_da(da)[0]
+        font_ref, metrics = self._font(font_name, font_refs)
+        rect = annot['/Rect']
+        content = text_appearance(
+            value, rect, da, metrics,
+            quadding=int(inherited(annot, '/Q') or 0),
+            multiline=bool(int(inherited(annot, '/Ff') or 0) & MULTILINE_FLAG),
+        )
+        stream = DecodedStreamObject()
+        stream.set_data(content)
+        width = abs(float(rect[2]) - float(rect[0]))
+        height = abs(float(rect[3]) - float(rect[1]))
+        stream.update({
+            NameObject('/Type'): NameObject('/XObject'),
+            NameObject('/Subtype'): NameObject('/Form'),
+            NameObject('/BBox'): ArrayObject([FloatObject(0), FloatObject(0),
+                                              FloatObject(width), FloatObject(height)]),
+        })
+        if font_ref is not None:
+            stream[NameObject('/Resources')] = DictionaryObject({
+                NameObject('/Font'): DictionaryObject({NameObject(f'/{font_name}'): font_ref}),
+            })
+        ap = DictionaryObject({NameObject('/N'): self.writer._add_object(stream)})
+        _swap(undo, annot, '/AP', ap)
+
+    def _acro_form(self, font_refs):
+        """An /AcroForm over the clone's widgets, with the template's /DA and
+        its /DR fonts (fill()'s output has no form dictionary at all)."""
+        template_form = self.writer._root_object['/AcroForm']
+        if '/DR' in template_form and '/Font' in template_form['/DR']:
+            for key in template_form['/DR']['/Font']:
+                self._font(key[1:], font_refs)
+        fields = ArrayObject()
+        for page in self.writer.pages:
+            for ref in page['/Annots'] if '/Annots' in page else ():
+                if '/T' in ref.get_object():
+                    fields.append(ref)
+        form = DictionaryObject({
+            NameObject('/Fields'): fields,
+            NameObject('/DR'): DictionaryObject({NameObject('/Font'): DictionaryObject(
+                {NameObject(k): v for k, v in sorted(font_refs.items())})}),
+        })
+        if '/DA' in template_form:
+            form[NameObject('/DA')] = template_form['/DA']
+        return form
+
+    def _flatten_page(self, page, undo):
+        """Paint every visible widget's normal appearance into the page
+        content and drop the widgets (other annotations stay)."""
+        annots = page['/Annots'] if '/Annots' in page else None
+        if not annots:
+            return
+        keep = ArrayObject()
+        xobjects, ops = {}, []
+        for ref in annots:
+            annot = ref.get_object()
+            if annot.get('/Subtype') != '/Widget':
+                keep.append(ref)
+                continue
+            if int(annot.get('/F', 0)) & (HIDDEN_FLAG | NO_VIEW_FLAG) or '/AP' not in annot:
+                continue
+            appearance = annot['/AP']
+            if '/N' not in appearance:
+                continue
+            normal = appearance['/N']
+            if isinstance(normal, DictionaryObject) and not isinstance(normal, StreamObject):
+                state = annot.get('/AS')
+                if state is None or state not in normal:
+                    continue
+                form_ref, normal = normal.raw_get(state), normal[state]
+            else:
+                form_ref = appearance.raw_get('/N')
+            if not isinstance(form_ref, IndirectObject) or '/BBox' not in normal:
+                continue
+            name = f'/FlatW{len(xobjects)}'
+            xobjects[name] = form_ref
+            matrix = form_placement(annot['/Rect'], normal['/BBox'], normal.get('/Matrix'))
+            ops.append(f'q {" ".join(num(v) for v in matrix)} cm {name} Do Q')
+
+        resources = DictionaryObject(page['/Resources']) if '/Resources' in page else DictionaryObject()
+        page_xobjects = DictionaryObject(resources['/XObject']) if '/XObject' in resources else DictionaryObject()
+        page_xobjects.update({NameObject(k): v for k, v in xobjects.items()})
+        resources[NameObject('/XObject')] = page_xobjects
+        _swap(undo, page, '/Resources', resources)
+
+        contents = page.raw_get('/Contents') if '/Contents' in page else ArrayObject()
+        if isinstance(contents, IndirectObject) and isinstance(contents.get_object(), ArrayObject):
+            contents = contents.get_object()
+        contents = list(contents) if isinstance(contents, ArrayObject) else [contents]
+        save_state, paint = DecodedStreamObject(), DecodedStreamObject()
+        save_state.set_data(b'q\n')
+        paint.set_data(('Q\n' + '\n'.join(ops) + '\n').encode('ascii'))
+        _swap(undo, page, '/Contents', ArrayObject(
+            [self.writer._add_object(save_state)] + contents + [self.writer._add_object(paint)]))
+        _swap(undo, page, '/Annots', keep or None)
+
+    def _null_unreachable(self):
+        """Temporarily blank every writer object no longer reachable from the
+        catalog or /Info (the flattened widgets), so write() doesn't emit them. Returns [(index, object)] for putting them back."""
+        objects = self.writer._objects
+        positions = None
+        seen = set()
+        stack = [self.writer._root, self.writer._info]
+        while stack:
+            obj = stack.pop()
+            if isinstance(obj, IndirectObject):
+                if obj.pdf is self.writer:
+                    i = obj.idnum - 1
+                else:
+                    # Still pointing into the template reader: find its clone
+                    if positions is None:
+                        positions = {id(o): n for n, o in enumerate(objects)}
+                    i = positions.get(id(obj.get_object()))
+                    if i is None:
+                        return []  # can't tell what's reachable; blank nothing
+                if i in seen:
+                    continue
+                seen.add(i)
+                obj = objects[i]
+            if isinstance(obj, dict):
+                stack.extend(obj.values())
+            elif isinstance(obj, list):
+                stack.extend(obj)
+        blanked = []
+        for i, obj in enumerate(objects):
+            if obj is not None and i not in seen:
+                blanked.append((i, obj))
+                objects[i] = NullObject()
+        return blanked
+
+    def fill_rendered(self, data, flatten=False):
+        """
+        (pdf_bytes, filled_count) with an appearance stream generated for
+        every filled text field, so viewers draw the values as-is instead
+        of regenerating them (some e-mail previewers never do), and an
+        /AcroForm over the widgets so they stay editable.
+
+        flatten=True instead paints each visible widget's appearance into
+        the page content and drops the widgets, leaving a plain page with
+        no form; objects nothing refers to any more are left out.
+
+        Everything is added to the shared clone and taken back out after
+        the write, like fill() does for /V.
+        """
+        field_map = build_field_map(data)
+        with self.lock:
+            saved, undo, blanked, font_refs = {}, [], [], {}
+            object_count = len(self.writer._objects)
+            try:
+                self._apply(field_map, saved)
+                for field_name, value in field_map.items():
+                    for annot in self._annotations(field_name):
+                        self._add_appearance(annot, value, font_refs, undo)
+                if flatten:
+                    for page in self.writer.pages:
+                        self._flatten_page(page, undo)
+                    blanked = self._null_unreachable()
+                else:
+                    _swap(undo, self.writer._root.get_object(), '/AcroForm', self._acro_form(font_refs))
+                return self._write(), self._count(field_map)
+            finally:
+                for i, obj in blanked:
+                    self.writer._objects[i] = obj
+                _unswap(undo)
+                del self.writer._objects[object_count:]
+                self._restore(saved)
+
+    def fill_variants(self, base, variants, write=True):
+        """
+        Yield (pdf_bytes, filled_count) for each variant: `base` with the
+        variant's top-level keys overlaid (e.g. {"holder": {...}}).
+
+        The base is filled once; each variant only sets the fields whose
+        value differs from the base (and clears the ones it blanks), then
+        puts the base values back. Holds the lock until exhausted.
+        With write=False pdf_bytes is None: the caller reads the filled
+        template (self.writer) itself while the generator is suspended.
+        """
+        base_map = build_field_map(base)
+        with self.lock:
+            saved = {}
+            try:
+                self._apply(base_map, saved)
+                for overrides in variants:
+                    field_map = build_field_map({**base, **overrides})
+                    changed = {k: v for k, v in field_map.items() if base_map.get(k) != v}
+                    cleared = [k for k in base_map if k not in field_map]
+                    self._apply(changed, saved)
+                    self._reset(cleared, saved)
+                    yield (self._write() if write else None), self._count(field_map)
+                    self._reset([k for k in changed if k not in base_map], saved)
+                    self._apply({k: base_map[k] for k in list(changed) + cleared if k in base_map}, saved)
+            finally:
+                self._restore(saved)
+
+
+def fill_certificate(data, mode='full', filler=None, cache=None):
+    """
+    (pdf_bytes, filled_count) for one certificate, served from `cache` when
+    the same field map was filled before against the same template. The
+    template is only parsed on a miss when no filler is passed in — and
+    for incremental mode only read, not cloned (IncrementalFiller).
+    """
+    if cache is not None:
+        if filler is not None:
+            template_sha256 = filler.template_sha256
+        else:
+            with open(TEMPLATE_PATH, 'rb') as f:
+                template_sha256 = hashlib.sha256(f.read()).hexdigest()
+        key = cache.key(build_field_map(data), template_sha256, mode)
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    if mode == 'incremental':
+        filler = filler or IncrementalFiller.from_file()
+        out = BytesIO()
+        filled_count = filler.fill_incremental(data, out)
+        pdf_bytes = out.getvalue()
+    elif mode in ('appearance', 'flatten'):
+        filler = filler or TemplateFiller()
+        pdf_bytes, filled_count = filler.fill_rendered(data, flatten=mode == 'flatten')
+    else:
+        filler = filler or TemplateFiller()
+        pdf_bytes, filled_count = filler.fill(data)
+    if cache is not None:
+        cache.put(key, pdf_bytes, filled_count)
+    return pdf_bytes, filled_count
+
+
+def fill_pdf(data, mode='full', cache=None):
+    """Fill the ACORD 25 PDF template (one-shot: parses the template each call)."""
+    pdf_bytes, filled_count = fill_certificate(data, mode, cache=cache)
+    stats = f' ({cache.stats()})' if cache is not None else ''
+    sys.stderr.write(f'Filled {filled_count} fields{stats}\n')
+    return pdf_bytes
+
+
+def stream_pdf_incremental(data, out, cache=None):
+    """
+    One-shot --mode incremental, written straight to the binary stream
+    `out` so the output is never held in memory: a cache hit is copied
+    from its entry, a miss is teed into a new entry as it is written.
+    """
+    with open(TEMPLATE_PATH, 'rb') as f:
+        template_bytes = f.read()
+    template_sha256 = hashlib.sha256(template_bytes).hexdigest()
+    filled_count = entry = None
+    if cache is not None:
+        key = cache.key(build_field_map(data), template_sha256, 'incremental')
+        filled_count = cache.copy_to(key, out)
+        if filled_count is None:
+            entry = cache.writer(key)
+    if filled_count is None:
+        filler = IncrementalFiller(template_bytes, template_sha256=template_sha256)
+        try:
+            filled_count = filler.fill_incremental(data, _Tee(out, entry) if entry else out)
+        except BaseException:
+            if entry:
+                entry.discard()
+            raise
+        if entry:
+            entry.commit(filled_count)
+    stats = f' ({cache.stats()})' if cache is not None else ''
+    sys.stderr.write(f'Filled {filled_count} fields{stats}\n')
+
+
+# ── Resident service (--serve) ──
+# Spawning this script per certificate pays the PyPDF2 import plus the
+# template parse and clone (~80% of a one-shot fill) every time. Serve
+# mode does that once and then answers JSON-line requests.
+
+def handle_request(filler, line, cache=None):
+    """One JSON-line request (bytes as read, or str) -> response dict (see module docstring)."""
+    try:
+        if isinstance(line, bytes):
+            line = line.decode('utf-8')
+        request = json.loads(line)
+    except (UnicodeDecodeError, json.JSONDecodeError) as e:
+        return {'id': None, 'ok': False, 'code': 1, 'error': f'Invalid JSON input: {e}'}
+    if not isinstance(request, dict) or not isinstance(request.get('data'), dict):
+        return {'id': request.get('id') if isinstance(request, dict) else None,
+                'ok': False, 'code': 1, 'error': 'Request must be {"id": ..., "data": {...}}'}
+
+    req_id = request.get('id')
+    t0 = time.perf_counter()
+    try:
+        mode = request.get('mode') if request.get('mode') in FILL_MODES else 'full'
+        pdf_bytes, filled_count = fill_certificate(request['data'], mode, filler, cache)
+    except UnsupportedEncryption as e:
+        return {'id': req_id, 'ok': False, 'code': 3,
+                'error': f'Incremental mode unsupported for this template: {e}'}
+    except Exception as e:
+        return {'id': req_id, 'ok': False, 'code': 3, 'error': f'PDF fill error: {e}'}
+    ms = round((time.perf_counter() - t0) * 1000, 1)
+    stats = f' ({cache.stats()})' if cache is not None else ''
+    sys.stderr.write(f'[{req_id}] Filled {filled_count} fields in {ms}ms{stats}\n')
+    return {'id': req_id, 'ok': True, 'filled': filled_count, 'ms': ms,
+            'pdf': base64.b64encode(pdf_bytes).decode('ascii')}
+
+
+def serve_stdio(filler, cache=None):
+    """Answer JSON-line requests from stdin on stdout until EOF."""
+    for raw in sys.stdin.buffer:
+        line = raw.strip()
+        if not line:
+            continue
+        sys.stdout.write(json.dumps(handle_request(filler, line, cache)) + '\n')
+        sys.stdout.flush()
+
+
+def serve_socket(filler, port, cache=None):
+    """Answer JSON-line requests on 127.0.0.1:port (many per connection)."""
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            for raw in self.rfile:
+                line = raw.strip()
+                if not line:
+                    continue
+                response = json.dumps(handle_request(filler, line, cache)) + '\n'
+                self.wfile.write(response.encode('utf-8'))
+                self.wfile.flush()
+
+    socketserver.ThreadingTCPServer.allow_reuse_address = True
+    with socketserver.ThreadingTCPServer(('127.0.0.1', port), Handler) as server:
+        server.daemon_threads = True
+        sys.stderr.write(f'Serving ACORD 25 fills on 127.0.0.1:{port}\n')
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+# ── Batch mode (--batch) ──
+# One insured, many certificate holders:
+#   {"base": {...certificate data...},
+#    "holders": [{"name": "GC One", "address": ...},           # holder block, or
+#                {"holder": {...}, "certNumber": "0042"}, ...]}  # top-level overrides
+# All certificates come from one template load, with the base filled once.
+
+def batch_variants(batch):
+    """Validate a batch payload -> (base, [top-level overrides per certificate])."""
+    if not isinstance(batch, dict) or not isinstance(batch.get('base'), dict):
+        raise ValueError('Batch input must be {"base": {...}, "holders": [...]}')
+    holders = batch.get('holders')
+    if not isinstance(holders, list) or not holders:
+        raise ValueError('"holders" must be a non-empty list')
+    variants = []
+    for i, item in enumerate(holders):
+        if not isinstance(item, dict):
+            raise ValueError(f'holders[{i}] must be an object')
+        variants.append(item if 'holder' in item else {'holder': item})
+    return batch['base'], variants
+
+
+def certificate_title(number, data):
+    holder = data.get('holder') if isinstance(data.get('holder'), dict) else {}
+    return f"{number:03d} {holder.get('name') or 'Certificate Holder'}"
+
+
+def write_batch_zip(filler, base, variants, out):
+    """One PDF per holder in a zip written to `out`. Returns filled counts."""
+    counts = []
+    with zipfile.ZipFile(out, 'w', zipfile.ZIP_DEFLATED) as zf:
+        fills = filler.fill_variants(base, variants)
+        for number, ((pdf_bytes, filled), overrides) in enumerate(zip(fills, variants), 1):
+            title = certificate_title(number, {**base, **overrides})
+            slug = re.sub(r'[^A-Za-z0-9]+', '-', title).strip('-')
+            zf.writestr(f'COI-{slug}.pdf', pdf_bytes)
+            counts.append(filled)
+    return counts
+
+
+# Per-widget tooltips are long and identical in every copy: written once
+# as indirect objects and shared by all copies
+SHARED_ANNOT_KEYS = ('/TU',)
+# /TM (export name, "F[0].P1[0].<leaf>") would be the same in every copy
+# and override the unique qualified name, so copies drop it
+DROPPED_ANNOT_KEYS = ('/P', '/Parent', '/TM')
+
+
+def write_batch_merged(filler, base, variants, out):
+    """
+    All certificates in one PDF with a bookmark per holder.
+
+    Copies share the template's page content, fonts and images; only the
+    widget annotations are duplicated. Copies would otherwise share field
+    names (and so values), so each copy's widgets are grouped under a
+    parent field "Cert<n>" — "Cert2.CertificateHolder_FullName_A[0]".
+    The XFA packet describes a single certificate and is dropped;
+    NeedAppearances asks viewers to draw the AcroForm values.
+    """
+    merged = PyPDF2.PdfWriter()
+    template_pages = list(filler.writer.pages)
+    page_parts = [
+        {NameObject(k): v.clone(merged) for k, v in page.items() if k not in ('/Annots', '/Parent')}
+        for page in template_pages
+    ]
+    shared = {}
+    parents = ArrayObject()
+    counts = []
+
+    def copy_annotation(annot, parent_ref):
+        copy = DictionaryObject()
+        for key, value in annot.items():
+            if key in DROPPED_ANNOT_KEYS:
+                continue
+            if key in SHARED_ANNOT_KEYS:
+                ref = shared.get((id(annot), key))
+                if ref is None:
+                    ref = shared[(id(annot), key)] = merged._add_object(value.clone(merged, True))
+                copy[NameObject(key)] = ref
+            else:
+                copy[NameObject(key)] = value.clone(merged, True)
+        if '/T' in annot:
+            copy[NameObject('/Parent')] = parent_ref
+        return merged._add_object(copy)
+
+    fills = filler.fill_variants(base, variants, write=False)
+    for number, ((_, filled), overrides) in enumerate(zip(fills, variants), 1):
+        # The template holds this certificate's values until the next step
+        parent = DictionaryObject({NameObject('/T'): TextStringObject(f'Cert{number}')})
+        parent_ref = merged._add_object(parent)
+        kids = ArrayObject()
+        first_page = len(merged.pages)
+        for page_no, src in enumerate(template_pages):
+            page = PyPDF2.PageObject(merged)
+            page.update(page_parts[page_no])
+            annots = ArrayObject(copy_annotation(a.get_object(), parent_ref)
+                                 for a in src.get('/Annots') or [])
+            page[NameObject('/Annots')] = annots
+            page = merged.add_page(page)
+            for annot_ref in annots:
+                annot = annot_ref.get_object()
+                annot[NameObject('/P')] = page.indirect_reference
+                if '/Parent' in annot:
+                    kids.append(annot_ref)
+        parent[NameObject('/Kids')] = kids
+        parents.append(parent_ref)
+        merged.add_outline_item(certificate_title(number, {**base, **overrides}), first_page)
+        counts.append(filled)
+
+    template_form = filler.writer._root_object['/AcroForm']
+    acro_form = DictionaryObject({
+        NameObject('/Fields'): parents,
+        NameObject('/NeedAppearances'): BooleanObject(True),
+    })
+    for key in ('/DA', '/DR'):
+        if key in template_form:
+            acro_form[NameObject(key)] = template_form[key].clone(merged)
+    merged._root_object[NameObject('/AcroForm')] = acro_form
+    merged.page_mode = '/UseOutlines'
+    merged.write(out)
+    return counts
+
+
+def run_batch(output_format):
+    """Read a batch payload from stdin, write a zip or merged PDF to stdout."""
+    try:
+        base, variants = batch_variants(json.loads(sys.stdin.buffer.read().decode('utf-8')))
+    except (json.JSONDecodeError, ValueError) as e:
+        sys.stderr.write(f'Invalid batch input: {e}\n')
+        sys.exit(1)
+
+    try:
+        t0 = time.perf_counter()
+        filler = TemplateFiller()
+        out = BytesIO()
+        write = write_batch_merged if output_format == 'pdf' else write_batch_zip
+        counts = write(filler, base, variants, out)
+        sys.stdout.buffer.write(out.getvalue())
+    except FileNotFoundError:
+        sys.stderr.write(f'Template not found: {TEMPLATE_PATH}\n')
+        sys.exit(2)
+    except Exception as e:
+        sys.stderr.write(f'PDF fill error: {e}\n')
+        sys.exit(3)
+    elapsed = time.perf_counter() - t0
+    sys.stderr.write(f'Filled {len(counts)} certificates ({sum(counts)} fields) in {elapsed:.2f}s '
+                     f'({len(counts) / elapsed * 60:.0f}/min)\n')
+
+
+def serve(port=None, cache=None):
+    """Load the template once, then serve requests on stdio or a local port."""
+    try:
+        t0 = time.perf_counter()
+        filler = TemplateFiller()
+    except FileNotFoundError:
+        sys.stderr.write(f'Template not found: {TEMPLATE_PATH}\n')
+        sys.exit(2)
+    sys.stderr.write(f'Template loaded in {(time.perf_counter() - t0) * 1000:.0f}ms\n')
+    if port:
+        serve_socket(filler, port, cache)
+    else:
+        serve_stdio(filler, cache)
 
 
 def main():
     """Read JSON from stdin, fill PDF, write to stdout."""
+    parser = argparse.ArgumentParser(description='Fill the ACORD 25 certificate PDF')
+    parser.add_argument('--serve', action='store_true',
+                        help='Stay resident: parse the template once and answer JSON-line requests')
+    parser.add_argument('--port', type=int,
+                        help='With --serve, listen on 127.0.0.1:PORT instead of stdin/stdout')
+    parser.add_argument('--batch', action='store_true',
+                        help='Read {"base": {...}, "holders": [...]} and write one certificate per holder')
+    parser.add_argument('--format', choices=['zip', 'pdf'], default='zip',
+                        help='--batch output: zip of PDFs (default) or one merged PDF with bookmarks')
+    parser.add_argument('--mode', choices=FILL_MODES, default='full',
+                        help='full: rewrite the filled document (default); incremental: stream the '
+                             'template bytes plus an update section with only the changed fields; '
+                             'appearance: also generate appearance streams for the filled values; '
+                             'flatten: paint the values into the page and drop the form')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Always fill; skip the filled-PDF result cache')
+    args = parser.parse_args()
+    cache = None if args.no_cache or RESULT_CACHE_MAX_BYTES <= 0 else ResultCache()
+    if args.serve:
+        serve(args.port, cache)
+        return
+    if args.batch:
+        run_batch(args.format)
+        return
+
     try:
         input_data = sys.stdin.buffer.read().decode('utf-8')
         data = json.loads(input_data)
@@ -238,11 +1129,16 @@ def main():
         sys.exit(1)
 
     try:
-        pdf_bytes = fill_pdf(data)
-        sys.stdout.buffer.write(pdf_bytes)
+        if args.mode == 'incremental':
+            stream_pdf_incremental(data, sys.stdout.buffer, cache)
+        else:
+            sys.stdout.buffer.write(fill_pdf(data, args.mode, cache))
     except FileNotFoundError:
         sys.stderr.write(f'Template not found: {TEMPLATE_PATH}\n')
         sys.exit(2)
+    except UnsupportedEncryption as e:
+        sys.stderr.write(f'Incremental mode unsupported for this template: {e} (use --mode full)\n')
+        sys.exit(3)
     except Exception as e:
         sys.stderr.write(f'PDF fill error: {e}\n')
         sys.exit(3)
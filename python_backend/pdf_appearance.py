@@ -0,0 +1,185 @@
+"""
+PDF Text Field Appearances
+
+Builds the normal appearance stream (/AP /N) for a filled text widget, so
+a viewer can draw the value without regenerating it (NeedAppearances) and
+a flattened page can paint it as a form XObject.
+
+Layout follows what Acrobat produces for a plain text field: the /DA font
+and colour, 2pt padding, /Q alignment, single lines centred vertically,
+multiline fields (Ff bit 13) word-wrapped from the top, font size 0 as
+auto-size, everything clipped to the widget. Glyph widths come from the
+font's /Widths; simple fonts only (WinAnsi / MacRoman / PDFDoc, other
+characters become "?"). Comb fields and /MK rotation are not handled.
+
+Used by fill_acord25.py --mode appearance|flatten.
+"""
+
+import re
+
+PADDING = 2
+MULTILINE_FLAG = 1 << 12  # field /Ff
+HIDDEN_FLAG = 1 << 1      # annotation /F
+NO_VIEW_FLAG = 1 << 5
+AUTO_SIZE_MAX = 12
+AUTO_SIZE_MIN = 4
+
+_DA_FONT_RE = re.compile(r"/([^\s/\[\]()<>{}%]+)\s+([\d.]+)\s+Tf")
+_ENCODINGS = {
+    "/WinAnsiEncoding": "cp1252",
+    "/MacRomanEncoding": "mac_roman",
+    "/StandardEncoding": "latin-1",
+}
+
+
+def num(x):
+    """A number as a short PDF operand (2 decimals, no trailing zeros)."""
+    text = f"{x:.2f}".rstrip("0").rstrip(".")
+    return "0" if text in ("", "-0") else text
+
+
+def pdf_string(data):
+    """Bytes as a PDF literal string."""
+    escaped = (data.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+               .replace(b"\r", b"\\r").replace(b"\n", b"\\n"))
+    return b"(" + escaped + b")"
+
+
+def inherited(field, key):
+    """A field attribute, looked up through the /Parent chain (/DA, /Q, /Ff, /FT)."""
+    seen = 0
+    while field is not None and seen < 32:
+        if key in field:
+            return field[key]
+        field = field["/Parent"] if "/Parent" in field else None
+        seen += 1
+    return None
+
+
+def parse_da(da):
+    """/DA string -> (font resource name, size, the other operators)."""
+    match = _DA_FONT_RE.search(da or "")
+    if not match:
+        return None, 0.0, (da or "").strip()
+    rest = (da[:match.start()] + " " + da[match.end():]).strip()
+    return match.group(1), float(match.group(2)), rest
+
+
+class FontMetrics:
+    """Widths, vertical metrics and encoding of a simple PDF font."""
+
+    def __init__(self, font):
+        font = font.get_object() if font is not None else {}
+        encoding = font.get("/Encoding")
+        self.codec = _ENCODINGS.get(encoding, "latin-1") if isinstance(encoding, str) else "latin-1"
+        descriptor = font.get("/FontDescriptor")
+        descriptor = descriptor.get_object() if descriptor is not None else {}
+        self.ascent = float(descriptor.get("/Ascent", 0)) or 718.0
+        self.descent = float(descriptor.get("/Descent", 0)) or -207.0
+        self.missing_width = float(descriptor.get("/MissingWidth", 0)) or 556.0
+        self.first_char = int(font.get("/FirstChar", 0))
+        self.widths = [float(w) for w in font.get("/Widths", [])]
+
+    def encode(self, text):
+        return text.encode(self.codec, errors="replace")
+
+    def width(self, data, size):
+        """Width of encoded bytes at `size`, in points."""
+        total = 0.0
+        for code in data:
+            i = code - self.first_char
+            total += self.widths[i] if 0 <= i < len(self.widths) else self.missing_width
+        return total * size / 1000
+
+    def line_height(self, size):
+        return (self.ascent - self.descent) * size / 1000
+
+
+def wrap_lines(text, metrics, size, max_width):
+    """Encoded lines of `text` word-wrapped to max_width (hard breaks kept)."""
+    lines = []
+    for paragraph in re.split(r"\r\n|\r|\n", text):
+        line = b""
+        for word in re.findall(r"\S+\s*", paragraph):
+            data = metrics.encode(word)
+            if line and metrics.width((line + data).rstrip(), size) > max_width:
+                lines.append(line.rstrip())
+                line = b""
+            line += data
+            # A single word wider than the field breaks between characters
+            while len(line.rstrip()) > 1 and metrics.width(line.rstrip(), size) > max_width:
+                cut = len(line) - 1
+                while cut > 1 and metrics.width(line[:cut], size) > max_width:
+                    cut -= 1
+                lines.append(line[:cut])
+                line = line[cut:]
+        lines.append(line.rstrip())
+    return lines
+
+
+def text_appearance(value, rect, da, metrics, quadding=0, multiline=False):
+    """
+    Content stream bytes drawing `value` in a widget of `rect`, with the
+    form XObject's /BBox [0 0 width height].
+    """
+    width = abs(float(rect[2]) - float(rect[0]))
+    height = abs(float(rect[3]) - float(rect[1]))
+    font_name, size, other_ops = parse_da(da)
+    inner_width = max(width - 2 * PADDING, 0)
+    inner_height = max(height - 2 * PADDING, 0)
+
+    if multiline:
+        if not size:
+            size = AUTO_SIZE_MAX
+            while size > AUTO_SIZE_MIN and (
+                    len(wrap_lines(value, metrics, size, inner_width)) * metrics.line_height(size)
+                    > inner_height):
+                size -= 0.5
+        lines = wrap_lines(value, metrics, size, inner_width)
+        leading = metrics.line_height(size)
+        y = height - PADDING - metrics.ascent * size / 1000
+    else:
+        data = metrics.encode(re.sub(r"[\r\n]+", " ", value))
+        if not size:
+            size = min(AUTO_SIZE_MAX, inner_height * 1000 / (metrics.ascent - metrics.descent))
+            text_width = metrics.width(data, 1)
+            if text_width:
+                size = min(size, inner_width / text_width)
+            size = max(size, AUTO_SIZE_MIN)
+        lines = [data]
+        leading = 0
+        y = (height - metrics.line_height(size)) / 2 - metrics.descent * size / 1000
+
+    ops = [b"/Tx BMC", b"q",
+           f"{num(PADDING / 2)} {num(PADDING / 2)} {num(width - PADDING)} {num(height - PADDING)} re W n".encode(),
+           b"BT", f"/{font_name} {num(size)} Tf {other_ops}".strip().encode()]
+    for line in lines:
+        line_width = metrics.width(line, size)
+        if quadding == 1:
+            x = (width - line_width) / 2
+        elif quadding == 2:
+            x = width - PADDING - line_width
+        else:
+            x = PADDING
+        ops.append(f"1 0 0 1 {num(x)} {num(y)} Tm ".encode() + pdf_string(line) + b" Tj")
+        y -= leading
+    ops += [b"ET", b"Q", b"EMC"]
+    return b"\n".join(ops) + b"\n"
+
+
+def form_placement(rect, bbox, matrix=None):
+    """
+    The cm operands that map a form XObject's (transformed) /BBox onto an
+    annotation /Rect — PDF 1.7 §12.5.5, for painting an appearance into
+    page content when flattening.
+    """
+    a, b, c, d, e, f = [float(v) for v in (matrix or (1, 0, 0, 1, 0, 0))]
+    x0, y0, x1, y1 = [float(v) for v in bbox]
+    corners = [(a * x + c * y + e, b * x + d * y + f) for x in (x0, x1) for y in (y0, y1)]
+    bx0, bx1 = min(p[0] for p in corners), max(p[0] for p in corners)
+    by0, by1 = min(p[1] for p in corners), max(p[1] for p in corners)
+    rx0, ry0 = min(float(rect[0]), float(rect[2])), min(float(rect[1]), float(rect[3]))
+    rx1, ry1 = max(float(rect[0]), float(rect[2])), max(float(rect[1]), float(rect[3]))
+    sx = (rx1 - rx0) / (bx1 - bx0) if bx1 != bx0 else 1
+    sy = (ry1 - ry0) / (by1 - by0) if by1 != by0 else 1
+    return (sx, 0, 0, sy, rx0 - bx0 * sx, ry0 - by0 * sy)
@@ -0,0 +1,270 @@
+"""
+PDF Incremental Update Writer
+
+Appends changed objects to an unmodified PDF as an incremental update
+(PDF 1.7 §7.5.6): the original bytes are written through untouched, then
+the new object bodies, a cross-reference stream covering only those
+objects (/Prev -> the original's last xref section) and a new startxref.
+
+Used by fill_acord25.py --mode incremental: a filled certificate is the
+template plus a few KB of widget annotations, instead of a full rewrite.
+
+Encrypted sources are supported for the Standard security handler with
+RC4 (V 1/2, or V 4 with /CFM /V2) and an empty user password — the
+ACORD 25 template's setup. The file key comes from Algorithm 2, is
+checked against /U (Algorithm 4/5), and strings in each appended object
+are encrypted with that object's key (Algorithm 1). Streams are not
+supported in appended objects; the xref stream itself is never encrypted.
+
+An encrypted object is written entry by entry, and each entry's bytes are
+cached per (object, key) for as long as its value is the same object. A
+fill that copies a template annotation and only replaces /V therefore
+encrypts just /V; everything else is reused. Encrypted strings are
+written as literal strings rather than hex, so the update stays close to
+the size of the objects it replaces.
+"""
+
+import codecs
+import hashlib
+import re
+import struct
+from io import BytesIO
+
+from PyPDF2.generic import (
+    ByteStringObject, IndirectObject, NameObject, TextStringObject, encode_pdfdocencoding,
+)
+
+_PASSWORD_PAD = bytes.fromhex(
+    "28BF4E5E4E758A4164004E56FFFA01082E2E00B6D0683E802F0CA9FE6453697A"
+)
+_STARTXREF_RE = re.compile(rb"startxref\s+(\d+)\s+%%EOF", re.S)
+
+
+class UnsupportedEncryption(Exception):
+    """The source PDF's security handler can't be written incrementally."""
+
+
+def raw_bytes(obj):
+    """The bytes behind a PyPDF2 string object (text strings are decoded on read)."""
+    if hasattr(obj, "original_bytes"):
+        return obj.original_bytes
+    if isinstance(obj, bytes):
+        return obj
+    return str(obj).encode("latin-1")
+
+
+def rc4(key, data):
+    s = list(range(256))
+    j = 0
+    for i in range(256):
+        j = (j + s[i] + key[i % len(key)]) & 0xFF
+        s[i], s[j] = s[j], s[i]
+    out = bytearray(len(data))
+    i = j = 0
+    for n, byte in enumerate(data):
+        i = (i + 1) & 0xFF
+        j = (j + s[i]) & 0xFF
+        s[i], s[j] = s[j], s[i]
+        out[n] = byte ^ s[(s[i] + s[j]) & 0xFF]
+    return bytes(out)
+
+
+class StandardSecurity:
+    """File key and per-object keys for an RC4 Standard security handler."""
+
+    def __init__(self, encrypt, first_id, user_password=b""):
+        if encrypt.get("/Filter") != "/Standard":
+            raise UnsupportedEncryption(f"security handler {encrypt.get('/Filter')}")
+        v, r = int(encrypt.get("/V", 0)), int(encrypt.get("/R", 0))
+        if v == 4:
+            filters = {encrypt.get("/StmF", "/Identity"), encrypt.get("/StrF", "/Identity")} - {"/Identity"}
+            cf = encrypt.get("/CF", {})
+            if any(cf.get(name, {}).get("/CFM") != "/V2" for name in filters):
+                raise UnsupportedEncryption("only RC4 (/CFM /V2) crypt filters are supported")
+        elif v not in (1, 2):
+            raise UnsupportedEncryption(f"/V {v} (AES) is not supported")
+        self.revision = r
+        self.key_len = 5 if v == 1 else int(encrypt.get("/Length", 40)) // 8
+        self.encrypt_metadata = bool(encrypt.get("/EncryptMetadata", True))
+        self.key = self._file_key(encrypt, first_id, user_password)
+        if not self._check_user_key(encrypt, first_id):
+            raise UnsupportedEncryption("the template needs a user password")
+
+    def _file_key(self, encrypt, first_id, password):
+        """Algorithm 2: compute the file encryption key from a user password."""
+        padded = (password + _PASSWORD_PAD)[:32]
+        md5 = hashlib.md5(padded)
+        md5.update(raw_bytes(encrypt["/O"]))
+        md5.update(struct.pack("<i", int(encrypt["/P"])))
+        md5.update(first_id)
+        if self.revision >= 4 and not self.encrypt_metadata:
+            md5.update(b"\xff\xff\xff\xff")
+        key = md5.digest()
+        if self.revision >= 3:
+            for _ in range(50):
+                key = hashlib.md5(key[:self.key_len]).digest()
+        return key[:self.key_len]
+
+    def _check_user_key(self, encrypt, first_id):
+        """Algorithms 4/5: does the key reproduce /U?"""
+        u = raw_bytes(encrypt["/U"])
+        if self.revision == 2:
+            return rc4(self.key, _PASSWORD_PAD) == u[:32]
+        value = hashlib.md5(_PASSWORD_PAD + first_id).digest()
+        for i in range(20):
+            value = rc4(bytes(b ^ i for b in self.key), value)
+        return value == u[:16]
+
+    def object_key(self, num, gen):
+        """Algorithm 1: the RC4 key for strings and streams of object num/gen."""
+        data = self.key + struct.pack("<i", num)[:3] + struct.pack("<i", gen)[:2]
+        return hashlib.md5(data).digest()[:min(self.key_len + 5, 16)]
+
+
+def _string_bytes(obj):
+    """Encoded bytes of a string object, as PyPDF2 would write them."""
+    if isinstance(obj, TextStringObject):
+        try:
+            return encode_pdfdocencoding(obj)
+        except UnicodeEncodeError:
+            return codecs.BOM_UTF16_BE + obj.encode("utf-16be")
+    return bytes(obj)
+
+
+_LITERAL_ESCAPES = {ord("\\"): b"\\\\", ord("("): b"\\(", ord(")"): b"\\)",
+                    ord("\r"): b"\\r", ord("\n"): b"\\n"}
+
+
+def literal_string(data):
+    """PDF literal string for raw bytes. Only the delimiters, the backslash
+    and line ends are escaped (a bare CR or LF would be read back as LF),
+    so binary ciphertext costs about a byte per byte instead of hex's two."""
+    if not any(b in _LITERAL_ESCAPES for b in data):
+        return b"(" + data + b")"
+    return b"(" + b"".join(_LITERAL_ESCAPES.get(b) or bytes((b,)) for b in data) + b")"
+
+
+def _encrypted_bytes(obj, key):
+    """Serialized obj with every string RC4-encrypted under `key`."""
+    if isinstance(obj, (TextStringObject, ByteStringObject)):
+        return literal_string(rc4(key, _string_bytes(obj)))
+    if isinstance(obj, IndirectObject):
+        return b"%d %d R" % (obj.idnum, obj.generation)
+    if isinstance(obj, dict):
+        return b"<<" + b"".join(_name_bytes(k) + b" " + _encrypted_bytes(v, key)
+                                for k, v in obj.items()) + b">>"
+    if isinstance(obj, list):
+        return b"[" + b" ".join(_encrypted_bytes(v, key) for v in obj) + b"]"
+    buf = BytesIO()
+    obj.write_to_stream(buf, None)
+    return buf.getvalue()
+
+
+def _name_bytes(name):
+    buf = BytesIO()
+    NameObject(name).write_to_stream(buf, None)
+    return buf.getvalue()
+
+
+class IncrementalUpdate:
+    """
+    Build the update section for one source PDF. Construct once per source
+    (it parses the trailer, startxref and security handler), then call
+    write() per output with {(num, gen): PyPDF2 object}.
+    """
+
+    def __init__(self, source_bytes, reader):
+        self.source = source_bytes
+        matches = list(_STARTXREF_RE.finditer(source_bytes[-2048:]))
+        if not matches:
+            raise ValueError("startxref not found")
+        self.prev = int(matches[-1].group(1))
+        trailer = reader.trailer
+        self.size = max(int(trailer.get("/Size", 0)), self._max_object_number(reader) + 1)
+        self.root = trailer.raw_get("/Root")
+        self.info = trailer.raw_get("/Info") if "/Info" in trailer else None
+        self.encrypt_ref = trailer.raw_get("/Encrypt") if "/Encrypt" in trailer else None
+        self.ids = [raw_bytes(x) for x in trailer["/ID"]] if "/ID" in trailer else None
+        self.security = None
+        self._keys = {}  # (num, gen) -> object key
+        self._entries = {}  # (num, gen, dict key) -> (value, encrypted entry bytes)
+        if self.encrypt_ref is not None:
+            if not self.ids:
+                raise UnsupportedEncryption("encrypted file without /ID")
+            self.security = StandardSecurity(trailer["/Encrypt"], self.ids[0])
+
+    @staticmethod
+    def _max_object_number(reader):
+        nums = [num for gens in reader.xref.values() for num in gens]
+        nums += list(reader.xref_objStm)
+        return max(nums, default=0)
+
+    def _object_bytes(self, num, gen, obj):
+        if self.security is not None:
+            body = self._encrypted_body(num, gen, obj)
+        else:
+            buf = BytesIO()
+            obj.write_to_stream(buf, None)
+            body = buf.getvalue()
+        return b"%d %d obj\n" % (num, gen) + body + b"\nendobj\n"
+
+    def _encrypted_body(self, num, gen, obj):
+        key = self._keys.get((num, gen))
+        if key is None:
+            key = self._keys[(num, gen)] = self.security.object_key(num, gen)
+        if not isinstance(obj, dict):
+            return _encrypted_bytes(obj, key)
+        parts = []
+        for name, value in obj.items():
+            cached = self._entries.get((num, gen, name))
+            if cached is None or cached[0] is not value:
+                cached = (value, _name_bytes(name) + b" " + _encrypted_bytes(value, key))
+                self._entries[(num, gen, name)] = cached
+            parts.append(cached[1])
+        return b"<<" + b"".join(parts) + b">>"
+
+    def write(self, out, objects):
+        """Write source + update to the binary stream `out`. Returns bytes written.
+        Objects are serialized before anything is written, so a bad object
+        can't leave a truncated file behind."""
+        bodies = [(num, gen, self._object_bytes(num, gen, obj))
+                  for (num, gen), obj in sorted(objects.items())]
+
+        out.write(self.source)
+        offset = len(self.source)
+        if not self.source.endswith((b"\n", b"\r")):
+            out.write(b"\n")
+            offset += 1
+
+        entries = []
+        for num, gen, body in bodies:
+            entries.append((num, gen, offset))
+            out.write(body)
+            offset += len(body)
+
+        xref_num = self.size
+        entries.append((xref_num, 0, offset))
+        index, rows = [], []
+        for num, gen, pos in entries:
+            if index and index[-2] + index[-1] == num:
+                index[-1] += 1
+            else:
+                index += [num, 1]
+            rows.append(struct.pack(">BIH", 1, pos, gen))
+        data = b"".join(rows)
+
+        fields = [b"/Type /XRef", b"/Size %d" % (xref_num + 1),
+                  b"/Index [%s]" % b" ".join(b"%d" % n for n in index),
+                  b"/W [1 4 2]", b"/Prev %d" % self.prev,
+                  b"/Root %d %d R" % (self.root.idnum, self.root.generation),
+                  b"/Length %d" % len(data)]
+        if self.info is not None:
+            fields.append(b"/Info %d %d R" % (self.info.idnum, self.info.generation))
+        if self.encrypt_ref is not None:
+            fields.append(b"/Encrypt %d %d R" % (self.encrypt_ref.idnum, self.encrypt_ref.generation))
+        if self.ids:
+            fields.append(b"/ID [<%s> <%s>]" % (self.ids[0].hex().encode(), self.ids[-1].hex().encode()))
+        xref = (b"%d 0 obj\n<< " % xref_num + b" ".join(fields) + b" >>\nstream\n"
+                + data + b"\nendstream\nendobj\nstartxref\n%d\n%%%%EOF\n" % offset)
+        out.write(xref)
+        return offset + len(xref)
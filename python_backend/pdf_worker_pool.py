@@ -0,0 +1,486 @@
+"""
+PDF Job Runner
+
+Keeps N pre-warmed Python workers for the PDF scripts. Without it, every
+certificate fill and dec-page extraction pays for interpreter startup,
+the PyPDF2 / pypdf imports and the ACORD 25 template parse, and
+concurrent requests queue on process startup. The desktop app's
+process_policy_file (src-tauri/src/lib.rs) keeps one pool running and
+sends it extract jobs; fill jobs serve any fill_acord25.py --serve client.
+
+Each worker imports fill_acord25 and policy_engine and loads the template
+once, as fill_acord25.py --serve does. It then runs one job at a time.
+The runner enforces, per job:
+
+  timeout         the worker is killed and replaced, and the job fails (code 4)
+  memory ceiling  a worker over it is replaced. On Linux this happens mid-job
+                  (RSS from /proc, the job fails with code 5). Elsewhere it
+                  happens after the job, from the worker's peak RSS. It is
+                  not enforced on Windows.
+  recycling       a worker is replaced after K jobs
+
+A replacement is started as soon as a worker is retired, so the next job
+finds a warm one.
+
+Usage:
+    python pdf_worker_pool.py                          # JSON lines on stdin/stdout
+    python pdf_worker_pool.py --workers 4 --port 8766  # JSON lines over localhost TCP
+    python pdf_worker_pool.py --timeout 20 --memory-mb 400 --max-jobs 100
+
+Requests are JSON lines. Responses are written as jobs finish, which is
+not necessarily request order, and are matched by "id":
+
+  {"id": 1, "job": "fill", "data": {...}, "mode": "flatten"}
+      -> as fill_acord25.py --serve: {"id": 1, "ok": true, "filled": N, "ms": 12.3, "pdf": "<base64>"}
+  {"id": 2, "job": "extract", "path": "C:/.../dec.pdf"}
+      -> {"id": 2, "ok": true, "ms": 840.2, "text": "..."}
+  {"id": 3, "job": "stats"}
+      -> {"id": 3, "ok": true, "stats": {"queued": 0, "busy": 2, "fill": {"p50_ms": ...}, ...}}
+
+"job" defaults to "fill", so fill_acord25.py --serve clients work
+unchanged. A request can carry "timeout" (seconds) to override --timeout.
+Every response to a fill or extract also has "worker" (pid) and
+"queue_ms". Failures are {"id": ..., "ok": false, "code": N, "error": "..."}:
+
+  1  bad request
+  2  file or template not found
+  3  processing error (1-3 as the scripts' exit codes)
+  4  timeout
+  5  memory ceiling
+  6  worker exited or failed to start
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import queue
+import socketserver
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+# Fix Windows console encoding
+if sys.platform == 'win32':
+    sys.stdout.reconfigure(encoding='utf-8', errors='replace')
+    sys.stderr.reconfigure(encoding='utf-8', errors='replace')
+
+
+DEFAULT_WORKERS = max(1, min(4, (os.cpu_count() or 2) - 1))
+DEFAULT_TIMEOUT = 30.0
+DEFAULT_MEMORY_MB = 512
+DEFAULT_MAX_JOBS = 200
+WARMUP_TIMEOUT = 60.0
+POLL_INTERVAL = 0.05      # seconds between timeout / RSS checks while a job runs
+LATENCY_WINDOW = 1000     # most recent jobs kept per kind for the percentiles
+
+JOB_KINDS = ('fill', 'extract')
+
+# Failure codes past the scripts' own exit codes (1 bad request, 2 not found, 3 processing error)
+TIMEOUT_CODE = 4
+MEMORY_CODE = 5
+WORKER_EXIT_CODE = 6
+
+
+def rss_bytes(pid):
+    """Current resident set size of a process, from /proc (Linux), else None."""
+    try:
+        with open(f'/proc/{pid}/statm', 'rb') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def peak_rss_bytes(children=False):
+    """Peak resident set size of this process, or of its largest waited-for
+    child (POSIX), else None."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def percentile(ordered, p):
+    """Nearest-rank percentile of an already sorted list."""
+    return ordered[min(len(ordered) - 1, max(0, round(p / 100 * len(ordered)) - 1))]
+
+
+def latency_summary(samples):
+    if not samples:
+        return {'count': 0}
+    ordered = sorted(samples)
+    return {'count': len(ordered),
+            'p50_ms': round(percentile(ordered, 50), 1),
+            'p95_ms': round(percentile(ordered, 95), 1),
+            'p99_ms': round(percentile(ordered, 99), 1),
+            'max_ms': round(ordered[-1], 1)}
+
+
+# ── Worker process ──
+
+def _failed_handler(code, error):
+    return lambda request, line: {'ok': False, 'code': code, 'error': error}
+
+
+def _fill_handler(use_cache):
+    """handle(request, line) for fill jobs: fill_acord25's --serve handler on a loaded template."""
+    try:
+        import fill_acord25
+        filler = fill_acord25.TemplateFiller()
+    except FileNotFoundError as e:
+        return _failed_handler(2, f'Template not found: {e.filename}')
+    except Exception as e:
+        return _failed_handler(3, f'ACORD 25 filler unavailable: {e}')
+    cache = None
+    if use_cache and fill_acord25.RESULT_CACHE_MAX_BYTES > 0:
+        cache = fill_acord25.ResultCache()
+    return lambda request, line: fill_acord25.handle_request(filler, line, cache)
+
+
+def _extract_handler():
+    """handle(request, line) for extract jobs: policy_engine.extract_text on request["path"]."""
+    try:
+        from policy_engine import extract_text
+    except Exception as e:
+        return _failed_handler(3, f'Text extraction unavailable: {e}')
+
+    def handle(request, line):
+        path = request.get('path')
+        if not isinstance(path, str) or not path:
+            return {'ok': False, 'code': 1, 'error': 'Extract request must have "path"'}
+        t0 = time.perf_counter()
+        try:
+            text = extract_text(path)
+        except FileNotFoundError:
+            return {'ok': False, 'code': 2, 'error': f'File not found: {path}'}
+        except Exception as e:
+            return {'ok': False, 'code': 3, 'error': f'Failed to process PDF: {e}'}
+        return {'ok': True, 'ms': round((time.perf_counter() - t0) * 1000, 1), 'text': text}
+
+    return handle
+
+
+def _worker_main(conn, use_cache):
+    """
+    Worker process: import and load everything, report ready, then answer
+    (kind, request, line) jobs with (response, peak RSS) until None / EOF.
+    """
+    sys.stdout = sys.stderr  # the parent's stdout carries responses
+    t0 = time.perf_counter()
+    handlers = {'fill': _fill_handler(use_cache), 'extract': _extract_handler()}
+    conn.send(('ready', round((time.perf_counter() - t0) * 1000)))
+    while True:
+        try:
+            job = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            return
+        if job is None:
+            return
+        kind, request, line = job
+        try:
+            response = handlers[kind](request, line)
+        except Exception as e:
+            response = {'ok': False, 'code': 3, 'error': f'{kind} failed: {e}'}
+        conn.send((response, peak_rss_bytes()))
+
+
+class Worker:
+    """One worker process and the parent's end of its pipe."""
+
+    def __init__(self, ctx, use_cache):
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(target=_worker_main, args=(child_conn, use_cache), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.pid = self.process.pid
+        self.jobs = 0
+        self.load_ms = None
+
+    def wait_ready(self, timeout=WARMUP_TIMEOUT):
+        """Block until the worker has finished loading. False if it died or timed out."""
+        try:
+            if self.conn.poll(timeout):
+                _, self.load_ms = self.conn.recv()
+                return True
+        except (EOFError, OSError):
+            pass
+        return False
+
+    def stop(self, kill=False):
+        if not kill:
+            try:
+                self.conn.send(None)
+            except OSError:
+                pass
+            self.process.join(2)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+
+class _Job:
+    __slots__ = ('kind', 'request', 'line', 'timeout', 'future', 'queued_at', 'started_at')
+
+    def __init__(self, kind, request, line, timeout):
+        self.kind = kind
+        self.request = request
+        self.line = line
+        self.timeout = timeout
+        self.future = Future()
+        self.queued_at = time.perf_counter()
+        self.started_at = None
+
+
+class WorkerPool:
+    """
+    N warm workers fed from one FIFO queue. Each worker is driven by its
+    own thread: it sends the next job, watches the timeout and memory
+    ceiling, resolves the job's Future with the response dict, and
+    replaces the worker when it has to be retired.
+    """
+
+    def __init__(self, workers=DEFAULT_WORKERS, timeout=DEFAULT_TIMEOUT, memory_mb=DEFAULT_MEMORY_MB,
+                 max_jobs=DEFAULT_MAX_JOBS, use_cache=True):
+        self.size = workers
+        self.timeout = timeout
+        self.memory_limit = memory_mb * 1024 * 1024 if memory_mb > 0 else None
+        self.max_jobs = max_jobs
+        self.use_cache = use_cache
+        self._ctx = multiprocessing.get_context('spawn')  # no fork from a threaded parent
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._busy = 0
+        self._counts = {'completed': 0, 'failed': 0, 'timeouts': 0, 'over_memory': 0,
+                        'exited': 0, 'recycled': 0}
+        self._latency = {kind: deque(maxlen=LATENCY_WINDOW) for kind in JOB_KINDS}
+        self._queue_wait = deque(maxlen=LATENCY_WINDOW)
+
+        t0 = time.perf_counter()
+        started = [Worker(self._ctx, use_cache) for _ in range(workers)]  # warm up in parallel
+        ready = [w if w.wait_ready() else self._discard(w) for w in started]
+        self.warmup_ms = round((time.perf_counter() - t0) * 1000)
+        self._threads = [threading.Thread(target=self._drive, args=(w,), daemon=True, name=f'pdf-worker-{i}')
+                         for i, w in enumerate(ready)]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, kind, request, line=None):
+        """Queue a fill / extract job -> Future of the response dict."""
+        if kind not in JOB_KINDS:
+            raise ValueError(f'unknown job kind {kind!r}')
+        timeout = request.get('timeout')
+        if not isinstance(timeout, (int, float)) or isinstance(timeout, bool) or timeout <= 0:
+            timeout = self.timeout
+        job = _Job(kind, request, line if line is not None else json.dumps(request), timeout)
+        self._queue.put(job)
+        return job.future
+
+    def close(self):
+        """Finish the queued jobs, then stop every worker."""
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+
+    def stats(self):
+        with self._lock:
+            stats = {'workers': self.size, 'busy': self._busy, 'queued': self._queue.qsize(),
+                     **self._counts, 'queue_wait': latency_summary(self._queue_wait)}
+            for kind in JOB_KINDS:
+                stats[kind] = latency_summary(self._latency[kind])
+        return stats
+
+    def _spawn(self):
+        worker = Worker(self._ctx, self.use_cache)
+        return worker if worker.wait_ready() else self._discard(worker)
+
+    @staticmethod
+    def _discard(worker):
+        sys.stderr.write(f'PDF worker {worker.pid} failed to start\n')
+        worker.stop(kill=True)
+        return None
+
+    def _drive(self, worker):
+        """Thread body: run queued jobs on one worker slot until a None sentinel."""
+        while True:
+            job = self._queue.get()
+            if job is None:
+                break
+            if worker is None:
+                worker = self._spawn()
+            if worker is None:
+                self._finish(job, {'ok': False, 'code': WORKER_EXIT_CODE, 'error': 'PDF worker failed to start'},
+                             None, 'exited')
+                continue
+            response, outcome = self._run(worker, job)
+            worker.jobs += 1
+            self._finish(job, response, worker.pid, outcome)
+            if outcome in ('timeouts', 'over_memory', 'exited'):
+                worker.stop(kill=True)
+                worker = self._spawn()
+            elif outcome == 'recycled':
+                worker.stop()
+                worker = self._spawn()
+        if worker is not None:
+            worker.stop()
+
+    def _run(self, worker, job):
+        """Send one job and wait for it -> (response, outcome for the stats)."""
+        started = job.started_at = time.perf_counter()
+        with self._lock:
+            self._busy += 1
+            self._queue_wait.append((started - job.queued_at) * 1000)
+        try:
+            worker.conn.send((job.kind, job.request, job.line))
+            deadline = started + job.timeout
+            while True:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    return ({'ok': False, 'code': TIMEOUT_CODE,
+                             'error': f'Job timed out after {job.timeout:g}s'}, 'timeouts')
+                if worker.conn.poll(min(POLL_INTERVAL, remaining)):
+                    response, peak = worker.conn.recv()
+                    break
+                if self.memory_limit and (rss_bytes(worker.pid) or 0) > self.memory_limit:
+                    return ({'ok': False, 'code': MEMORY_CODE,
+                             'error': f'Worker exceeded {self.memory_limit // (1024 * 1024)} MB'}, 'over_memory')
+        except (EOFError, OSError):
+            return ({'ok': False, 'code': WORKER_EXIT_CODE, 'error': 'PDF worker exited during the job'}, 'exited')
+        finally:
+            with self._lock:
+                self._busy -= 1
+
+        if (self.memory_limit and peak and peak > self.memory_limit) or \
+                (self.max_jobs and worker.jobs + 1 >= self.max_jobs):
+            return response, 'recycled'
+        return response, None
+
+    def _finish(self, job, response, pid, outcome):
+        now = time.perf_counter()
+        ms = (now - job.queued_at) * 1000
+        queue_ms = ((job.started_at or now) - job.queued_at) * 1000
+        with self._lock:
+            self._latency[job.kind].append(ms)
+            self._counts['completed' if response.get('ok') else 'failed'] += 1
+            if outcome:
+                self._counts[outcome] += 1
+        job.future.set_result({'id': job.request.get('id'), **response,
+                               'worker': pid, 'queue_ms': round(queue_ms, 1)})
+
+
+# ── Serving ──
+
+def handle_line(pool, line, respond):
+    """Parse one request line (bytes as read, or str); respond(response) is called once,
+    possibly from a worker thread."""
+    try:
+        if isinstance(line, bytes):
+            line = line.decode('utf-8')
+        request = json.loads(line)
+    except (UnicodeDecodeError, json.JSONDecodeError) as e:
+        respond({'id': None, 'ok': False, 'code': 1, 'error': f'Invalid JSON input: {e}'})
+        return
+    if not isinstance(request, dict):
+        respond({'id': None, 'ok': False, 'code': 1, 'error': 'Request must be a JSON object'})
+        return
+    kind = request.get('job', 'fill')
+    if kind == 'stats':
+        respond({'id': request.get('id'), 'ok': True, 'stats': pool.stats()})
+        return
+    if kind not in JOB_KINDS:
+        respond({'id': request.get('id'), 'ok': False, 'code': 1,
+                 'error': f'Unknown job {kind!r} (fill, extract or stats)'})
+        return
+    pool.submit(kind, request, line).add_done_callback(lambda future: respond(future.result()))
+
+
+def serve_stdio(pool):
+    """Answer JSON-line requests from stdin on stdout until EOF, then drain the queue."""
+    write_lock = threading.Lock()
+
+    def respond(response):
+        with write_lock:
+            sys.stdout.write(json.dumps(response) + '\n')
+            sys.stdout.flush()
+
+    for raw in sys.stdin.buffer:
+        line = raw.strip()
+        if line:
+            handle_line(pool, line, respond)
+
+
+def serve_socket(pool, port):
+    """Answer JSON-line requests on 127.0.0.1:port (many per connection, answered as they finish)."""
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            done = threading.Condition()
+            pending = [0]
+
+            def respond(response):
+                data = (json.dumps(response) + '\n').encode('utf-8')
+                with done:
+                    try:
+                        self.wfile.write(data)
+                        self.wfile.flush()
+                    except OSError:
+                        pass
+                    pending[0] -= 1
+                    done.notify_all()
+
+            for raw in self.rfile:
+                line = raw.strip()
+                if not line:
+                    continue
+                with done:
+                    pending[0] += 1
+                handle_line(pool, line, respond)
+            with done:
+                done.wait_for(lambda: pending[0] == 0)
+
+    socketserver.ThreadingTCPServer.allow_reuse_address = True
+    with socketserver.ThreadingTCPServer(('127.0.0.1', port), Handler) as server:
+        server.daemon_threads = True
+        sys.stderr.write(f'Serving PDF jobs on 127.0.0.1:{port}\n')
+        server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run fill / extract PDF jobs on a pool of warm workers')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help=f'Worker processes (default: {DEFAULT_WORKERS})')
+    parser.add_argument('--port', type=int,
+                        help='Listen on 127.0.0.1:PORT instead of stdin/stdout')
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT,
+                        help=f'Seconds before a job is killed (default: {DEFAULT_TIMEOUT:g})')
+    parser.add_argument('--memory-mb', type=int, default=DEFAULT_MEMORY_MB,
+                        help=f'Worker RSS ceiling in MB, 0 for none (default: {DEFAULT_MEMORY_MB})')
+    parser.add_argument('--max-jobs', type=int, default=DEFAULT_MAX_JOBS,
+                        help=f'Replace a worker after this many jobs, 0 for never (default: {DEFAULT_MAX_JOBS})')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Workers skip the filled-PDF result cache')
+    args = parser.parse_args()
+    if args.workers < 1:
+        parser.error('--workers must be at least 1')
+
+    pool = WorkerPool(args.workers, args.timeout, args.memory_mb, args.max_jobs, use_cache=not args.no_cache)
+    sys.stderr.write(f'{args.workers} PDF worker(s) ready in {pool.warmup_ms}ms\n')
+    try:
+        if args.port:
+            serve_socket(pool, args.port)
+        else:
+            serve_stdio(pool)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        pool.close()
+        sys.stderr.write(f'PDF worker stats: {json.dumps(pool.stats())}\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,27 +1,78 @@
+import argparse
+import multiprocessing
+import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
 
 from pypdf import PdfReader
 
+# Below this many pages a pool costs more than it saves: each worker is
+# a new interpreter that imports pypdf and parses the file's xref itself
+PARALLEL_MIN_PAGES = 16
+# Page ranges per worker, so one slow range (scanned pages, big tables)
+# doesn't leave the other workers idle
+CHUNKS_PER_WORKER = 2
 
-def extract_text(file_path: str) -> str:
+
+def _extract_pages(reader: PdfReader, start: int, stop: int) -> list:
+    return [reader.pages[i].extract_text() for i in range(start, stop)]
+
+
+def _extract_range(file_path: str, start: int, stop: int) -> list:
+    """Pool worker: open the file and extract pages [start, stop)."""
+    return _extract_pages(PdfReader(file_path), start, stop)
+
+
+def default_workers() -> int:
+    """One per CPU, for workers=0. Daemonic processes (pdf_worker_pool.py
+    workers) can't start a pool, so they get 1."""
+    if multiprocessing.current_process().daemon:
+        return 1
+    return os.cpu_count() or 1
+
+
+def extract_text(file_path: str, workers: int = 1) -> str:
+    """
+    Text of every page, in page order. Serial by default: a pool costs a
+    new interpreter per worker, which a one-off launch on a typical dec
+    page package doesn't earn back. With workers > 1 (0 = one per CPU),
+    files of PARALLEL_MIN_PAGES or more are split into page ranges across
+    a process pool of that size.
+    """
     reader = PdfReader(file_path)
-    pages = []
-    for page in reader.pages:
-        text = page.extract_text()
-        if text:
-            pages.append(text)
-    return "\n".join(pages)
+    page_count = len(reader.pages)
+    workers = min(workers or default_workers(), page_count)
+    if workers < 2 or page_count < PARALLEL_MIN_PAGES:
+        texts = _extract_pages(reader, 0, page_count)
+    else:
+        texts = _extract_parallel(file_path, page_count, workers)
+    return "\n".join(text for text in texts if text)
+
+
+def _extract_parallel(file_path: str, page_count: int, workers: int) -> list:
+    chunk = -(-page_count // (workers * CHUNKS_PER_WORKER))
+    starts = range(0, page_count, chunk)
+    stops = [min(start + chunk, page_count) for start in starts]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        ranges = pool.map(_extract_range, [file_path] * len(starts), starts, stops)
+        return [text for texts in ranges for text in texts]
 
 
 def main():
-    if len(sys.argv) < 2:
+    parser = argparse.ArgumentParser(description="Extract the text of a policy PDF to stdout")
+    parser.add_argument("file_path", nargs="?")
+    parser.add_argument("--workers", type=int, default=1,
+                        help=f"Processes for files of {PARALLEL_MIN_PAGES}+ pages "
+                             f"(default: 1 = serial; 0 = one per CPU)")
+    args = parser.parse_args()
+    if not args.file_path:
         print("ERROR: No file path provided", file=sys.stderr)
         sys.exit(1)
 
-    file_path = sys.argv[1]
+    file_path = args.file_path
 
     try:
-        text = extract_text(file_path)
+        text = extract_text(file_path, args.workers)
         print(text)
     except FileNotFoundError:
         print(f"ERROR: File not found: {file_path}", file=sys.stderr)
@@ -12,14 +12,27 @@ custom role="listbox" components, and searches all iframes.
 Usage:
     python scrape_ezlynx_schema.py
     python scrape_ezlynx_schema.py --output my_schema.json
+    python scrape_ezlynx_schema.py --prime    # overlap lazy dropdown loads
+    python scrape_ezlynx_schema.py --cascade "Industry>Occupation" --cascade "State>County"
+    python scrape_ezlynx_schema.py --storage-state ezlynx_session.json   # log in once, save session
+    python scrape_ezlynx_schema.py --crawl routes.txt --storage-state ezlynx_session.json
+    python scrape_ezlynx_schema.py --refresh  # diff re-scrapes, log to <output>.changes.jsonl
+    python scrape_ezlynx_schema.py --snapshot-dir snapshots/   # save DOMs for bench_scraper.py
 """
 
 import argparse
+import asyncio
+import difflib
 import json
 import os
+import re
 import sys
 import time
 
+from ezlynx_schema_store import (
+    COMPILED_SUFFIX, OptionPool, content_sha1, encode_schema, load_schema_file, save_compiled,
+)
+
 # Fix Windows console encoding
 if sys.platform == 'win32':
     sys.stdout.reconfigure(encoding='utf-8', errors='replace')
@@ -30,7 +43,7 @@ try:
 except ImportError:
     print(
         "ERROR: playwright is not installed.\n"
-        "  Run:  pip install playwright && python -m playwright install chromium",
+        "  Run:  pip install -r requirements.txt && python -m playwright install chromium",
         file=sys.stderr,
     )
     sys.exit(1)
@@ -41,6 +54,11 @@ PLACEHOLDER_TEXTS = {"", "select", "select one", "-- select --", "- select -",
                      "--select--", "choose", "choose one", "none", "--",
                      "please select", "select...", "- none -"}
 
+# Identical option lists share one interned list object (see
+# ezlynx_schema_store), so scrape_frame's label-collision check is an
+# identity test instead of a whole-list comparison.
+OPTION_POOL = OptionPool()
+
 # ── Floating toolbar HTML/CSS/JS injected into every page ──
 # Top-left, compact, draggable. Light self-healing (no subtree MutationObserver).
 TOOLBAR_HTML = """
@@ -143,10 +161,9 @@ TOOLBAR_HTML = """
 })();
 """
 
-# ── JavaScript that runs IN the browser to scrape all dropdowns ──
-# Handles native <select>, Angular Material mat-select, and custom dropdowns
-SCRAPE_JS = """
-() => {
+# Placeholder filter + label resolution shared by every in-page script
+# (SCRAPE_JS, CASCADE_STEP_JS), so they all agree on what a dropdown is called.
+DOM_HELPERS_JS = """
     const PLACEHOLDERS = new Set(['', 'select', 'select one', '-- select --',
         '- select -', '--select--', 'choose', 'choose one', 'none', '--',
         'please select', 'select...', '- none -']);
@@ -159,15 +176,41 @@ SCRAPE_JS = """
         return false;
     }
 
+    // One pass over the DOM resolves every <label for> and every
+    // aria-labelledby target up front, so getLabel() does map lookups
+    // instead of a document query per control. Built on first use; code
+    // that changes the DOM between lookups resets labelIndex to null.
+    let labelIndex = null;
+
+    function buildLabelIndex() {
+        const forText = new Map();   // id -> text of the first <label for=id>
+        const byText = new Map();    // aria-labelledby value -> referenced text
+        const wanted = new Set();
+        document.querySelectorAll('label[for], [aria-labelledby]').forEach(el => {
+            if (el.tagName === 'LABEL') {
+                const f = el.getAttribute('for');
+                if (f && !forText.has(f)) {
+                    forText.set(f, el.textContent.trim().replace(/\\*/g, '').trim());
+                }
+            }
+            const by = el.getAttribute('aria-labelledby');
+            if (by) wanted.add(by);
+        });
+        // getElementById semantics: first element in document order wins
+        document.querySelectorAll('[id]').forEach(el => {
+            if (wanted.has(el.id) && !byText.has(el.id)) byText.set(el.id, el.textContent.trim());
+        });
+        return {forText, byText};
+    }
+
     function getLabel(el) {
+        if (!labelIndex) labelIndex = buildLabelIndex();
+
         // 1. Check id -> matching <label for="id">
         const id = el.id || el.getAttribute('id') || '';
         if (id) {
-            const lbl = document.querySelector('label[for="' + id + '"]');
-            if (lbl) {
-                const t = lbl.textContent.trim().replace(/\\*/g, '').trim();
-                if (t) return t;
-            }
+            const t = labelIndex.forText.get(id);
+            if (t) return t;
         }
 
         // 2. aria-label
@@ -177,11 +220,8 @@ SCRAPE_JS = """
         // 3. aria-labelledby
         const ariaBy = el.getAttribute('aria-labelledby');
         if (ariaBy) {
-            const ref = document.getElementById(ariaBy);
-            if (ref) {
-                const t = ref.textContent.trim();
-                if (t) return t;
-            }
+            const t = labelIndex.byText.get(ariaBy);
+            if (t) return t;
         }
 
         // 4. Closest fieldset > legend
@@ -233,8 +273,29 @@ SCRAPE_JS = """
 
         return '(unknown)';
     }
+"""
 
+# ── JavaScript that runs IN the browser to scrape all dropdowns ──
+# Handles native <select>, Angular Material mat-select, and custom dropdowns
+SCRAPE_JS = """
+() => {
+""" + DOM_HELPERS_JS + """
     const results = {};
+    // label -> signature of the option list stored under it. Each list is
+    // joined once, so a collision probe is one string compare instead of
+    // JSON.stringify-ing both lists on every pass.
+    const signatures = {};
+
+    function addResult(label, values) {
+        const sig = values.join('\\u001f');
+        let key = label;
+        let suffix = 2;
+        while (key in signatures && signatures[key] !== sig) {
+            key = label + ' (' + suffix + ')'; suffix++;
+        }
+        signatures[key] = sig;
+        results[key] = values;
+    }
 
     // ── 1. Native <select> elements ──
     document.querySelectorAll('select').forEach(sel => {
@@ -247,12 +308,7 @@ SCRAPE_JS = """
             if (!isPlaceholder(v, t)) values.push(t);
         });
         if (values.length > 0) {
-            let key = label;
-            let suffix = 2;
-            while (results[key] && JSON.stringify(results[key]) !== JSON.stringify(values)) {
-                key = label + ' (' + suffix + ')'; suffix++;
-            }
-            results[key] = values;
+            addResult(label, values);
         }
     });
 
@@ -268,12 +324,7 @@ SCRAPE_JS = """
             if (!isPlaceholder(v, t)) values.push(t);
         });
         if (values.length > 0) {
-            let key = label;
-            let suffix = 2;
-            while (results[key] && JSON.stringify(results[key]) !== JSON.stringify(values)) {
-                key = label + ' (' + suffix + ')'; suffix++;
-            }
-            results[key] = values;
+            addResult(label, values);
         }
     });
 
@@ -291,12 +342,7 @@ SCRAPE_JS = """
                     if (t && !isPlaceholder('', t)) values.push(t);
                 });
                 if (values.length > 0) {
-                    let key = label;
-                    let suffix = 2;
-                    while (results[key] && JSON.stringify(results[key]) !== JSON.stringify(values)) {
-                        key = label + ' (' + suffix + ')'; suffix++;
-                    }
-                    results[key] = values;
+                    addResult(label, values);
                 }
             }
         }
@@ -321,12 +367,7 @@ SCRAPE_JS = """
                 if (t && !isPlaceholder('', t)) values.push(t);
             });
             if (values.length > 0) {
-                let key = label;
-                let suffix = 2;
-                while (results[key] && JSON.stringify(results[key]) !== JSON.stringify(values)) {
-                    key = label + ' (' + suffix + ')'; suffix++;
-                }
-                results[key] = values;
+                addResult(label, values);
             }
         });
     });
@@ -404,16 +445,10 @@ def is_placeholder(text: str) -> bool:
     return text.strip().lower() in PLACEHOLDER_TEXTS
 
 
-def scrape_frame(frame, existing_schema: dict, frame_name: str = "main") -> dict:
-    """Run the in-browser JS scraper on a single frame."""
+def merge_frame_result(result, existing_schema: dict, frame_name: str = "main"):
+    """Merge one frame's SCRAPE_JS result into the schema.
+    Returns (schema, new_count, keys) — keys are the schema labels this frame produced."""
     schema = dict(existing_schema)
-
-    try:
-        result = frame.evaluate(SCRAPE_JS)
-    except Exception as e:
-        print(f"  [!] Could not scrape frame '{frame_name}': {e}")
-        return schema
-
     dropdowns = result.get("dropdowns", {})
     debug = result.get("debug", {})
 
@@ -424,11 +459,13 @@ def scrape_frame(frame, existing_schema: dict, frame_name: str = "main") -> dict
           f"{debug.get('iframeCount', 0)} iframes")
 
     new_count = 0
+    keys = []
     for key, values in dropdowns.items():
-        # Dedupe with existing schema
+        # Dedupe with existing schema (interned lists: O(1) identity compare)
+        values = OPTION_POOL.intern(values)
         final_key = key
         suffix = 2
-        while final_key in schema and schema[final_key] != values:
+        while final_key in schema and schema[final_key] is not values:
             final_key = f"{key} ({suffix})"
             suffix += 1
 
@@ -436,75 +473,282 @@ def scrape_frame(frame, existing_schema: dict, frame_name: str = "main") -> dict
             new_count += 1
 
         schema[final_key] = values
+        keys.append(final_key)
         print(f"  [v] '{final_key}' - {len(values)} options")
 
     if not dropdowns:
         print(f"  [!] No dropdowns found in {frame_name} frame.")
 
     print(f"  [{frame_name}] This frame: {new_count} new, {len(schema)} total across all frames")
+    return schema, new_count, keys
+
+
+def scrape_frame(frame, existing_schema: dict, frame_name: str = "main") -> dict:
+    """Run the in-browser JS scraper on a single frame."""
+    try:
+        result = frame.evaluate(SCRAPE_JS)
+    except Exception as e:
+        print(f"  [!] Could not scrape frame '{frame_name}': {e}")
+        return dict(existing_schema)
+    schema, _, _ = merge_frame_result(result, existing_schema, frame_name)
     return schema
 
 
-def scrape_all_frames(page, existing_schema: dict) -> dict:
-    """Scrape the main frame AND all iframes on the page."""
-    schema = dict(existing_schema)
+async def _timed_evaluate(impl_frame, expression):
+    t0 = time.perf_counter()
+    try:
+        result = await impl_frame.evaluate(expression)
+        return result, None, (time.perf_counter() - t0) * 1000
+    except Exception as e:
+        return None, e, (time.perf_counter() - t0) * 1000
 
-    # 1. Scrape main frame
-    schema = scrape_frame(page, schema, "main")
 
-    # 2. Scrape all child frames (iframes)
-    frames = page.frames
-    print(f"\n  [*] Page has {len(frames)} frames total (including main)")
+def _async_bridge(page, objs):
+    """
+    Playwright's sync API has no public way to overlap calls, so the
+    concurrent paths run coroutines on its event loop: page._sync() runs
+    one to completion and each object's _impl_obj is its async-API twin.
+    Both are private, which is why requirements.txt pins Playwright to the
+    release this was checked against. Returns (run, impls), or None after
+    saying so when a Playwright release no longer has them — callers then
+    go serial.
+    """
+    run = getattr(page, "_sync", None)
+    impls = [getattr(o, "_impl_obj", None) for o in objs]
+    if callable(run) and all(impls):
+        return run, impls
+    print("  [!] This Playwright has no page._sync / _impl_obj bridge — running serially")
+    return None
 
-    for i, frame in enumerate(frames):
-        if frame == page.main_frame:
-            continue  # Already scraped
+
+def evaluate_frames(page, frames):
+    """
+    Evaluate SCRAPE_JS in every frame at once. Returns [(result, error, ms)]
+    in the same order as `frames`.
+
+    The evaluates are gathered through _async_bridge(), so the round trips
+    overlap and the whole step costs roughly the slowest frame. Without the
+    bridge, or if the gather itself fails, frames are evaluated one at a time.
+    """
+    bridge = _async_bridge(page, frames)
+    if bridge:
+        run, impls = bridge
+
+        async def gather_all():
+            return await asyncio.gather(*[_timed_evaluate(impl, SCRAPE_JS) for impl in impls])
+        try:
+            return run(gather_all())
+        except Exception as e:
+            print(f"  [!] Concurrent frame scrape failed ({e}) — falling back to serial")
+
+    results = []
+    for frame in frames:
+        t0 = time.perf_counter()
+        try:
+            results.append((frame.evaluate(SCRAPE_JS), None, (time.perf_counter() - t0) * 1000))
+        except Exception as e:
+            results.append((None, e, (time.perf_counter() - t0) * 1000))
+    return results
+
+
+def scrape_all_frames(page, existing_schema: dict):
+    """
+    Scrape the main frame AND all iframes on the page concurrently, then
+    merge in frame order (main first) so label suffixes are deterministic.
+    Returns (schema, frame_stats, page_keys) — per-frame timing for _pages
+    and every schema label found on the page.
+    """
+    schema = dict(existing_schema)
+
+    frames = [page.main_frame] + [f for f in page.frames if f != page.main_frame]
+    names = ["main"]
+    for i, frame in enumerate(frames[1:], start=1):
         frame_name = frame.name or frame.url or f"frame-{i}"
         # Truncate long names
         if len(frame_name) > 60:
             frame_name = frame_name[:57] + "..."
-        try:
-            schema = scrape_frame(frame, schema, frame_name)
-        except Exception as e:
-            print(f"  [!] Error scraping frame '{frame_name}': {e}")
+        names.append(frame_name)
+    print(f"\n  [*] Page has {len(frames)} frames total (including main)")
 
-    return schema
+    t0 = time.perf_counter()
+    results = evaluate_frames(page, frames)
+    wall_ms = (time.perf_counter() - t0) * 1000
+
+    frame_stats = []
+    page_keys = []
+    for frame_name, (result, error, ms) in zip(names, results):
+        stat = {"name": frame_name, "ms": round(ms)}
+        if error is not None:
+            print(f"  [!] Could not scrape frame '{frame_name}': {error}")
+            stat["error"] = str(error).splitlines()[0][:200]
+        else:
+            schema, new_count, keys = merge_frame_result(result or {}, schema, frame_name)
+            page_keys.extend(keys)
+            stat["dropdowns"] = len((result or {}).get("dropdowns", {}))
+            stat["new"] = new_count
+        frame_stats.append(stat)
+
+    summed = sum(st["ms"] for st in frame_stats)
+    print(f"\n  [*] Frame scrape: {wall_ms:.0f}ms wall for {len(frames)} frame(s) "
+          f"(sum of frame times {summed}ms)")
+    return schema, frame_stats, page_keys
+
+
+# ── In-page dropdown pre-population ──
+# Opens each visible custom dropdown and waits on option-node mutations in
+# the overlay instead of fixed sleeps: a dropdown is done once options have
+# appeared and the overlay has been quiet for quietMs, or it is reported as
+# timed out at capMs (empty or still loading -> incomplete list). With
+# prime=true every trigger is first opened and closed back-to-back so the
+# lazy data loads behind independent dropdowns are in flight together
+# before the waiting pass starts.
+PREPOPULATE_CAP_MS = 1500
+PREPOPULATE_QUIET_MS = 60
+
+PREPOPULATE_JS = """
+async ({capMs, quietMs, prime}) => {
+    const TRIGGERS = 'mat-select, [role="combobox"], .k-dropdown, .k-dropdownlist, [data-role="dropdownlist"]';
+    const OPTIONS = 'mat-option, [role="option"], .k-item, .k-list-item';
+    const triggers = Array.from(document.querySelectorAll(TRIGGERS))
+        .filter(el => el.offsetParent !== null);
+    // mat-select panels render in the CDK overlay; Kendo popups attach to body
+    const root = () => document.querySelector('.cdk-overlay-container') || document.body;
+    const optionCount = () => root().querySelectorAll(OPTIONS).length;
+
+    function labelOf(el) {
+        const aria = el.getAttribute('aria-label');
+        if (aria && aria.trim()) return aria.trim();
+        const id = el.id || '';
+        if (id) {
+            const lbl = document.querySelector('label[for="' + id + '"]');
+            if (lbl && lbl.textContent.trim()) return lbl.textContent.trim().replace(/\\*/g, '').trim();
+        }
+        const field = el.closest('.mat-form-field, mat-form-field, [class*="form-field"]');
+        const fl = field && field.querySelector('mat-label, .mat-form-field-label, label');
+        if (fl && fl.textContent.trim()) return fl.textContent.trim().replace(/\\*/g, '').trim();
+        return el.getAttribute('formcontrolname') || el.getAttribute('name') || id || '(unknown)';
+    }
 
+    function close() {
+        const backdrop = document.querySelector('.cdk-overlay-backdrop');
+        if (backdrop) { backdrop.click(); return; }
+        document.dispatchEvent(new KeyboardEvent('keydown',
+            {key: 'Escape', code: 'Escape', keyCode: 27, bubbles: true}));
+        document.body.click();
+    }
+
+    // Resolve when done(count) holds after a quiet period, or at the cap.
+    function waitFor(done, cap) {
+        const t0 = performance.now();
+        return new Promise(resolve => {
+            let quiet = null, finished = false;
+            const finish = (timedOut) => {
+                if (finished) return;
+                finished = true;
+                obs.disconnect(); clearTimeout(quiet); clearTimeout(capTimer);
+                resolve({count: optionCount(), timedOut, ms: Math.round(performance.now() - t0)});
+            };
+            const check = () => {
+                clearTimeout(quiet);
+                if (done(optionCount())) quiet = setTimeout(() => finish(false), quietMs);
+            };
+            const obs = new MutationObserver(check);
+            obs.observe(root(), {childList: true, subtree: true});
+            const capTimer = setTimeout(() => finish(true), cap);
+            check();
+        });
+    }
+
+    if (prime) {
+        for (const el of triggers) {
+            try { el.click(); close(); } catch (e) {}
+        }
+        await waitFor(n => n === 0, capMs);
+    }
 
-def click_all_dropdowns_to_populate(page):
+    const timedOut = [];
+    let clicked = 0, totalMs = 0;
+    for (const el of triggers) {
+        try {
+            // Previous panel must be gone, or its options count as this one's
+            if (optionCount() > 0) await waitFor(n => n === 0, 300);
+            const opened = waitFor(n => n > 0, capMs);
+            el.click();
+            const r = await opened;
+            totalMs += r.ms;
+            if (r.timedOut) timedOut.push({label: labelOf(el), options: r.count});
+            close();
+            clicked++;
+        } catch (e) {}
+    }
+    close();
+    return {clicked, timedOut, totalMs};
+}
+"""
+
+
+def click_all_dropdowns_to_populate(page, prime=False):
     """
-    Pre-click Angular Material dropdowns to populate lazy options.
-    Runs entirely in-browser via a single async evaluate — no Python round-trips.
-    Only targets mat-select (native <select> already has options in DOM).
+    Pre-open custom dropdowns so lazy option lists are populated before
+    SCRAPE_JS runs. Runs entirely in-browser via PREPOPULATE_JS — one
+    evaluate, no Python round-trips. Native <select> already has its
+    options in the DOM and is skipped.
+
+    Returns the labels of dropdowns that hit PREPOPULATE_CAP_MS (their
+    scraped option lists may be incomplete).
     """
     try:
-        result = page.evaluate("""async () => {
-            const triggers = Array.from(document.querySelectorAll(
-                'mat-select, [role="combobox"], .k-dropdown, .k-dropdownlist, [data-role="dropdownlist"]'
-            )).filter(el => el.offsetParent !== null);
-
-            let clicked = 0;
-            for (const el of triggers) {
-                try {
-                    el.click();
-                    await new Promise(r => setTimeout(r, 150));
-                    // Close overlay
-                    const esc = new KeyboardEvent('keydown', {key:'Escape', code:'Escape', keyCode:27, bubbles:true});
-                    document.dispatchEvent(esc);
-                    document.body.click();
-                    await new Promise(r => setTimeout(r, 80));
-                    clicked++;
-                } catch(e) {}
-            }
-            // Final cleanup
-            const overlay = document.querySelector('.cdk-overlay-backdrop');
-            if (overlay) overlay.click();
-            return clicked;
-        }""")
-        if result and result > 0:
-            print(f"  [*] Pre-clicked {result} custom dropdowns (in-browser, no round-trips)")
+        result = page.evaluate(PREPOPULATE_JS, {
+            "capMs": PREPOPULATE_CAP_MS,
+            "quietMs": PREPOPULATE_QUIET_MS,
+            "prime": prime,
+        })
     except Exception as e:
         print(f"  [!] Pre-click step error: {e}")
+        return []
+
+    clicked = result.get("clicked", 0)
+    timed_out = result.get("timedOut", [])
+    if clicked:
+        print(f"  [*] Pre-opened {clicked} custom dropdowns in {result.get('totalMs', 0)}ms "
+              f"(mutation-driven{', primed' if prime else ''})")
+    for t in timed_out:
+        print(f"  [!] '{t.get('label')}' still loading after {PREPOPULATE_CAP_MS}ms "
+              f"({t.get('options', 0)} options) — list may be incomplete")
+    return [t.get("label") for t in timed_out]
+
+
+# Snapshot of the DOM as the scraper sees it (after pre-population), with
+# scripts removed so it can be replayed offline via page.set_content() —
+# bench_scraper.py runs SCRAPE_JS against these.
+SNAPSHOT_JS = """
+() => {
+    const root = document.documentElement.cloneNode(true);
+    root.querySelectorAll('script, noscript, base, link[rel="preload"], link[rel="modulepreload"], #_altech_toolbar')
+        .forEach(el => el.remove());
+    return '<!DOCTYPE html>\\n' + root.outerHTML;
+}
+"""
+
+
+def save_dom_snapshot(page, snapshot_dir, page_key):
+    """Write the page (and each child frame) to snapshot_dir as HTML."""
+    if not snapshot_dir:
+        return
+    slug = re.sub(r"[^A-Za-z0-9]+", "-", page_key).strip("-") or "page"
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    os.makedirs(snapshot_dir, exist_ok=True)
+    frames = [page.main_frame] + [f for f in page.frames if f != page.main_frame]
+    for i, frame in enumerate(frames):
+        name = f"{slug}-{stamp}" + (f".frame{i}" if i else "") + ".html"
+        try:
+            html = frame.evaluate(SNAPSHOT_JS)
+        except Exception as e:
+            print(f"  [!] Could not snapshot {name}: {e}")
+            continue
+        with open(os.path.join(snapshot_dir, name), "w", encoding="utf-8") as f:
+            f.write(html)
+    print(f"  [*] DOM snapshot saved to {snapshot_dir}/{slug}-{stamp}*.html")
 
 
 def get_page_label(page):
@@ -521,22 +765,157 @@ def get_page_label(page):
         return {"heading": "", "path": "", "url": ""}
 
 
-def save_schema(output_file, all_schema, page_map):
-    """Save schema to disk (called after each page scrape for safety)."""
+def save_schema(output_file, all_schema, page_map, cascades=None):
+    """Write the canonical schema file atomically (tmp file + os.replace)."""
     if not all_schema:
         return
-    output_data = {"_pages": page_map}
-    output_data.update(all_schema)
-    with open(output_file, "w", encoding="utf-8") as f:
-        json.dump(output_data, f, indent=4, ensure_ascii=False)
-
-
-def scrape_current_page(page, all_schema, page_map, output_file):
-    """Scrape the current page, update schema + page_map, auto-save."""
+    meta = {"_pages": page_map}
+    if cascades:
+        meta["_cascades"] = cascades
+    output_data = encode_schema(all_schema, meta)
+    raw = json.dumps(output_data, indent=4, ensure_ascii=False).encode("utf-8")
+    tmp_file = output_file + ".tmp"
+    with open(tmp_file, "wb") as f:
+        f.write(raw)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_file, output_file)
+    write_compiled(output_file, raw, all_schema, page_map, cascades)
+
+
+def write_compiled(output_file, raw, all_schema, page_map, cascades=None):
+    """Emit <output>.compiled for the filler (see ezlynx_schema_store).
+    Resolved against the filler's own mapping tables; skipped quietly if
+    the filler can't be imported — it then compiles in memory at load."""
+    try:
+        import ezlynx_filler as filler
+        compiled = filler.compile_filler_schema(all_schema, page_map, content_sha1(raw),
+                                                cascades=cascades)
+        save_compiled(output_file + COMPILED_SUFFIX, compiled)
+    except Exception as e:
+        print(f"  [!] Compiled schema not written: {e}")
+
+
+# ── Append-only save journal ──
+# Rewriting the whole indented schema after every page costs O(schema) per
+# save and a crash mid-write truncates it. Instead each scraped page appends
+# one JSON line (page entry + only the dropdown keys it added or changed) to
+# <output>.journal with flush + fsync. The journal is compacted into the
+# canonical file every COMPACT_EVERY_PAGES records and on exit, and replayed
+# on startup, so a killed session loses nothing. Records only ever set
+# values, so replaying over an already-compacted file is harmless.
+# Cascade crawl steps are journaled the same way (one record per parent
+# value) and double as the crawl's resume checkpoint.
+COMPACT_EVERY_PAGES = 10
+
+
+class SchemaJournal:
+    """Per-page delta log next to the schema file. Also owns the cascade data."""
+
+    def __init__(self, output_file):
+        self.output_file = output_file
+        self.path = output_file + ".journal"
+        self.pending = 0  # page records appended since the last compaction
+        self.torn_tail = False  # last line on disk has no newline (killed mid-append)
+        self.cascades = {}  # "Parent > Child" -> {parent, child, values, timedOut}
+
+    def append(self, page_key, page_entry, changed, removed=()):
+        """Append one page's delta. `changed` maps dropdown key -> options;
+        `removed` lists keys a refresh dropped from the schema."""
+        record = {"page": page_key, "entry": page_entry, "dropdowns": changed}
+        if removed:
+            record["removed"] = list(removed)
+        self._write(record)
+        self.pending += 1
+
+    def append_cascade(self, key, parent, child, parent_value, options, timed_out=False):
+        """Record one parent value's child options (and apply it in memory)."""
+        self._write({"cascade": key, "parent": parent, "child": child,
+                     "value": parent_value, "options": options, "timedOut": timed_out})
+        self._apply_cascade(key, parent, child, parent_value, options, timed_out)
+
+    def _apply_cascade(self, key, parent, child, parent_value, options, timed_out):
+        entry = self.cascades.setdefault(
+            key, {"parent": parent, "child": child, "values": {}, "timedOut": []})
+        entry["values"][parent_value] = OPTION_POOL.intern(options)
+        if timed_out and parent_value not in entry["timedOut"]:
+            entry["timedOut"].append(parent_value)
+        elif not timed_out and parent_value in entry["timedOut"]:
+            entry["timedOut"].remove(parent_value)
+
+    def _write(self, record):
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+        if self.torn_tail:
+            line = "\n" + line
+            self.torn_tail = False
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def replay(self, all_schema, page_map):
+        """Apply journal records left by a previous session. Returns the count.
+
+        A torn final line (killed mid-append) is ignored — every earlier
+        record was fsynced before the next scrape began.
+        """
+        if not os.path.exists(self.path):
+            return 0
+        applied = 0
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                self.torn_tail = not line.endswith("\n")
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    print("  [!] Ignoring truncated journal record")
+                    continue
+                if "cascade" in record:
+                    self._apply_cascade(record["cascade"], record.get("parent"),
+                                        record.get("child"), record.get("value"),
+                                        record.get("options", []), record.get("timedOut", False))
+                    applied += 1
+                    continue
+                for key, values in record.get("dropdowns", {}).items():
+                    all_schema[key] = OPTION_POOL.intern(values)
+                for key in record.get("removed", []):
+                    all_schema.pop(key, None)
+                if record.get("page") is not None:
+                    page_map[record["page"]] = record.get("entry", {})
+                applied += 1
+        self.pending = applied
+        return applied
+
+    def compact(self, all_schema, page_map):
+        """Fold the journal into the canonical file, then drop it."""
+        save_schema(self.output_file, all_schema, page_map, self.cascades)
+        if all_schema and os.path.exists(self.path):
+            os.remove(self.path)
+        self.pending = 0
+
+    def maybe_compact(self, all_schema, page_map):
+        if self.pending >= COMPACT_EVERY_PAGES:
+            self.compact(all_schema, page_map)
+            return True
+        return False
+
+
+def scrape_current_page(page, all_schema, page_map, journal, prime=False, changelog=None,
+                        snapshot_dir=None):
+    """Scrape the current page, update schema + page_map, journal the delta.
+
+    With a changelog (--refresh), a page already in page_map is re-scraped
+    and diffed against the stored lists instead of skipped.
+    """
     page_info = get_page_label(page)
     page_key = page_info.get('path', 'unknown')
     page_label = page_info.get('heading', '') or page_key.split('/')[-1] or 'Unknown'
 
+    if page_key in page_map and changelog is not None:
+        return refresh_current_page(page, page_key, page_label, all_schema, page_map,
+                                    journal, changelog, prime=prime,
+                                    snapshot_dir=snapshot_dir)
+
     # Skip if already scraped (unless user forced via Scrape button)
     if page_key in page_map:
         prev = page_map[page_key]
@@ -552,33 +931,42 @@ def scrape_current_page(page, all_schema, page_map, output_file):
 
     update_toolbar(page, len(all_schema), f"Scraping {page_label}...")
 
-    keys_before = set(all_schema.keys())
+    schema_before = all_schema
 
-    # Pre-click custom dropdowns (runs in-browser, fast)
-    click_all_dropdowns_to_populate(page)
+    # Pre-open custom dropdowns (runs in-browser, waits on option mutations)
+    timed_out = click_all_dropdowns_to_populate(page, prime=prime)
+    save_dom_snapshot(page, snapshot_dir, page_key)
 
     # Scrape
+    frame_stats = []
+    page_keys = []
     try:
-        all_schema = scrape_all_frames(page, all_schema)
+        all_schema, frame_stats, page_keys = scrape_all_frames(page, all_schema)
     except Exception as e:
         print(f"[!] Scrape error: {e}")
 
     # Track page
-    new_keys = [k for k in all_schema.keys() if k not in keys_before]
-    existing_dd = set()
+    new_keys = [k for k in all_schema.keys() if k not in schema_before]
+    existing_dd = set(page_keys)
     for k in new_keys:
         existing_dd.add(k)
-    # Include all keys found on this page (new ones)
+    # Include all keys found on this page (not just the new ones, so a
+    # forced or crawled re-scrape keeps the page's full dropdown list)
     page_map[page_key] = {
         "label": page_label,
         "dropdowns": sorted(existing_dd),
+        "frames": frame_stats,
+        "timedOut": timed_out,
         "lastScraped": time.strftime("%Y-%m-%dT%H:%M:%S")
     }
 
-    # Auto-save immediately
-    save_schema(output_file, all_schema, page_map)
+    # Auto-save immediately: journal only what this page added or changed
+    changed = {k: v for k, v in all_schema.items() if schema_before.get(k) != v}
+    journal.append(page_key, page_map[page_key], changed)
+    compacted = journal.maybe_compact(all_schema, page_map)
     page_count = len(page_map)
-    print(f"  [*] Auto-saved. {len(all_schema)} total from {page_count} page(s).")
+    print(f"  [*] Auto-saved ({len(changed)} changed"
+          f"{', compacted' if compacted else ''}). {len(all_schema)} total from {page_count} page(s).")
 
     update_toolbar(page, len(all_schema),
         f"Done! {len(all_schema)} total, {page_count} pages. Navigate or Save & Close.")
@@ -586,35 +974,548 @@ def scrape_current_page(page, all_schema, page_map, output_file):
     return all_schema, page_map
 
 
-def run(output_file: str):
-    print("--- EZLynx Schema Scraper ---")
-    print("[*] Toolbar appears at top-center of the browser (draggable)")
-    print("[*] AUTO-SCRAPES when you navigate to a new page")
-    print("[*] AUTO-SAVES after each page (safe to close anytime)")
-    print("[*] Skips pages already scraped\n")
+# ── Refresh: diff a re-scrape against the stored lists ──
+# --refresh re-scrapes pages already in _pages, matches the fresh dropdowns
+# to the page's stored keys (same base label, same order) and writes only
+# what changed. Every change is appended to <output>.changes.jsonl under a
+# per-run version number: options added/removed per dropdown, near-identical
+# removed/added pairs reported as renames, dropdowns that appeared or
+# disappeared, and the filler mappings (*_DROPDOWN_LABELS, ABBREVIATIONS)
+# the change touches — a removed option there is an ERR_NO_MATCH waiting
+# to happen.
+RENAME_CUTOFF = 0.8
+_SUFFIX_RE = re.compile(r" \(\d+\)$")
+
+
+def diff_options(old, new):
+    """Returns (added, removed, renamed) between two option lists."""
+    old_set, new_set = set(old), set(new)
+    added = [o for o in new if o not in old_set]
+    removed = [o for o in old if o not in new_set]
+    renamed = []
+    for o in list(removed):
+        match = difflib.get_close_matches(o, added, n=1, cutoff=RENAME_CUTOFF)
+        if match:
+            renamed.append([o, match[0]])
+            removed.remove(o)
+            added.remove(match[0])
+    return added, removed, renamed
+
+
+def filler_mappings_affected(label, removed, renamed):
+    """Filler mappings touched by a change to `label` (empty if the filler can't be imported)."""
+    try:
+        import ezlynx_filler as filler
+    except Exception:
+        return []
+    affected = []
+    norm = label.replace("*", "").replace(":", "").strip().lower()
+    norm = _SUFFIX_RE.sub("", norm)
+    for table in ("BASE_DROPDOWN_LABELS", "AUTO_DROPDOWN_LABELS",
+                  "HOME_DROPDOWN_LABELS", "LEAD_DROPDOWN_LABELS"):
+        for field, patterns in getattr(filler, table, {}).items():
+            if any(pat == norm or pat in norm for pat in patterns):
+                affected.append(f"{table}[{field!r}]")
+    gone = {o.lower() for o in removed} | {old.lower() for old, _ in renamed}
+    for abbr, full in getattr(filler, "ABBREVIATIONS", {}).items():
+        if full.lower() in gone:
+            affected.append(f"ABBREVIATIONS[{abbr!r}] -> {full!r}")
+    return affected
+
+
+class SchemaChangeLog:
+    """Versioned change records in <output>.changes.jsonl (one version per run)."""
+
+    def __init__(self, output_file):
+        self.path = output_file + ".changes.jsonl"
+        last = 0
+        if os.path.exists(self.path):
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        last = max(last, json.loads(line).get("version", 0))
+                    except json.JSONDecodeError:
+                        pass
+        self.version = last + 1
+        self.count = 0
+
+    def record(self, entries):
+        if not entries:
+            return
+        ts = time.strftime("%Y-%m-%dT%H:%M:%S")
+        with open(self.path, "a", encoding="utf-8") as f:
+            for entry in entries:
+                f.write(json.dumps({"version": self.version, "ts": ts, **entry},
+                                   ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self.count += len(entries)
+
+
+def refresh_current_page(page, page_key, page_label, all_schema, page_map, journal,
+                         changelog, prime=False, snapshot_dir=None):
+    """Re-scrape an already-scraped page and apply only the differences."""
+    print(f"\n{'=' * 50}")
+    print(f"[*] Refreshing: {page_label}")
+    print(f"{'=' * 50}")
+    update_toolbar(page, len(all_schema), f"Refreshing {page_label}...")
+
+    timed_out = click_all_dropdowns_to_populate(page, prime=prime)
+    save_dom_snapshot(page, snapshot_dir, page_key)
+    try:
+        fresh, frame_stats, fresh_keys = scrape_all_frames(page, {})
+    except Exception as e:
+        print(f"[!] Scrape error: {e} — stored entries left untouched")
+        return all_schema, page_map
+    if not fresh_keys:
+        print("  [!] Nothing scraped — page not ready? Stored entries left untouched")
+        return all_schema, page_map
+
+    # Stored keys for this page, grouped by base label in page order
+    prior = {}
+    for key in page_map[page_key].get("dropdowns", []):
+        prior.setdefault(_SUFFIX_RE.sub("", key), []).append(key)
+
+    all_schema = dict(all_schema)
+    changed, entries, page_keys = {}, [], []
+    for key in fresh_keys:
+        values = fresh[key]
+        base = _SUFFIX_RE.sub("", key)
+        stored_key = prior.get(base, []).pop(0) if prior.get(base) else None
+        if stored_key is None:
+            # New dropdown on this page: dedupe against the whole schema
+            final_key, suffix = base, 2
+            while final_key in all_schema and all_schema[final_key] is not values:
+                final_key = f"{base} ({suffix})"
+                suffix += 1
+            if final_key not in all_schema:
+                changed[final_key] = values
+                entries.append({"page": page_key, "dropdown": final_key, "kind": "added",
+                                "added": values})
+            all_schema[final_key] = values
+            page_keys.append(final_key)
+            continue
+        page_keys.append(stored_key)
+        old = all_schema.get(stored_key, [])
+        if old is values:
+            continue
+        added, removed, renamed = diff_options(old, values)
+        all_schema[stored_key] = values
+        changed[stored_key] = values
+        entries.append({"page": page_key, "dropdown": stored_key, "kind": "changed",
+                        "added": added, "removed": removed, "renamed": renamed,
+                        "affects": filler_mappings_affected(stored_key, removed, renamed)})
+
+    # Stored dropdowns the page no longer shows. Drop them from the schema
+    # unless another page still lists them.
+    removed_keys = []
+    for keys in prior.values():
+        for key in keys:
+            elsewhere = any(key in pv.get("dropdowns", [])
+                            for pk, pv in page_map.items() if pk != page_key)
+            if not elsewhere:
+                removed_keys.append(key)
+                old = all_schema.pop(key, [])
+                entries.append({"page": page_key, "dropdown": key, "kind": "removed",
+                                "removed": old,
+                                "affects": filler_mappings_affected(key, old, [])})
+
+    page_map[page_key] = {
+        **page_map[page_key],
+        "label": page_label,
+        "dropdowns": sorted(set(page_keys)),
+        "frames": frame_stats,
+        "timedOut": timed_out,
+        "lastScraped": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    journal.append(page_key, page_map[page_key], changed, removed=removed_keys)
+    journal.maybe_compact(all_schema, page_map)
+    changelog.record(entries)
+
+    if entries:
+        print(f"  [*] {len(entries)} change(s) (version {changelog.version}):")
+        for e in entries:
+            detail = ""
+            if e["kind"] == "changed":
+                detail = (f" +{len(e['added'])} -{len(e['removed'])}"
+                          f" ~{len(e['renamed'])} renamed")
+            print(f"      {e['kind']:<8} '{e['dropdown']}'{detail}")
+            for a in e.get("affects", []):
+                print(f"        [!] affects filler mapping {a}")
+    else:
+        print("  [*] No changes.")
+    update_toolbar(page, len(all_schema),
+        f"Refreshed: {len(entries)} change(s). Navigate or Save & Close.")
+    return all_schema, page_map
+
+
+# ── Cascade crawl ──
+# A plain scrape only sees the child options for whatever parent value is
+# selected, so Occupation-per-Industry and County-per-State never make it
+# into the schema. --cascade "Parent>Child" walks every scraped parent value
+# in CASCADE_CONCURRENCY extra tabs of the same context (same login; the
+# user's own tab is left alone), selects it, waits for the form to go quiet
+# and records the child list under _cascades. Each tab pauses
+# CASCADE_DELAY_S between steps, every step is journaled, and parent values
+# already recorded are skipped (timed-out ones are retried) — a killed crawl
+# resumes where it stopped.
+CASCADE_CONCURRENCY = 2
+CASCADE_DELAY_S = 0.5
+CASCADE_CAP_MS = 4000
+CASCADE_READY_TIMEOUT_S = 20
+
+CASCADE_PRESENT_JS = """
+(label) => {
+""" + DOM_HELPERS_JS + """
+    return Array.from(document.querySelectorAll('select, mat-select, [role="combobox"]'))
+        .some(el => el.offsetParent !== null && getLabel(el) === label);
+}
+"""
+
+CASCADE_STEP_JS = """
+async ({parent, child, value, capMs, quietMs}) => {
+""" + DOM_HELPERS_JS + """
+    const OPTIONS = 'mat-option, [role="option"]';
+    const overlay = () => document.querySelector('.cdk-overlay-container') || document.body;
+    const overlayOptions = () => Array.from(overlay().querySelectorAll(OPTIONS));
+
+    function find(label) {
+        return Array.from(document.querySelectorAll('select, mat-select, [role="combobox"]'))
+            .find(el => el.offsetParent !== null && getLabel(el) === label) || null;
+    }
+
+    // Resolve once ready() holds and `root` has been quiet for quietMs, or at the cap.
+    function quiesce(root, cap, ready) {
+        const t0 = performance.now();
+        return new Promise(resolve => {
+            let quiet = null, finished = false;
+            const finish = (timedOut) => {
+                if (finished) return;
+                finished = true;
+                obs.disconnect(); clearTimeout(quiet); clearTimeout(capTimer);
+                resolve({timedOut, ms: Math.round(performance.now() - t0)});
+            };
+            const check = () => {
+                clearTimeout(quiet);
+                if (!ready || ready()) quiet = setTimeout(() => finish(false), quietMs);
+            };
+            const obs = new MutationObserver(check);
+            obs.observe(root, {childList: true, subtree: true, characterData: true});
+            const capTimer = setTimeout(() => finish(true), cap);
+            check();
+        });
+    }
+
+    function closeOverlay() {
+        const backdrop = document.querySelector('.cdk-overlay-backdrop');
+        if (backdrop) { backdrop.click(); return; }
+        document.dispatchEvent(new KeyboardEvent('keydown',
+            {key: 'Escape', code: 'Escape', keyCode: 27, bubbles: true}));
+    }
+
+    async function openPanel(el) {
+        const opened = quiesce(overlay(), capMs, () => overlayOptions().length > 0);
+        el.click();
+        return await opened;
+    }
+
+    const p = find(parent);
+    if (!p) return {error: 'parent dropdown not found'};
+
+    // 1. Select the parent value
+    if (p.tagName === 'SELECT') {
+        const opt = Array.from(p.options).find(o => o.textContent.trim() === value);
+        if (!opt) return {error: 'parent option not found'};
+        p.value = opt.value;
+        p.dispatchEvent(new Event('input', {bubbles: true}));
+        p.dispatchEvent(new Event('change', {bubbles: true}));
+    } else {
+        await openPanel(p);
+        const opt = overlayOptions().find(o => o.textContent.trim() === value);
+        if (!opt) { closeOverlay(); return {error: 'parent option not found'}; }
+        opt.click();
+        await quiesce(overlay(), 500, () => overlayOptions().length === 0);
+    }
+
+    // 2. Let the dependent list reload: wait for the form to stop changing
+    const settled = await quiesce(p.closest('form') || document.body, capMs);
+
+    // 3. Read the child list (the reload may have re-rendered its label)
+    labelIndex = null;
+    const c = find(child);
+    if (!c) return {error: 'child dropdown not found'};
+    let options, timedOut = settled.timedOut;
+    if (c.tagName === 'SELECT') {
+        options = Array.from(c.options)
+            .filter(o => !isPlaceholder(o.value || '', o.textContent.trim()))
+            .map(o => o.textContent.trim());
+    } else {
+        const r = await openPanel(c);
+        options = overlayOptions().map(o => o.textContent.trim())
+            .filter(t => !isPlaceholder('', t));
+        timedOut = timedOut || r.timedOut;
+        closeOverlay();
+    }
+    return {options, timedOut};
+}
+"""
+
+
+def parse_cascade_spec(spec):
+    """argparse type for --cascade: "Parent>Child" -> (parent, child)."""
+    parent, sep, child = spec.partition(">")
+    if not sep or not parent.strip() or not child.strip():
+        raise argparse.ArgumentTypeError(f"expected PARENT>CHILD, got {spec!r}")
+    return parent.strip(), child.strip()
+
+
+def _run_cascade_tabs(page, tabs, key, parent, child, todo, journal, delay):
+    """
+    Drive every tab concurrently on Playwright's loop (see _async_bridge).
+    Without the bridge the first tab works through the values alone.
+    Returns [(value, error)].
+    """
+    queue = list(reversed(todo))  # pop() hands out values in schema order
+    failures = []
+
+    def step_arg(value):
+        return {"parent": parent, "child": child, "value": value,
+                "capMs": CASCADE_CAP_MS, "quietMs": PREPOPULATE_QUIET_MS * 3}
+
+    def record(value, r):
+        if r.get("error"):
+            failures.append((value, r["error"]))
+            print(f"    [!] {parent}={value!r}: {r['error']}")
+        else:
+            options = r.get("options", [])
+            journal.append_cascade(key, parent, child, value, options, r.get("timedOut", False))
+            print(f"    [v] {parent}={value!r}: {len(options)} {child} options"
+                  f"{' (timed out — may be incomplete)' if r.get('timedOut') else ''}")
+
+    async def wait_ready(impl):
+        deadline = time.monotonic() + CASCADE_READY_TIMEOUT_S
+        while time.monotonic() < deadline:
+            try:
+                if await impl.evaluate(CASCADE_PRESENT_JS, parent):
+                    return True
+            except Exception:
+                pass
+            await asyncio.sleep(0.25)
+        return False
+
+    async def worker(impl):
+        if not await wait_ready(impl):
+            print(f"    [!] Tab never showed '{parent}' — leaving its share to the other tabs")
+            return
+        while queue:
+            value = queue.pop()
+            try:
+                r = await impl.evaluate(CASCADE_STEP_JS, step_arg(value))
+            except Exception as e:
+                r = {"error": str(e).splitlines()[0][:200]}
+            record(value, r)
+            await asyncio.sleep(delay)
+
+    bridge = _async_bridge(page, tabs)
+    if bridge:
+        run, impls = bridge
+
+        async def gather_all():
+            await asyncio.gather(*[worker(impl) for impl in impls])
+        run(gather_all())
+    else:
+        tab = tabs[0]
+        try:
+            tab.wait_for_function(CASCADE_PRESENT_JS, arg=parent,
+                                  timeout=CASCADE_READY_TIMEOUT_S * 1000)
+        except Exception:
+            print(f"    [!] Tab never showed '{parent}'")
+        else:
+            while queue:
+                value = queue.pop()
+                try:
+                    r = tab.evaluate(CASCADE_STEP_JS, step_arg(value))
+                except Exception as e:
+                    r = {"error": str(e).splitlines()[0][:200]}
+                record(value, r)
+                time.sleep(delay)
+    failures.extend((value, "not attempted") for value in reversed(queue))
+    return failures
+
+
+def crawl_cascades(page, context, specs, all_schema, page_map, journal,
+                   concurrency=CASCADE_CONCURRENCY, delay=CASCADE_DELAY_S):
+    """Enumerate child options for each (parent, child) spec found on this page."""
+    for parent, child in specs:
+        if parent not in all_schema:
+            continue
+        try:
+            if not page.evaluate(CASCADE_PRESENT_JS, parent):
+                continue
+        except Exception:
+            continue
+
+        key = f"{parent} > {child}"
+        entry = journal.cascades.get(key, {})
+        done = entry.get("values", {})
+        retry = set(entry.get("timedOut", []))  # incomplete lists get another go
+        todo = [v for v in all_schema[parent] if v not in done or v in retry]
+        if not todo:
+            print(f"  [*] Cascade {key}: complete ({len(done)} values) — skipping")
+            continue
+
+        n_tabs = max(1, min(concurrency, len(todo)))
+        print(f"\n  [*] Cascade {key}: {len(todo)} of {len(all_schema[parent])} values to go "
+              f"({n_tabs} tab(s), {delay}s between steps)")
+        update_toolbar(page, len(all_schema), f"Cascade {key}: {len(todo)} values...")
+
+        t0 = time.perf_counter()
+        tabs = []
+        try:
+            for _ in range(n_tabs):
+                tab = context.new_page()
+                tab.goto(page.url, wait_until="domcontentloaded")
+                tabs.append(tab)
+            failures = _run_cascade_tabs(page, tabs, key, parent, child, todo, journal, delay)
+        finally:
+            for tab in tabs:
+                try:
+                    tab.close()
+                except Exception:
+                    pass
+            journal.compact(all_schema, page_map)
+
+        entry = journal.cascades.get(key, {})
+        print(f"  [*] Cascade {key}: {len(entry.get('values', {}))} values recorded, "
+              f"{len(entry.get('timedOut', []))} timed out, {len(failures)} failed "
+              f"in {time.perf_counter() - t0:.1f}s")
+        update_toolbar(page, len(all_schema),
+            f"Cascade {key} done. Navigate or Save & Close.")
+
+
+# ── Settle detection ──
+# EZLynx is an Angular SPA: "loaded" means the route's XHRs have returned
+# and the form has stopped re-rendering. wait_for_settled() waits until the
+# page has had no in-flight requests and no DOM mutations for
+# SETTLE_QUIET_MS, instead of a fixed sleep. Requests older than
+# LONG_POLL_S (SignalR/long-poll) don't hold it up, and it gives up at
+# SETTLE_TIMEOUT_MS so a chatty page still gets scraped.
+SETTLE_QUIET_MS = 400
+SETTLE_TIMEOUT_MS = 15000
+LONG_POLL_S = 10
+
+DOM_QUIET_JS = """
+({quietMs, capMs}) => new Promise(resolve => {
+    let quiet = null;
+    const finish = (settled) => { obs.disconnect(); clearTimeout(quiet); clearTimeout(cap); resolve(settled); };
+    const bump = () => { clearTimeout(quiet); quiet = setTimeout(() => finish(true), quietMs); };
+    const obs = new MutationObserver(bump);
+    obs.observe(document.documentElement, {childList: true, subtree: true, characterData: true});
+    const cap = setTimeout(() => finish(false), capMs);
+    bump();
+})
+"""
+
+
+class NetworkTracker:
+    """Counts a page's in-flight requests (fed by Playwright request events)."""
+
+    IGNORED_TYPES = {"websocket", "eventsource", "manifest", "other"}
 
+    def __init__(self, page):
+        self.inflight = {}
+        self.last_change = time.monotonic()
+        page.on("request", self._start)
+        page.on("requestfinished", self._end)
+        page.on("requestfailed", self._end)
+
+    def _start(self, request):
+        if request.resource_type not in self.IGNORED_TYPES:
+            self.inflight[id(request)] = time.monotonic()
+            self.last_change = time.monotonic()
+
+    def _end(self, request):
+        if self.inflight.pop(id(request), None) is not None:
+            self.last_change = time.monotonic()
+
+    def busy(self):
+        cutoff = time.monotonic() - LONG_POLL_S
+        return any(started > cutoff for started in self.inflight.values())
+
+    def quiet_for(self):
+        return time.monotonic() - self.last_change
+
+
+def wait_for_settled(page, tracker, quiet_ms=SETTLE_QUIET_MS, timeout_ms=SETTLE_TIMEOUT_MS):
+    """Block until network and DOM are both quiet for quiet_ms. Returns (settled, ms)."""
+    t0 = time.perf_counter()
+    deadline = time.monotonic() + timeout_ms / 1000
+    while time.monotonic() < deadline:
+        remaining = int((deadline - time.monotonic()) * 1000)
+        try:
+            dom_quiet = page.evaluate(DOM_QUIET_JS, {"quietMs": quiet_ms, "capMs": max(remaining, 1)})
+        except Exception:
+            dom_quiet = False  # navigated mid-wait — go round again
+        if dom_quiet and not tracker.busy() and tracker.quiet_for() * 1000 >= quiet_ms:
+            return True, (time.perf_counter() - t0) * 1000
+        page.wait_for_timeout(50)
+    return False, (time.perf_counter() - t0) * 1000
+
+
+def load_scrape_state(output_file):
+    """Load the existing schema and replay any leftover journal.
+    Returns (all_schema, page_map, journal)."""
     all_schema = {}
     page_map = {}
+    cascade_data = {}
 
     # Load existing schema
     if os.path.exists(output_file):
         try:
-            with open(output_file, "r", encoding="utf-8") as f:
-                existing = json.load(f)
-            if "_pages" in existing:
-                page_map = existing.pop("_pages")
-            all_schema = {k: v for k, v in existing.items() if not k.startswith("_")}
-            print(f"[*] Existing schema: {len(all_schema)} dropdowns, {len(page_map)} pages already scraped")
+            all_schema, meta = load_schema_file(output_file, OPTION_POOL)
+            page_map = meta.get("_pages", {})
+            cascade_data = meta.get("_cascades", {})
+            print(f"[*] Existing schema: {len(all_schema)} dropdowns ({len(OPTION_POOL)} distinct option lists), "
+                  f"{len(page_map)} pages already scraped")
             if page_map:
                 for pk, pv in page_map.items():
                     print(f"     {pv.get('label', pk)}: {len(pv.get('dropdowns', []))} dropdowns")
         except Exception:
             pass
 
+    # Recover anything a killed session journaled but never compacted
+    journal = SchemaJournal(output_file)
+    journal.cascades = cascade_data
+    recovered = journal.replay(all_schema, page_map)
+    if recovered:
+        print(f"[*] Recovered {recovered} page(s) from {journal.path}")
+        journal.compact(all_schema, page_map)
+
+    return all_schema, page_map, journal
+
+
+def run(output_file: str, prime: bool = False, cascades=None,
+        cascade_concurrency: int = CASCADE_CONCURRENCY, cascade_delay: float = CASCADE_DELAY_S,
+        storage_state=None, refresh: bool = False, snapshot_dir=None):
+    print("--- EZLynx Schema Scraper ---")
+    print("[*] Toolbar appears at top-center of the browser (draggable)")
+    print("[*] AUTO-SCRAPES when you navigate to a new page")
+    print("[*] AUTO-SAVES after each page to a journal (safe to close or kill anytime)")
+    print("[*] Skips pages already scraped\n")
+
+    all_schema, page_map, journal = load_scrape_state(output_file)
+    changelog = SchemaChangeLog(output_file) if refresh else None
+    if refresh:
+        print(f"[*] Refresh mode: scraped pages are diffed (change log version {changelog.version})")
+
     with sync_playwright() as p:
         browser = p.chromium.launch(headless=False)
-        context = browser.new_context(viewport={"width": 1400, "height": 900})
+        context = browser.new_context(
+            viewport={"width": 1400, "height": 900},
+            storage_state=storage_state if storage_state and os.path.exists(storage_state) else None,
+        )
         page = context.new_page()
+        tracker = NetworkTracker(page)
 
         # Track last scraped URL to avoid redundant scrapes
         last_scraped_path = [None]
@@ -643,7 +1544,12 @@ def run(output_file: str):
                 return
 
             last_scraped_path[0] = current_path
-            all_schema, page_map = scrape_current_page(page, all_schema, page_map, output_file)
+            all_schema, page_map = scrape_current_page(page, all_schema, page_map, journal,
+                                                       prime=prime, changelog=changelog,
+                                                       snapshot_dir=snapshot_dir)
+            if cascades:
+                crawl_cascades(page, context, cascades, all_schema, page_map, journal,
+                               concurrency=cascade_concurrency, delay=cascade_delay)
 
         try:
             print(f"[*] Opening EZLynx: {EZLYNX_URL}")
@@ -673,7 +1579,7 @@ def run(output_file: str):
                 # Handle pending auto-scrape (delayed to let Angular settle)
                 if auto_scrape_pending[0]:
                     auto_scrape_pending[0] = False
-                    time.sleep(0.8)  # Angular settling time
+                    wait_for_settled(page, tracker)  # Angular: XHRs done + DOM quiet
                     try:
                         inject_toolbar(page)
                         update_toolbar(page, len(all_schema), "Checking page...")
@@ -719,24 +1625,130 @@ def run(output_file: str):
                     running = False
 
             # Final save
-            save_schema(output_file, all_schema, page_map)
+            journal.compact(all_schema, page_map)
             print(f"\n[OK] Final save: {len(all_schema)} dropdowns from {len(page_map)} page(s)")
             for pk, pv in page_map.items():
                 print(f"     {pv.get('label', pk)}: {len(pv.get('dropdowns', []))} dropdowns")
 
         except KeyboardInterrupt:
             print("\n[!] Interrupted.")
-            save_schema(output_file, all_schema, page_map)
+            journal.compact(all_schema, page_map)
             if all_schema:
                 print(f"[OK] Emergency save: {len(all_schema)} dropdowns")
         except Exception as e:
             print(f"\n[!] Error: {e}")
-            save_schema(output_file, all_schema, page_map)
+            journal.compact(all_schema, page_map)
         finally:
+            if storage_state:
+                # Keep the login for unattended --crawl runs
+                try:
+                    context.storage_state(path=storage_state)
+                    print(f"[*] Session saved to {storage_state}")
+                except Exception as e:
+                    print(f"[!] Could not save session: {e}")
             browser.close()
             print("[*] Browser closed.")
 
 
+def read_routes(routes_file):
+    """One EZLynx route (full URL or /web/... path) per line; # starts a comment."""
+    routes = []
+    with open(routes_file, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.split("#", 1)[0].strip()
+            if line:
+                routes.append(line)
+    return routes
+
+
+def looks_logged_out(page):
+    """True when the session didn't carry over and EZLynx showed its login form."""
+    try:
+        return page.evaluate("!!document.querySelector('input[type=\"password\"]')")
+    except Exception:
+        return False
+
+
+def crawl(output_file: str, routes, storage_state=None, user_data_dir=None, headless=True,
+          prime: bool = False, cascades=None, cascade_concurrency: int = CASCADE_CONCURRENCY,
+          cascade_delay: float = CASCADE_DELAY_S, refresh: bool = False, snapshot_dir=None):
+    """
+    Unattended refresh: visit each route with a saved session, wait for it
+    to settle, and re-scrape it. Returns a process exit code (0 = all
+    routes scraped, 1 = some failed, 2 = session expired).
+    """
+    print("--- EZLynx Schema Scraper (crawl) ---")
+    print(f"[*] {len(routes)} route(s), {'headless' if headless else 'headed'}")
+    all_schema, page_map, journal = load_scrape_state(output_file)
+    changelog = SchemaChangeLog(output_file) if refresh else None
+
+    failed = []
+    exit_code = 0
+    with sync_playwright() as p:
+        browser = None
+        if user_data_dir:
+            context = p.chromium.launch_persistent_context(
+                user_data_dir, headless=headless, viewport={"width": 1400, "height": 900})
+        else:
+            browser = p.chromium.launch(headless=headless)
+            context = browser.new_context(viewport={"width": 1400, "height": 900},
+                                          storage_state=storage_state)
+        page = context.pages[0] if context.pages else context.new_page()
+        tracker = NetworkTracker(page)
+
+        try:
+            for i, route in enumerate(routes, start=1):
+                url = route if route.startswith("http") else EZLYNX_URL + route
+                print(f"\n[*] ({i}/{len(routes)}) {url}")
+                try:
+                    page.goto(url, wait_until="domcontentloaded")
+                except Exception as e:
+                    print(f"  [!] Navigation failed: {e}")
+                    failed.append(route)
+                    continue
+                settled, ms = wait_for_settled(page, tracker)
+                print(f"  [*] {'Settled' if settled else 'Still busy, scraping anyway'} after {ms:.0f}ms")
+                if looks_logged_out(page):
+                    print("  [!] Login page — saved session has expired. Log in again with "
+                          "--storage-state (interactive) and re-run the crawl.")
+                    exit_code = 2
+                    break
+
+                # A crawl re-scrapes even pages already in _pages: diffed with
+                # --refresh, otherwise overwritten
+                path = get_page_label(page).get("path", "unknown")
+                if changelog is None:
+                    page_map.pop(path, None)
+                before = len(all_schema)
+                all_schema, page_map = scrape_current_page(page, all_schema, page_map, journal,
+                                                           prime=prime, changelog=changelog,
+                                                           snapshot_dir=snapshot_dir)
+                if not page_map.get(path, {}).get("dropdowns"):
+                    failed.append(route)
+                print(f"  [*] {len(all_schema) - before} new dropdown(s) from this route")
+                if cascades:
+                    crawl_cascades(page, context, cascades, all_schema, page_map, journal,
+                                   concurrency=cascade_concurrency, delay=cascade_delay)
+        except KeyboardInterrupt:
+            print("\n[!] Interrupted.")
+        finally:
+            journal.compact(all_schema, page_map)
+            context.close()
+            if browser:
+                browser.close()
+
+    print(f"\n[OK] Crawl done: {len(all_schema)} dropdowns from {len(page_map)} page(s), "
+          f"{len(failed)} route(s) failed")
+    for route in failed:
+        print(f"     failed: {route}")
+    if changelog is not None:
+        print(f"[*] {changelog.count} change(s) recorded in {changelog.path} "
+              f"(version {changelog.version})")
+    if exit_code == 0 and failed:
+        exit_code = 1
+    return exit_code
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Scrape EZLynx form dropdowns into a JSON schema file"
@@ -746,8 +1758,79 @@ def main():
         default="ezlynx_schema.json",
         help="Output JSON filename (default: ezlynx_schema.json)",
     )
+    parser.add_argument(
+        "--prime",
+        action="store_true",
+        help="Open/close every dropdown once before waiting on any, so independent "
+             "lazy option loads run in parallel",
+    )
+    parser.add_argument(
+        "--cascade",
+        action="append",
+        type=parse_cascade_spec,
+        metavar="PARENT>CHILD",
+        help="Enumerate CHILD's options for every PARENT value on pages that have PARENT "
+             "(repeatable, e.g. --cascade \"Industry>Occupation\")",
+    )
+    parser.add_argument(
+        "--cascade-concurrency",
+        type=int,
+        default=CASCADE_CONCURRENCY,
+        help=f"Tabs used per cascade crawl (default: {CASCADE_CONCURRENCY})",
+    )
+    parser.add_argument(
+        "--cascade-delay",
+        type=float,
+        default=CASCADE_DELAY_S,
+        help=f"Seconds each tab waits between cascade steps (default: {CASCADE_DELAY_S})",
+    )
+    parser.add_argument(
+        "--crawl",
+        metavar="ROUTES_FILE",
+        help="Unattended mode: visit each route in ROUTES_FILE (one per line) with a saved "
+             "session and re-scrape it",
+    )
+    parser.add_argument(
+        "--storage-state",
+        metavar="FILE",
+        help="Session file: saved on exit in interactive mode, loaded by --crawl",
+    )
+    parser.add_argument(
+        "--user-data-dir",
+        metavar="DIR",
+        help="Crawl with a persistent Chromium profile instead of --storage-state",
+    )
+    parser.add_argument(
+        "--headed",
+        action="store_true",
+        help="Show the browser during --crawl",
+    )
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Re-scrape pages already in the schema, apply only the differences and log "
+             "them to <output>.changes.jsonl",
+    )
+    parser.add_argument(
+        "--snapshot-dir",
+        metavar="DIR",
+        help="Save each scraped page's DOM (scripts stripped) to DIR for bench_scraper.py. "
+             "Snapshots contain whatever client data was on screen — scrub before committing",
+    )
     args = parser.parse_args()
-    run(output_file=args.output)
+    if args.crawl:
+        if not (args.storage_state or args.user_data_dir):
+            parser.error("--crawl needs --storage-state or --user-data-dir")
+        sys.exit(crawl(output_file=args.output, routes=read_routes(args.crawl),
+                       storage_state=args.storage_state, user_data_dir=args.user_data_dir,
+                       headless=not args.headed, prime=args.prime, cascades=args.cascade,
+                       cascade_concurrency=args.cascade_concurrency,
+                       cascade_delay=args.cascade_delay, refresh=args.refresh,
+                       snapshot_dir=args.snapshot_dir))
+    run(output_file=args.output, prime=args.prime, cascades=args.cascade,
+        cascade_concurrency=args.cascade_concurrency, cascade_delay=args.cascade_delay,
+        storage_state=args.storage_state, refresh=args.refresh,
+        snapshot_dir=args.snapshot_dir)
 
 
 if __name__ == "__main__":
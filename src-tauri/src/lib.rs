@@ -1,6 +1,8 @@
-use std::io::{BufRead, BufReader, Read};
-use std::process::{Command, Stdio};
+use std::io::{self, BufRead, BufReader, Read, Write};
+use std::process::{Child, ChildStdin, ChildStdout, Command, Stdio};
+use std::sync::Mutex;
 use rfd::FileDialog;
+use serde_json::{json, Value};
 use tauri::{AppHandle, Emitter};
 
 #[tauri::command]
@@ -12,11 +14,133 @@ fn open_file_dialog() -> Option<String> {
         .map(|path| path.to_string_lossy().to_string())
 }
 
+// Resident PDF worker pool (python_backend/pdf_worker_pool.py). Spawning
+// policy_engine.py per file pays interpreter startup and the pypdf import
+// on every drop (~190ms); a warm pool worker answers in ~30ms. The pool is
+// started in the background at launch and talks JSON lines over its
+// stdin/stdout, one request at a time under the mutex. It exits when its
+// stdin closes, i.e. with the app.
+struct PdfPool {
+    child: Child,
+    stdin: ChildStdin,
+    stdout: BufReader<ChildStdout>,
+    next_id: u64,
+}
+
+static PDF_POOL: Mutex<Option<PdfPool>> = Mutex::new(None);
+
+impl PdfPool {
+    fn spawn() -> io::Result<PdfPool> {
+        let mut child = Command::new("python")
+            .arg("../python_backend/pdf_worker_pool.py")
+            .arg("--workers")
+            .arg("1")
+            .stdin(Stdio::piped())
+            .stdout(Stdio::piped())
+            .spawn()?;
+        let stdin = child
+            .stdin
+            .take()
+            .ok_or_else(|| io::Error::other("no pool stdin"))?;
+        let stdout = child
+            .stdout
+            .take()
+            .ok_or_else(|| io::Error::other("no pool stdout"))?;
+        Ok(PdfPool {
+            child,
+            stdin,
+            stdout: BufReader::new(stdout),
+            next_id: 0,
+        })
+    }
+
+    // Send one job and wait for its response. Err means the pool itself
+    // failed (exited, pipe closed), not the job.
+    fn request(&mut self, mut job: Value) -> io::Result<Value> {
+        self.next_id += 1;
+        let id = self.next_id;
+        job["id"] = json!(id);
+        writeln!(self.stdin, "{}", job)?;
+        self.stdin.flush()?;
+        let mut line = String::new();
+        loop {
+            line.clear();
+            if self.stdout.read_line(&mut line)? == 0 {
+                return Err(io::Error::new(
+                    io::ErrorKind::UnexpectedEof,
+                    "PDF pool exited",
+                ));
+            }
+            if let Ok(response) = serde_json::from_str::<Value>(&line) {
+                if response["id"] == json!(id) {
+                    return Ok(response);
+                }
+            }
+        }
+    }
+}
+
+fn lock_pdf_pool() -> std::sync::MutexGuard<'static, Option<PdfPool>> {
+    PDF_POOL
+        .lock()
+        .unwrap_or_else(|poisoned| poisoned.into_inner())
+}
+
+fn warm_pdf_pool() {
+    let mut pool = lock_pdf_pool();
+    if pool.is_none() {
+        match PdfPool::spawn() {
+            Ok(p) => *pool = Some(p),
+            Err(e) => println!("PDF pool unavailable: {}", e),
+        }
+    }
+}
+
+// Extract through the pool: Some(Ok(text)) / Some(Err(message)) is the
+// job's answer, None means the pool couldn't be used and the caller
+// should run the script directly. A failed pool is dropped and respawned
+// on the next call.
+fn pool_extract(file_path: &str) -> Option<Result<String, String>> {
+    warm_pdf_pool();
+    let mut guard = lock_pdf_pool();
+    let pool = guard.as_mut()?;
+    match pool.request(json!({ "job": "extract", "path": file_path })) {
+        Ok(response) if response["ok"] == json!(true) => Some(Ok(response["text"]
+            .as_str()
+            .unwrap_or_default()
+            .to_string())),
+        Ok(response) => Some(Err(response["error"]
+            .as_str()
+            .unwrap_or("unknown error")
+            .to_string())),
+        Err(e) => {
+            println!("PDF pool failed: {}", e);
+            if let Some(mut dead) = guard.take() {
+                let _ = dead.child.kill();
+                let _ = dead.child.wait();
+            }
+            None
+        }
+    }
+}
+
 #[tauri::command]
 fn process_policy_file(file_path: String) -> String {
     println!("Rust received file: {}", file_path);
 
-    // 1. Run the Python script
+    match pool_extract(&file_path) {
+        Some(Ok(text)) => {
+            println!("Python Success! Extracted {} chars (pool).", text.len());
+            return text;
+        }
+        Some(Err(error)) => {
+            println!("Python Error: {}", error);
+            return format!("Error: {}", error);
+        }
+        None => {}
+    }
+
+    // 1. No pool: run the Python script
     // Note: We use ".." because the Rust app runs inside 'src-tauri',
     // so we need to go up one level to find 'python_backend'.
     let output = Command::new("python")
@@ -143,6 +267,8 @@ pub fn run() {
         }
     })
     .setup(|app| {
+      // Warm the PDF pool while the window loads, so the first drop is fast
+      std::thread::spawn(warm_pdf_pool);
       if cfg!(debug_assertions) {
         app.handle().plugin(
           tauri_plugin_log::Builder::default()
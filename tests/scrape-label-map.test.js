@@ -0,0 +1,227 @@
+/**
+ * EZLynx Schema Scraper — precomputed label map equivalence tests
+ *
+ * SCRAPE_JS in python_backend/scrape_ezlynx_schema.py resolves <label for>
+ * and aria-labelledby text from a map built in one DOM pass instead of a
+ * document query per control. These tests pull the JS out of the Python
+ * source and check it labels every control exactly as the previous
+ * getLabel() did (LEGACY_GET_LABEL below), against the recorded-DOM
+ * fixture in tests/fixtures/ezlynx-dom/ and a set of edge cases.
+ *
+ * jsdom has no layout, so offsetParent is stubbed: null when the element
+ * or an ancestor has an inline display:none, <body> otherwise.
+ */
+
+'use strict';
+
+const fs   = require('fs');
+const path = require('path');
+const { JSDOM } = require('jsdom');
+
+const SCRAPER_PY = path.resolve(__dirname, '..', 'python_backend', 'scrape_ezlynx_schema.py');
+const FIXTURE    = path.resolve(__dirname, 'fixtures', 'ezlynx-dom', 'auto-policy-info.html');
+
+const CONTROLS = 'select, mat-select, [role="listbox"], [role="combobox"], .k-dropdown, '
+    + '.k-dropdownlist, .p-dropdown, .custom-select, [data-role="dropdownlist"]';
+
+// ── Extract the JS constants from the Python source ─────────────────────────
+
+const pySrc = fs.readFileSync(SCRAPER_PY, 'utf8');
+
+/** Undo Python string-literal escaping (the JS uses \\* , \\n, \\u001f). */
+function pyUnescape(s) {
+    return s.replace(/\\(.)/g, (_, c) => (c === 'n' ? '\n' : c === 't' ? '\t' : c));
+}
+
+function pyConst(name) {
+    const m = pySrc.match(new RegExp('^' + name + ' = """([\\s\\S]*?)"""$', 'm'));
+    if (!m) throw new Error(name + ' not found in scrape_ezlynx_schema.py');
+    return pyUnescape(m[1]);
+}
+
+const DOM_HELPERS_JS = pyConst('DOM_HELPERS_JS');
+const scrapeMatch = pySrc.match(/^SCRAPE_JS = """([\s\S]*?)""" \+ DOM_HELPERS_JS \+ """([\s\S]*?)"""$/m);
+const [SCRAPE_HEAD, SCRAPE_TAIL] = [pyUnescape(scrapeMatch[1]), pyUnescape(scrapeMatch[2])];
+
+// getLabel() as it was before the label map: one document query per lookup.
+const LEGACY_GET_LABEL = `
+    function getLabel(el) {
+        const id = el.id || el.getAttribute('id') || '';
+        if (id) {
+            const lbl = document.querySelector('label[for="' + id + '"]');
+            if (lbl) {
+                const t = lbl.textContent.trim().replace(/\\*/g, '').trim();
+                if (t) return t;
+            }
+        }
+        const aria = el.getAttribute('aria-label');
+        if (aria && aria.trim()) return aria.trim();
+        const ariaBy = el.getAttribute('aria-labelledby');
+        if (ariaBy) {
+            const ref = document.getElementById(ariaBy);
+            if (ref) {
+                const t = ref.textContent.trim();
+                if (t) return t;
+            }
+        }
+        const fieldset = el.closest('fieldset, .mat-form-field, [class*="form-field"]');
+        if (fieldset) {
+            const legend = fieldset.querySelector('legend, .mat-form-field-label, label, [class*="label"]');
+            if (legend) {
+                const t = legend.textContent.trim().replace(/\\*/g, '').trim();
+                if (t) return t;
+            }
+        }
+        const parentLabel = el.closest('label');
+        if (parentLabel) {
+            const t = parentLabel.textContent.trim().split('\\n')[0].trim().replace(/\\*/g, '').trim();
+            if (t) return t;
+        }
+        let prev = el.previousElementSibling;
+        if (prev && (prev.tagName === 'LABEL' || prev.tagName === 'SPAN' || prev.tagName === 'DIV')) {
+            const t = prev.textContent.trim().replace(/\\*/g, '').trim();
+            if (t && t.length < 50) return t;
+        }
+        const parent = el.parentElement;
+        if (parent) {
+            prev = parent.previousElementSibling;
+            if (prev && (prev.tagName === 'LABEL' || prev.tagName === 'SPAN')) {
+                const t = prev.textContent.trim().replace(/\\*/g, '').trim();
+                if (t && t.length < 50) return t;
+            }
+        }
+        const title = el.getAttribute('title');
+        if (title && title.trim()) return title.trim();
+        const placeholder = el.getAttribute('placeholder') || el.getAttribute('data-placeholder');
+        if (placeholder && placeholder.trim()) return placeholder.trim();
+        const name = el.getAttribute('name') || el.getAttribute('formcontrolname');
+        if (name) return name;
+        if (id) return id;
+        return '(unknown)';
+    }
+`;
+
+// A later function declaration of the same name wins, so appending the
+// legacy getLabel swaps it in without touching the rest of the helpers.
+const LEGACY_HELPERS_JS = DOM_HELPERS_JS + LEGACY_GET_LABEL;
+
+// ── jsdom harness ────────────────────────────────────────────────────────────
+
+function loadDom(html) {
+    const dom = new JSDOM(html, { runScripts: 'outside-only' });
+    const { window } = dom;
+    Object.defineProperty(window.HTMLElement.prototype, 'offsetParent', {
+        configurable: true,
+        get() {
+            for (let n = this; n; n = n.parentElement) {
+                if (n.style && n.style.display === 'none') return null;
+            }
+            return this.ownerDocument.body;
+        },
+    });
+    return window;
+}
+
+function labeler(window, helpers) {
+    return window.eval('(() => {' + helpers + '\n return getLabel; })()');
+}
+
+function scrape(window, helpers) {
+    return window.eval('(' + SCRAPE_HEAD + helpers + SCRAPE_TAIL + ')()');
+}
+
+function expectSameLabels(html) {
+    const win = loadDom(html);
+    const current = labeler(win, DOM_HELPERS_JS);
+    const legacy = labeler(win, LEGACY_HELPERS_JS);
+    const controls = Array.from(win.document.querySelectorAll(CONTROLS));
+    expect(controls.length).toBeGreaterThan(0);
+    for (const el of controls) {
+        expect(current(el)).toBe(legacy(el));
+    }
+    return controls.map(el => current(el));
+}
+
+// ── Tests ────────────────────────────────────────────────────────────────────
+
+describe('SCRAPE_JS label map — recorded fixture', () => {
+    const html = fs.readFileSync(FIXTURE, 'utf8');
+
+    test('every control gets the same label as the legacy getLabel()', () => {
+        const labels = expectSameLabels(html);
+        // The fixture exercises the label-for, aria-label and aria-labelledby paths
+        expect(labels).toEqual(expect.arrayContaining([
+            'Policy Term', 'Prior Carrier', 'Years with Prior Carrier', 'Bodily Injury',
+            'Gender', 'Vehicle Use', 'Annual Miles', 'Ownership',
+        ]));
+    });
+
+    test('scrape output (labels, options, key order) is unchanged', () => {
+        const win = loadDom(html);
+        const current = scrape(win, DOM_HELPERS_JS);
+        const legacy = scrape(win, LEGACY_HELPERS_JS);
+        expect(Object.keys(current.dropdowns)).toEqual(Object.keys(legacy.dropdowns));
+        expect(current.dropdowns).toEqual(legacy.dropdowns);
+        expect(current.debug).toEqual(legacy.debug);
+        expect(current.dropdowns['Legacy Discount']).toBeUndefined(); // hidden row
+    });
+
+    test('no per-control document queries during the scrape', () => {
+        const win = loadDom(html);
+        const doc = win.document;
+        const calls = { querySelector: 0, getElementById: 0 };
+        for (const fn of Object.keys(calls)) {
+            const orig = doc[fn].bind(doc);
+            doc[fn] = (...args) => { calls[fn]++; return orig(...args); };
+        }
+        scrape(win, LEGACY_HELPERS_JS);
+        const legacy = { ...calls };
+        expect(legacy.querySelector).toBeGreaterThan(0);
+
+        calls.querySelector = calls.getElementById = 0;
+        scrape(win, DOM_HELPERS_JS);
+        expect(calls.querySelector).toBe(0);
+        // What's left is the combobox aria-owns lookup, not label resolution
+        expect(calls.getElementById).toBeLessThan(legacy.getElementById);
+    });
+});
+
+describe('SCRAPE_JS label map — edge cases', () => {
+    test('first <label for> wins, even when its text is empty', () => {
+        expectSameLabels(`<body>
+            <label for="a"> * </label><label for="a">Second</label>
+            <select id="a" name="fallbackName"><option>X</option></select>
+            <label for="b">First*</label><label for="b">Second</label>
+            <select id="b"><option>X</option></select>
+        </body>`);
+    });
+
+    test('duplicate ids resolve aria-labelledby to the first element', () => {
+        const labels = expectSameLabels(`<body>
+            <span id="dup">One</span><span id="dup">Two</span>
+            <select aria-labelledby="dup"><option>X</option></select>
+        </body>`);
+        expect(labels).toEqual(['One']);
+    });
+
+    test('missing, empty and multi-id aria-labelledby fall through alike', () => {
+        expectSameLabels(`<body>
+            <span id="empty">   </span>
+            <div><span>Prev Sibling</span><select aria-labelledby="nope"><option>X</option></select></div>
+            <div><span>Other</span><select aria-labelledby="empty" title="By Title"><option>X</option></select></div>
+            <span id="p1">Part</span><span id="p2">Two</span>
+            <select aria-labelledby="p1 p2" placeholder="Multi"><option>X</option></select>
+            <mat-select role="listbox" aria-labelledby="late"><mat-option>Y</mat-option></mat-select>
+            <label id="late">Declared After</label>
+        </body>`);
+    });
+
+    test('ids with CSS-significant characters behave like the legacy lookup', () => {
+        expectSameLabels(`<body>
+            <label for="driver.0:gender">Gender</label>
+            <select id="driver.0:gender"><option>Male</option></select>
+            <label for="a[1]">Indexed</label>
+            <select id="a[1]"><option>X</option></select>
+        </body>`);
+    });
+});